@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+SlackListImporter.safe_map のマイクロベンチマーク
+
+実際の CSV（人材管理リスト鹿児島.csv / ビザ申請依頼リスト.csv）の列値を使って、
+旧実装（呼び出しごとに str.maketrans + 辞書順の部分一致走査）と
+CompiledMapping による新実装の1呼び出しあたりの時間を比較します。
+結果が異なる値があれば一覧を表示します（辞書順依存だった部分一致の差分確認用）。
+
+使用方法:
+  python bench_safe_map.py [--repeat 200]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.api.services.mapping_normalizer import CompiledMapping
+from src.api.services.slack_list_importer import SlackListImporter
+
+STAFF_CSV = "人材管理リスト鹿児島.csv"
+VISA_CSV = "ビザ申請依頼リスト.csv"
+
+# (CSV, 列名, マッピング, 既定値) — _parse_staff_row / import_visa_rows と同じ組み合わせ
+COLUMNS = [
+    (STAFF_CSV, "国籍", SlackListImporter.NATIONALITY_MAP, "other"),
+    (STAFF_CSV, "現在の在留資格", SlackListImporter.VISA_TYPE_MAP, "other"),
+    (STAFF_CSV, "申請の在留資格", SlackListImporter.VISA_TYPE_MAP, None),
+    (STAFF_CSV, "ビザ種類", SlackListImporter.VISA_CATEGORY_MAP, "dispatch"),
+    (VISA_CSV, "申請種類", SlackListImporter.CASE_TYPE_MAP, "notification"),
+]
+
+
+def legacy_safe_map(value, mapping, default=None):
+    """旧実装（比較用にそのまま残す）"""
+    if value is None:
+        return mapping.get(None, default)
+    normalized = value.strip()
+    normalized = normalized.translate(str.maketrans(
+        'ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ０１２３４５６７８９',
+        'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+    ))
+    if normalized in mapping:
+        return mapping[normalized]
+    for key, mapped_value in mapping.items():
+        if key and normalized and key in normalized:
+            return mapped_value
+    return default or mapping.get('', default)
+
+
+def load_calls():
+    """(値, マッピング, 既定値) の呼び出し列"""
+    calls = []
+    for path, column, mapping, default in COLUMNS:
+        if not os.path.exists(path):
+            print(f"⚠️ {path} が見つかりません。スキップします。")
+            continue
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                calls.append((row.get(column), mapping, default))
+    return calls
+
+
+def bench(label, func, calls, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for value, mapping, default in calls:
+            func(value, mapping, default)
+    elapsed = time.perf_counter() - started
+    per_call_us = elapsed / (repeat * len(calls)) * 1e6
+    print(f"  {label:<18} {per_call_us:7.3f} µs/call   total {elapsed * 1000:8.1f} ms")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="safe_map のマイクロベンチマーク")
+    parser.add_argument("--repeat", type=int, default=200, help="全呼び出しの繰り返し回数")
+    args = parser.parse_args()
+
+    calls = load_calls()
+    if not calls:
+        return
+    print(f"📊 {len(calls)} 呼び出し × {args.repeat} 回")
+
+    legacy = bench("legacy safe_map", legacy_safe_map, calls, args.repeat)
+    compiled = bench("CompiledMapping", SlackListImporter.safe_map, calls, args.repeat)
+    print(f"  speedup            {legacy / compiled:7.1f}x")
+
+    diffs = {}
+    for value, mapping, default in calls:
+        before = legacy_safe_map(value, mapping, default)
+        after = CompiledMapping.for_mapping(mapping).lookup(value, default)
+        if before != after:
+            diffs[value] = (before, after)
+    if diffs:
+        print(f"\n🔍 結果が変わる値: {len(diffs)} 件")
+        for value, (before, after) in sorted(diffs.items(), key=lambda d: str(d[0])):
+            print(f"  {value!r}: {before} → {after}")
+
+
+if __name__ == "__main__":
+    main()
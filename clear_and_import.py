@@ -13,8 +13,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.api.models.tenant import Tenant
-from src.api.services.slack_list_importer import SlackListImporter
-from src.api.services.smarthr_importer import SmartHRImporter
+from src.api.services.import_pipeline import ImportPipeline
 
 DB_URL = os.environ.get(
     "DATABASE_URL", 
@@ -82,49 +81,49 @@ async def import_data():
             return
         tenant_id, tenant_name = row
         print(f"📦 テナント: {tenant_name}")
-        
-        # 1. 人材管理リスト
-        csv_files = glob.glob("人材管理リスト*.csv")
-        if csv_files:
-            file_path = csv_files[0]
-            print(f"\n📖 {file_path} を読み込み中...")
-            with open(file_path, "r", encoding="utf-8-sig") as f:
-                content = f.read()
-            line_count = len(content.strip().split("\n")) - 1
-            print(f"   📊 データ行数: {line_count}件")
-            result = await SlackListImporter.import_staff_list(db, content, tenant_id)
-            print(f"   ✅ 新規: {result['success_count']}件, 更新: {result.get('update_count', 0)}件")
-            if result['errors']:
-                print(f"   ⚠️ エラー: {len(result['errors'])}件")
+
+    # 企業 → 人材管理リスト → (ビザ申請依頼リスト ‖ SmartHR) の順に、独立したステージは並行で実行
+    staff_files = glob.glob("人材管理リスト*.csv")
+    smarthr_files = glob.glob("SmartHR_crews_*.csv")
+    paths = {
+        "staff": staff_files[0] if staff_files else None,
+        "visa": "ビザ申請依頼リスト.csv" if os.path.exists("ビザ申請依頼リスト.csv") else None,
+        "smarthr": smarthr_files[0] if smarthr_files else None,
+    }
+    missing = {"staff": "人材管理リスト*.csv", "visa": "ビザ申請依頼リスト.csv", "smarthr": "SmartHR_crews_*.csv"}
+    for key, path in paths.items():
+        if path:
+            print(f"\n📖 {path} を読み込み中...")
         else:
-            print("⚠️ 人材管理リスト*.csv が見つかりません")
-        
-        # 2. ビザ申請依頼リスト
-        if os.path.exists("ビザ申請依頼リスト.csv"):
-            print(f"\n📖 ビザ申請依頼リスト.csv を読み込み中...")
-            with open("ビザ申請依頼リスト.csv", "r", encoding="utf-8-sig") as f:
-                content = f.read()
-            line_count = len(content.strip().split("\n")) - 1
-            print(f"   📊 データ行数: {line_count}件")
-            result = await SlackListImporter.import_visa_list(db, content, tenant_id)
+            print(f"⚠️ {missing[key]} が見つかりません")
+
+    pipeline = ImportPipeline(
+        SessionLocal, tenant_id,
+        staff_path=paths["staff"], visa_path=paths["visa"], smarthr_path=paths["smarthr"]
+    )
+    timings = await pipeline.run()
+
+    for key in ("staff", "visa", "smarthr"):
+        timing = timings[key]
+        if timing.skipped:
+            continue
+        print(f"\n📄 {paths[key]}")
+        if timing.error:
+            print(f"   ❌ エラー: {timing.error}")
+            continue
+        result = timing.result
+        print(f"   📊 データ行数: {timing.rows}件")
+        if key == "visa":
             print(f"   ✅ 新規: {result['success_count']}件, スキップ: {result['skip_count']}件")
         else:
-            print("⚠️ ビザ申請依頼リスト.csv が見つかりません")
-        
-        # 3. SmartHR
-        smarthr_files = glob.glob("SmartHR_crews_*.csv")
-        if smarthr_files:
-            file_path = smarthr_files[0]
-            print(f"\n📖 {file_path} を読み込み中...")
-            with open(file_path, "r", encoding="utf-8-sig") as f:
-                content = f.read()
-            line_count = len(content.strip().split("\n")) - 1
-            print(f"   📊 データ行数: {line_count}件")
-            result = await SmartHRImporter.import_csv(db, content, tenant_id)
             print(f"   ✅ 新規: {result['success_count']}件, 更新: {result.get('update_count', 0)}件")
-        else:
-            print("⚠️ SmartHR_crews_*.csv が見つかりません")
-        
+        if key == "staff" and result['errors']:
+            print(f"   ⚠️ エラー: {len(result['errors'])}件")
+
+    print("\n⏱️  ステージ別の処理時間")
+    print(ImportPipeline.format_report(timings, pipeline.elapsed))
+
+    async with SessionLocal() as db:
         # サマリー表示
         result = await db.execute(text("""
             SELECT 
@@ -7,6 +7,9 @@
 2. ビザ申請依頼リスト.csv - ビザ案件情報
 3. SmartHR_crews_*.csv - SmartHR従業員データ
 
+企業名の解決 → 人材管理リスト → ビザ申請依頼リスト・SmartHR（並行）の順に
+ImportPipeline で取り込み、ステージごとの処理時間とスループットを表示します。
+
 使用方法:
   python import_local_data.py
 
@@ -26,8 +29,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.api.models.tenant import Tenant
-from src.api.services.slack_list_importer import SlackListImporter
-from src.api.services.smarthr_importer import SmartHRImporter
+from src.api.services.import_pipeline import ImportPipeline
 
 # データベース接続設定
 DB_URL = os.environ.get(
@@ -110,61 +112,18 @@ async def get_or_create_tenant(db: AsyncSession) -> UUID:
     
     return tenant.tenant_id, tenant.name
 
-async def import_staff_list(db: AsyncSession, tenant_id: UUID):
-    """人材管理リストのインポート"""
-    file_path = "人材管理リスト鹿児島.csv"
-    
-    if not os.path.exists(file_path):
-        print(f"    ⚠️ {file_path} が見つかりません。スキップします。")
-        return None
-    
-    print(f"    📖 読み込み中: {file_path}")
-    with open(file_path, "r", encoding="utf-8-sig") as f:
-        content = f.read()
-    
-    line_count = len(content.strip().split("\n")) - 1  # ヘッダー除く
-    print(f"    📊 データ行数: {line_count} 件")
-    
-    result = await SlackListImporter.import_staff_list(db, content, tenant_id)
-    return result
-
-async def import_visa_list(db: AsyncSession, tenant_id: UUID):
-    """ビザ申請依頼リストのインポート"""
-    file_path = "ビザ申請依頼リスト.csv"
-    
-    if not os.path.exists(file_path):
-        print(f"    ⚠️ {file_path} が見つかりません。スキップします。")
-        return None
-    
-    print(f"    📖 読み込み中: {file_path}")
-    with open(file_path, "r", encoding="utf-8-sig") as f:
-        content = f.read()
-    
-    line_count = len(content.strip().split("\n")) - 1
-    print(f"    📊 データ行数: {line_count} 件")
-    
-    result = await SlackListImporter.import_visa_list(db, content, tenant_id)
-    return result
-
-async def import_smarthr(db: AsyncSession, tenant_id: UUID):
-    """SmartHRデータのインポート"""
-    smarthr_files = glob.glob("SmartHR_crews_*.csv")
-    
-    if not smarthr_files:
-        print("    ⚠️ SmartHR CSV が見つかりません。スキップします。")
-        return None
-    
-    file_path = smarthr_files[0]  # 最初のファイルを使用
-    print(f"    📖 読み込み中: {file_path}")
-    
-    with open(file_path, "r", encoding="utf-8-sig") as f:
-        content = f.read()
-    
-    line_count = len(content.strip().split("\n")) - 1
-    print(f"    📊 データ行数: {line_count} 件")
-    
-    result = await SmartHRImporter.import_csv(db, content, tenant_id)
-    return result
+def find_input_files() -> dict:
+    """インポート対象のファイルパス（見つからないものは None）"""
+    smarthr_files = sorted(glob.glob("SmartHR_crews_*.csv"))
+    paths = {
+        "staff": "人材管理リスト鹿児島.csv",
+        "visa": "ビザ申請依頼リスト.csv",
+        "smarthr": smarthr_files[0] if smarthr_files else None,  # 最初のファイルを使用
+    }
+    for key, path in paths.items():
+        if path and not os.path.exists(path):
+            paths[key] = None
+    return paths
 
 async def show_summary(db: AsyncSession, tenant_id: UUID):
     """インポート後のサマリー表示"""
@@ -227,26 +186,38 @@ async def main():
     async with SessionLocal() as db:
         # テナント取得
         tenant_id, tenant_name = await get_or_create_tenant(db)
-        print(f"📦 テナント: {tenant_name} ({tenant_id})")
-        
-        # 1. 人材管理リスト
-        print_section("人材管理リスト (Slackリスト)")
-        result = await import_staff_list(db, tenant_id)
-        if result:
-            print_result(result, "人材管理リスト鹿児島.csv")
-        
-        # 2. ビザ申請依頼リスト
-        print_section("ビザ申請依頼リスト")
-        result = await import_visa_list(db, tenant_id)
-        if result:
-            print_result(result, "ビザ申請依頼リスト.csv")
-        
-        # 3. SmartHR
-        print_section("SmartHR 従業員データ")
-        result = await import_smarthr(db, tenant_id)
-        if result:
-            print_result(result, "SmartHR_crews_*.csv")
-        
+    print(f"📦 テナント: {tenant_name} ({tenant_id})")
+
+    # 企業 → 人材管理リスト → (ビザ申請依頼リスト ‖ SmartHR) の順に、独立したステージは並行で実行
+    paths = find_input_files()
+    for label, key in (("人材管理リスト", "staff"), ("ビザ申請依頼リスト", "visa"), ("SmartHR", "smarthr")):
+        if paths[key]:
+            print(f"    📖 {label}: {paths[key]}")
+        else:
+            print(f"    ⚠️ {label} が見つかりません。スキップします。")
+
+    pipeline = ImportPipeline(
+        SessionLocal, tenant_id,
+        staff_path=paths["staff"], visa_path=paths["visa"], smarthr_path=paths["smarthr"]
+    )
+    timings = await pipeline.run()
+
+    for title, key in (
+        ("人材管理リスト (Slackリスト)", "staff"),
+        ("ビザ申請依頼リスト", "visa"),
+        ("SmartHR 従業員データ", "smarthr"),
+    ):
+        print_section(title)
+        timing = timings[key]
+        if timing.error:
+            print(f"    ❌ エラー: {timing.error}")
+        elif timing.result:
+            print_result(timing.result, os.path.basename(paths[key]))
+
+    print_section("ステージ別の処理時間")
+    print(ImportPipeline.format_report(timings, pipeline.elapsed))
+
+    async with SessionLocal() as db:
         # サマリー表示
         await show_summary(db, tenant_id)
     
@@ -0,0 +1,15 @@
+-- =============================================================================
+-- 021_org_trigram_indexes.sql
+-- 企業名のあいまい一致（類似度順）用 pg_trgm GIN インデックス
+-- =============================================================================
+
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+-- organizations.name の類似度検索（name % :input / similarity()）
+CREATE INDEX IF NOT EXISTS idx_org_name_trgm
+    ON organizations USING gin (name gin_trgm_ops)
+    WHERE deleted_at IS NULL;
+
+-- organization_aliases.alias_name の類似度検索
+CREATE INDEX IF NOT EXISTS idx_org_alias_name_trgm
+    ON organization_aliases USING gin (alias_name gin_trgm_ops);
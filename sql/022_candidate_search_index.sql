@@ -0,0 +1,169 @@
+-- =============================================================================
+-- 022_candidate_search_index.sql
+-- 候補者検索用の実体化インデックステーブル（1人1行、トリガーで差分更新）
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS candidate_search_index (
+    person_id UUID PRIMARY KEY REFERENCES people(person_id) ON DELETE CASCADE,
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id),
+
+    full_name TEXT,
+    last_kana TEXT,
+    first_kana TEXT,
+    search_kana TEXT,  -- キーワード検索用（カナを連結）
+
+    nationality VARCHAR(50),
+    current_status person_status,
+    visa_type TEXT,
+    visa_expiry DATE,
+    employment_status employment_status,  -- 有効な雇用を優先した代表1件
+
+    email TEXT,
+    phone TEXT,
+    skills JSONB NOT NULL DEFAULT '[]',
+    preferred_regions JSONB NOT NULL DEFAULT '[]',
+    expected_hourly_rate INTEGER,
+
+    indexed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_csi_tenant_nationality ON candidate_search_index (tenant_id, nationality);
+CREATE INDEX IF NOT EXISTS idx_csi_tenant_visa_type ON candidate_search_index (tenant_id, visa_type);
+CREATE INDEX IF NOT EXISTS idx_csi_tenant_visa_expiry ON candidate_search_index (tenant_id, visa_expiry, person_id);
+CREATE INDEX IF NOT EXISTS idx_csi_skills ON candidate_search_index USING gin (skills);
+CREATE INDEX IF NOT EXISTS idx_csi_regions ON candidate_search_index USING gin (preferred_regions);
+CREATE INDEX IF NOT EXISTS idx_csi_full_name_trgm ON candidate_search_index USING gin (full_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_csi_kana_trgm ON candidate_search_index USING gin (search_kana gin_trgm_ops);
+
+-- 指定した人材の索引行を再計算（削除済み・存在しない人材は索引から除外）
+CREATE OR REPLACE FUNCTION fn_refresh_candidate_search_index(p_person_ids UUID[])
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM candidate_search_index c
+    WHERE c.person_id = ANY(p_person_ids)
+      AND NOT EXISTS (
+          SELECT 1 FROM people p
+          WHERE p.person_id = c.person_id AND p.deleted_at IS NULL
+      );
+
+    INSERT INTO candidate_search_index (
+        person_id, tenant_id, full_name, last_kana, first_kana, search_kana,
+        nationality, current_status, visa_type, visa_expiry, employment_status,
+        email, phone, skills, preferred_regions, expected_hourly_rate, indexed_at
+    )
+    SELECT
+        p.person_id,
+        p.tenant_id,
+        p.names->>'full_name',
+        p.names->>'full_name_kana',
+        '',
+        concat_ws(' ', p.names->>'full_name_kana', p.names->>'legal_last_kana', p.names->>'legal_first_kana'),
+        p.nationality,
+        p.current_status,
+        p.current_visa_type::TEXT,
+        p.visa_expiry_date,
+        e.status,
+        p.names->>'email',
+        p.contact_info->>'phone',
+        COALESCE(p.skills, '[]'),
+        COALESCE(p.preferred_regions, '[]'),
+        p.expected_hourly_rate,
+        NOW()
+    FROM people p
+    LEFT JOIN LATERAL (
+        SELECT em.status
+        FROM employments em
+        WHERE em.person_id = p.person_id AND em.deleted_at IS NULL
+        ORDER BY (em.status = 'active') DESC, em.start_date DESC
+        LIMIT 1
+    ) e ON TRUE
+    WHERE p.person_id = ANY(p_person_ids)
+      AND p.deleted_at IS NULL
+    ON CONFLICT (person_id) DO UPDATE SET
+        tenant_id = EXCLUDED.tenant_id,
+        full_name = EXCLUDED.full_name,
+        last_kana = EXCLUDED.last_kana,
+        first_kana = EXCLUDED.first_kana,
+        search_kana = EXCLUDED.search_kana,
+        nationality = EXCLUDED.nationality,
+        current_status = EXCLUDED.current_status,
+        visa_type = EXCLUDED.visa_type,
+        visa_expiry = EXCLUDED.visa_expiry,
+        employment_status = EXCLUDED.employment_status,
+        email = EXCLUDED.email,
+        phone = EXCLUDED.phone,
+        skills = EXCLUDED.skills,
+        preferred_regions = EXCLUDED.preferred_regions,
+        expected_hourly_rate = EXCLUDED.expected_hourly_rate,
+        indexed_at = EXCLUDED.indexed_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 文レベルトリガー（遷移テーブル）で、一括 UPSERT でも1文につき1回だけ再計算する
+CREATE OR REPLACE FUNCTION fn_trg_candidate_search_index()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM fn_refresh_candidate_search_index(ARRAY(SELECT DISTINCT person_id FROM old_rows));
+    ELSE
+        PERFORM fn_refresh_candidate_search_index(ARRAY(SELECT DISTINCT person_id FROM new_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_people_csi_insert ON people;
+CREATE TRIGGER trg_people_csi_insert
+AFTER INSERT ON people
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION fn_trg_candidate_search_index();
+
+DROP TRIGGER IF EXISTS trg_people_csi_update ON people;
+CREATE TRIGGER trg_people_csi_update
+AFTER UPDATE ON people
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION fn_trg_candidate_search_index();
+
+DROP TRIGGER IF EXISTS trg_employments_csi_insert ON employments;
+CREATE TRIGGER trg_employments_csi_insert
+AFTER INSERT ON employments
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION fn_trg_candidate_search_index();
+
+DROP TRIGGER IF EXISTS trg_employments_csi_update ON employments;
+CREATE TRIGGER trg_employments_csi_update
+AFTER UPDATE ON employments
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION fn_trg_candidate_search_index();
+
+DROP TRIGGER IF EXISTS trg_employments_csi_delete ON employments;
+CREATE TRIGGER trg_employments_csi_delete
+AFTER DELETE ON employments
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION fn_trg_candidate_search_index();
+
+-- 既存データの初期投入
+SELECT fn_refresh_candidate_search_index(ARRAY(SELECT person_id FROM people));
+ANALYZE candidate_search_index;
+
+-- 互換用: v_candidate_search を索引テーブル（1人1行）から提供
+DROP VIEW IF EXISTS v_candidate_search;
+
+CREATE VIEW v_candidate_search AS
+SELECT
+    person_id,
+    tenant_id,
+    full_name,
+    last_kana,
+    first_kana,
+    nationality,
+    current_status,
+    visa_type,
+    visa_expiry,
+    employment_status,
+    email,
+    phone,
+    skills AS skills_json,
+    preferred_regions AS regions_json,
+    expected_hourly_rate
+FROM candidate_search_index;
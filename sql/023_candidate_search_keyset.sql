@@ -0,0 +1,10 @@
+-- =============================================================================
+-- 023_candidate_search_keyset.sql
+-- 候補者検索のキーセットページング用インデックス
+-- ソートキー: (COALESCE(visa_expiry, 'infinity'), person_id)  ※期限なしは末尾
+-- =============================================================================
+
+DROP INDEX IF EXISTS idx_csi_tenant_visa_expiry;
+
+CREATE INDEX IF NOT EXISTS idx_csi_tenant_expiry_keyset
+    ON candidate_search_index (tenant_id, (COALESCE(visa_expiry, 'infinity'::date)), person_id);
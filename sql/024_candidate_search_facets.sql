@@ -0,0 +1,7 @@
+-- =============================================================================
+-- 024_candidate_search_facets.sql
+-- ファセット件数キャッシュの無効化判定用（テナント単位の索引最終更新時刻）
+-- =============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_csi_tenant_indexed_at
+    ON candidate_search_index (tenant_id, indexed_at DESC);
@@ -0,0 +1,345 @@
+-- =============================================================================
+-- 025_kpi_rollups.sql
+-- KPI 月次ロールアップ（テナント×月×企業 / 人材 / 会社全体）
+-- 元テーブルの変更をトリガーで差分反映し、/kpi は集計済みの行のみを読む
+-- =============================================================================
+
+-- 企業別（事業区分は読み取り時に organizations.business_division から取得）
+CREATE TABLE IF NOT EXISTS kpi_monthly_client_rollup (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id),
+    period_month DATE NOT NULL,  -- 月初日
+    client_org_id UUID NOT NULL REFERENCES organizations(org_id),
+
+    revenue BIGINT NOT NULL DEFAULT 0,            -- confirmed の売上
+    total_hours DECIMAL(12,2) NOT NULL DEFAULT 0, -- confirmed の稼働時間
+    scheduled_days INTEGER NOT NULL DEFAULT 0,    -- planned / confirmed / absent の人日
+    worked_days INTEGER NOT NULL DEFAULT 0,       -- confirmed の人日
+
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, period_month, client_org_id)
+);
+
+-- 人材×企業別の稼働日数（稼働人数の重複排除用）
+CREATE TABLE IF NOT EXISTS kpi_monthly_worker_rollup (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id),
+    period_month DATE NOT NULL,
+    client_org_id UUID NOT NULL REFERENCES organizations(org_id),
+    person_id UUID NOT NULL REFERENCES people(person_id) ON DELETE CASCADE,
+
+    worked_days INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (tenant_id, period_month, client_org_id, person_id)
+);
+
+-- 会社全体
+CREATE TABLE IF NOT EXISTS kpi_monthly_company_rollup (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id),
+    period_month DATE NOT NULL,
+
+    new_workers INTEGER NOT NULL DEFAULT 0,      -- 雇用開始日がその月の雇用
+    new_clients INTEGER NOT NULL DEFAULT 0,      -- その月に登録された派遣先企業
+    deals_won INTEGER NOT NULL DEFAULT 0,
+    deals_lost INTEGER NOT NULL DEFAULT 0,
+    notices_due INTEGER NOT NULL DEFAULT 0,      -- 届出期限がその月の届出
+    notices_on_time INTEGER NOT NULL DEFAULT 0,  -- 期限内に提出済み
+    notices_late INTEGER NOT NULL DEFAULT 0,     -- 期限後に提出
+
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, period_month)
+);
+
+-- -----------------------------------------------------------------------------
+-- 日次稼働 → 企業別・人材別ロールアップ
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION fn_kpi_apply_operation(r daily_operations, sign INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_month DATE := date_trunc('month', r.operation_date)::DATE;
+    v_confirmed BOOLEAN := r.status = 'confirmed';
+    v_scheduled BOOLEAN := r.status IN ('planned', 'confirmed', 'absent');
+BEGIN
+    IF NOT v_scheduled THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO kpi_monthly_client_rollup AS k (
+        tenant_id, period_month, client_org_id, revenue, total_hours, scheduled_days, worked_days
+    ) VALUES (
+        r.tenant_id, v_month, r.client_org_id,
+        CASE WHEN v_confirmed THEN sign * COALESCE(r.total_revenue, 0) ELSE 0 END,
+        CASE WHEN v_confirmed THEN sign * COALESCE(r.worked_hours, 0) ELSE 0 END,
+        sign,
+        CASE WHEN v_confirmed THEN sign ELSE 0 END
+    )
+    ON CONFLICT (tenant_id, period_month, client_org_id) DO UPDATE SET
+        revenue = k.revenue + EXCLUDED.revenue,
+        total_hours = k.total_hours + EXCLUDED.total_hours,
+        scheduled_days = k.scheduled_days + EXCLUDED.scheduled_days,
+        worked_days = k.worked_days + EXCLUDED.worked_days,
+        updated_at = NOW();
+
+    IF v_confirmed THEN
+        INSERT INTO kpi_monthly_worker_rollup AS w (
+            tenant_id, period_month, client_org_id, person_id, worked_days
+        ) VALUES (
+            r.tenant_id, v_month, r.client_org_id, r.person_id, sign
+        )
+        ON CONFLICT (tenant_id, period_month, client_org_id, person_id) DO UPDATE SET
+            worked_days = w.worked_days + EXCLUDED.worked_days;
+
+        DELETE FROM kpi_monthly_worker_rollup
+        WHERE tenant_id = r.tenant_id AND period_month = v_month
+          AND client_org_id = r.client_org_id AND person_id = r.person_id
+          AND worked_days <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_trg_kpi_daily_operations()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_kpi_apply_operation(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_kpi_apply_operation(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_kpi_daily_operations ON daily_operations;
+CREATE TRIGGER trg_kpi_daily_operations
+AFTER INSERT OR UPDATE OR DELETE ON daily_operations
+FOR EACH ROW EXECUTE FUNCTION fn_trg_kpi_daily_operations();
+
+-- -----------------------------------------------------------------------------
+-- 会社全体ロールアップ（雇用・企業・商談・届出）
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION fn_kpi_bump_company(p_tenant_id UUID, p_day DATE, p_column TEXT, p_delta INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF p_day IS NULL OR p_delta = 0 THEN
+        RETURN;
+    END IF;
+    EXECUTE format(
+        'INSERT INTO kpi_monthly_company_rollup AS k (tenant_id, period_month, %1$I)
+         VALUES ($1, $2, $3)
+         ON CONFLICT (tenant_id, period_month) DO UPDATE SET
+             %1$I = k.%1$I + EXCLUDED.%1$I,
+             updated_at = NOW()',
+        p_column
+    ) USING p_tenant_id, date_trunc('month', p_day)::DATE, p_delta;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 新規人材: 雇用開始日の月
+CREATE OR REPLACE FUNCTION fn_trg_kpi_employments()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+        PERFORM fn_kpi_bump_company(OLD.tenant_id, OLD.start_date, 'new_workers', -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+        PERFORM fn_kpi_bump_company(NEW.tenant_id, NEW.start_date, 'new_workers', 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_kpi_employments ON employments;
+CREATE TRIGGER trg_kpi_employments
+AFTER INSERT OR UPDATE OF start_date, deleted_at OR DELETE ON employments
+FOR EACH ROW EXECUTE FUNCTION fn_trg_kpi_employments();
+
+-- 新規取引先: 派遣先企業の登録月
+CREATE OR REPLACE FUNCTION fn_trg_kpi_organizations()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL AND OLD.org_type = 'client_company' THEN
+        PERFORM fn_kpi_bump_company(OLD.tenant_id, OLD.created_at::DATE, 'new_clients', -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL AND NEW.org_type = 'client_company' THEN
+        PERFORM fn_kpi_bump_company(NEW.tenant_id, NEW.created_at::DATE, 'new_clients', 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_kpi_organizations ON organizations;
+CREATE TRIGGER trg_kpi_organizations
+AFTER INSERT OR UPDATE OF org_type, created_at, deleted_at OR DELETE ON organizations
+FOR EACH ROW EXECUTE FUNCTION fn_trg_kpi_organizations();
+
+-- 商談成約率: won / lost になった月（deals.closed_at）
+-- updated_at はメモ・金額などの編集でも更新されるため使わず、ステータスが変わったときだけ
+-- closed_at を設定する（won / lost 以外に戻れば NULL）
+ALTER TABLE deals ADD COLUMN IF NOT EXISTS closed_at TIMESTAMPTZ;
+
+UPDATE deals
+SET closed_at = COALESCE(updated_at, created_at)
+WHERE status IN ('won', 'lost') AND closed_at IS NULL;
+
+CREATE OR REPLACE FUNCTION fn_trg_deals_closed_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' OR NEW.status IS DISTINCT FROM OLD.status THEN
+        IF NEW.status IN ('won', 'lost') THEN
+            NEW.closed_at := CASE WHEN TG_OP = 'INSERT' THEN COALESCE(NEW.closed_at, NEW.created_at, NOW()) ELSE NOW() END;
+        ELSE
+            NEW.closed_at := NULL;
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_deals_closed_at ON deals;
+CREATE TRIGGER trg_deals_closed_at
+BEFORE INSERT OR UPDATE OF status ON deals
+FOR EACH ROW EXECUTE FUNCTION fn_trg_deals_closed_at();
+
+CREATE OR REPLACE FUNCTION fn_trg_kpi_deals()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL AND OLD.status IN ('won', 'lost') THEN
+        PERFORM fn_kpi_bump_company(
+            OLD.tenant_id, OLD.closed_at::DATE,
+            CASE OLD.status WHEN 'won' THEN 'deals_won' ELSE 'deals_lost' END, -1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL AND NEW.status IN ('won', 'lost') THEN
+        PERFORM fn_kpi_bump_company(
+            NEW.tenant_id, NEW.closed_at::DATE,
+            CASE NEW.status WHEN 'won' THEN 'deals_won' ELSE 'deals_lost' END, 1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_kpi_deals ON deals;
+CREATE TRIGGER trg_kpi_deals
+AFTER INSERT OR UPDATE OF status, closed_at, deleted_at OR DELETE ON deals
+FOR EACH ROW EXECUTE FUNCTION fn_trg_kpi_deals();
+
+-- 届出遵守率: 期限月ごとの件数と、期限内 / 期限後の提出件数
+CREATE OR REPLACE FUNCTION fn_kpi_apply_notice(r immigration_notices, sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF r.deleted_at IS NOT NULL THEN
+        RETURN;
+    END IF;
+    PERFORM fn_kpi_bump_company(r.tenant_id, r.deadline_date, 'notices_due', sign);
+    IF r.submitted_at IS NOT NULL THEN
+        PERFORM fn_kpi_bump_company(
+            r.tenant_id, r.deadline_date,
+            CASE WHEN r.submitted_at::DATE <= r.deadline_date THEN 'notices_on_time' ELSE 'notices_late' END,
+            sign
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_trg_kpi_immigration_notices()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_kpi_apply_notice(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_kpi_apply_notice(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_kpi_immigration_notices ON immigration_notices;
+CREATE TRIGGER trg_kpi_immigration_notices
+AFTER INSERT OR UPDATE OF event_date, submitted_at, deleted_at OR DELETE ON immigration_notices
+FOR EACH ROW EXECUTE FUNCTION fn_trg_kpi_immigration_notices();
+
+-- -----------------------------------------------------------------------------
+-- 再構築（初期投入・検証後の修復用）
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION fn_rebuild_kpi_rollups(p_tenant_id UUID, p_from DATE, p_to DATE)
+RETURNS VOID AS $$
+DECLARE
+    v_from DATE := date_trunc('month', p_from)::DATE;
+    v_to DATE := (date_trunc('month', p_to) + INTERVAL '1 month')::DATE;  -- 排他的上限
+BEGIN
+    DELETE FROM kpi_monthly_client_rollup
+    WHERE tenant_id = p_tenant_id AND period_month >= v_from AND period_month < v_to;
+    DELETE FROM kpi_monthly_worker_rollup
+    WHERE tenant_id = p_tenant_id AND period_month >= v_from AND period_month < v_to;
+    DELETE FROM kpi_monthly_company_rollup
+    WHERE tenant_id = p_tenant_id AND period_month >= v_from AND period_month < v_to;
+
+    INSERT INTO kpi_monthly_client_rollup (
+        tenant_id, period_month, client_org_id, revenue, total_hours, scheduled_days, worked_days
+    )
+    SELECT
+        tenant_id,
+        date_trunc('month', operation_date)::DATE,
+        client_org_id,
+        COALESCE(SUM(total_revenue) FILTER (WHERE status = 'confirmed'), 0),
+        COALESCE(SUM(worked_hours) FILTER (WHERE status = 'confirmed'), 0),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'confirmed')
+    FROM daily_operations
+    WHERE tenant_id = p_tenant_id
+      AND operation_date >= v_from AND operation_date < v_to
+      AND status IN ('planned', 'confirmed', 'absent')
+    GROUP BY tenant_id, date_trunc('month', operation_date), client_org_id;
+
+    INSERT INTO kpi_monthly_worker_rollup (tenant_id, period_month, client_org_id, person_id, worked_days)
+    SELECT tenant_id, date_trunc('month', operation_date)::DATE, client_org_id, person_id, COUNT(*)
+    FROM daily_operations
+    WHERE tenant_id = p_tenant_id
+      AND operation_date >= v_from AND operation_date < v_to
+      AND status = 'confirmed'
+    GROUP BY tenant_id, date_trunc('month', operation_date), client_org_id, person_id;
+
+    INSERT INTO kpi_monthly_company_rollup (
+        tenant_id, period_month, new_workers, new_clients, deals_won, deals_lost,
+        notices_due, notices_on_time, notices_late
+    )
+    SELECT p_tenant_id, m.period_month,
+        SUM(m.new_workers), SUM(m.new_clients), SUM(m.deals_won), SUM(m.deals_lost),
+        SUM(m.notices_due), SUM(m.notices_on_time), SUM(m.notices_late)
+    FROM (
+        SELECT date_trunc('month', start_date)::DATE AS period_month,
+               1 AS new_workers, 0 AS new_clients, 0 AS deals_won, 0 AS deals_lost,
+               0 AS notices_due, 0 AS notices_on_time, 0 AS notices_late
+        FROM employments
+        WHERE tenant_id = p_tenant_id AND deleted_at IS NULL
+          AND start_date >= v_from AND start_date < v_to
+        UNION ALL
+        SELECT date_trunc('month', created_at)::DATE, 0, 1, 0, 0, 0, 0, 0
+        FROM organizations
+        WHERE tenant_id = p_tenant_id AND deleted_at IS NULL AND org_type = 'client_company'
+          AND created_at::DATE >= v_from AND created_at::DATE < v_to
+        UNION ALL
+        SELECT date_trunc('month', closed_at)::DATE, 0, 0,
+               (status = 'won')::INT, (status = 'lost')::INT, 0, 0, 0
+        FROM deals
+        WHERE tenant_id = p_tenant_id AND deleted_at IS NULL AND status IN ('won', 'lost')
+          AND closed_at::DATE >= v_from AND closed_at::DATE < v_to
+        UNION ALL
+        SELECT date_trunc('month', deadline_date)::DATE, 0, 0, 0, 0, 1,
+               (submitted_at IS NOT NULL AND submitted_at::DATE <= deadline_date)::INT,
+               (submitted_at IS NOT NULL AND submitted_at::DATE > deadline_date)::INT
+        FROM immigration_notices
+        WHERE tenant_id = p_tenant_id AND deleted_at IS NULL
+          AND deadline_date >= v_from AND deadline_date < v_to
+    ) m
+    GROUP BY m.period_month;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 既存データの初期投入（全テナント・全期間）
+SELECT fn_rebuild_kpi_rollups(t.tenant_id, DATE '2000-01-01', (CURRENT_DATE + INTERVAL '5 years')::DATE)
+FROM tenants t;
+
+CREATE INDEX IF NOT EXISTS idx_kpi_worker_rollup_month
+    ON kpi_monthly_worker_rollup (tenant_id, period_month);
@@ -0,0 +1,183 @@
+-- =============================================================================
+-- 026_daily_revenue_summary_delta.sql
+-- 日次売上サマリーの差分メンテナンス
+--   - daily_operations の INSERT / UPDATE / DELETE すべてを差分で反映
+--   - worker_count は行数ではなく人材の重複排除数
+--   - 日付範囲での再構築と、再計算との差分検証
+-- =============================================================================
+
+-- 人材×企業×日 の内訳（worker_count の重複排除と、事業区分・全体の人数集計に使う）
+CREATE TABLE IF NOT EXISTS daily_revenue_worker_summary (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id),
+    summary_date DATE NOT NULL,
+    client_org_id UUID NOT NULL REFERENCES organizations(org_id),
+    person_id UUID NOT NULL REFERENCES people(person_id) ON DELETE CASCADE,
+
+    op_count INTEGER NOT NULL DEFAULT 0,
+    total_hours DECIMAL(8,2) NOT NULL DEFAULT 0,
+    total_revenue INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (tenant_id, summary_date, client_org_id, person_id)
+);
+
+-- 旧トリガー（INSERT のみ・行数カウント）を廃止
+DROP TRIGGER IF EXISTS trg_confirmed_operation ON daily_operations;
+DROP FUNCTION IF EXISTS fn_update_daily_revenue_summary();
+
+-- -----------------------------------------------------------------------------
+-- 再構築
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION fn_rebuild_daily_revenue_summary(p_tenant_id UUID, p_from DATE, p_to DATE)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM daily_revenue_worker_summary
+    WHERE tenant_id = p_tenant_id AND summary_date BETWEEN p_from AND p_to;
+    DELETE FROM daily_revenue_summary
+    WHERE tenant_id = p_tenant_id AND summary_date BETWEEN p_from AND p_to;
+
+    INSERT INTO daily_revenue_worker_summary (
+        tenant_id, summary_date, client_org_id, person_id, op_count, total_hours, total_revenue
+    )
+    SELECT tenant_id, operation_date, client_org_id, person_id,
+           COUNT(*), COALESCE(SUM(worked_hours), 0), COALESCE(SUM(total_revenue), 0)
+    FROM daily_operations
+    WHERE tenant_id = p_tenant_id
+      AND operation_date BETWEEN p_from AND p_to
+      AND status = 'confirmed'
+    GROUP BY tenant_id, operation_date, client_org_id, person_id;
+
+    INSERT INTO daily_revenue_summary (
+        tenant_id, summary_date, region, client_org_id, worker_count, total_hours, total_revenue
+    )
+    SELECT w.tenant_id, w.summary_date, o.region, w.client_org_id,
+           COUNT(*), SUM(w.total_hours), SUM(w.total_revenue)
+    FROM daily_revenue_worker_summary w
+    JOIN organizations o ON o.org_id = w.client_org_id
+    WHERE w.tenant_id = p_tenant_id AND w.summary_date BETWEEN p_from AND p_to
+    GROUP BY w.tenant_id, w.summary_date, o.region, w.client_org_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 既存サマリーは worker_count が誤っているため全テナント・全期間を作り直す
+SELECT fn_rebuild_daily_revenue_summary(t.tenant_id, DATE '2000-01-01', (CURRENT_DATE + INTERVAL '5 years')::DATE)
+FROM tenants t;
+
+-- region は企業から決まるため、企業×日で一意。
+-- region が NULL の企業でも ON CONFLICT が効くよう region を含めないキーを使う
+CREATE UNIQUE INDEX IF NOT EXISTS uq_revenue_summary_client_day
+    ON daily_revenue_summary (tenant_id, summary_date, client_org_id);
+
+-- -----------------------------------------------------------------------------
+-- 差分反映
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION fn_apply_daily_revenue_delta(r daily_operations, sign INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_op_count INTEGER;
+    v_worker_delta INTEGER := 0;
+BEGIN
+    IF r.status IS DISTINCT FROM 'confirmed' THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO daily_revenue_worker_summary AS w (
+        tenant_id, summary_date, client_org_id, person_id, op_count, total_hours, total_revenue
+    ) VALUES (
+        r.tenant_id, r.operation_date, r.client_org_id, r.person_id,
+        sign, sign * COALESCE(r.worked_hours, 0), sign * COALESCE(r.total_revenue, 0)
+    )
+    ON CONFLICT (tenant_id, summary_date, client_org_id, person_id) DO UPDATE SET
+        op_count = w.op_count + EXCLUDED.op_count,
+        total_hours = w.total_hours + EXCLUDED.total_hours,
+        total_revenue = w.total_revenue + EXCLUDED.total_revenue
+    RETURNING w.op_count INTO v_op_count;
+
+    -- 人材がその企業・日で 0→1 件になれば +1、1→0 件になれば -1
+    IF sign > 0 AND v_op_count = 1 THEN
+        v_worker_delta := 1;
+    ELSIF sign < 0 AND v_op_count <= 0 THEN
+        v_worker_delta := -1;
+        DELETE FROM daily_revenue_worker_summary
+        WHERE tenant_id = r.tenant_id AND summary_date = r.operation_date
+          AND client_org_id = r.client_org_id AND person_id = r.person_id;
+    END IF;
+
+    INSERT INTO daily_revenue_summary AS s (
+        tenant_id, summary_date, region, client_org_id, worker_count, total_hours, total_revenue
+    )
+    SELECT r.tenant_id, r.operation_date, o.region, r.client_org_id,
+           v_worker_delta, sign * COALESCE(r.worked_hours, 0), sign * COALESCE(r.total_revenue, 0)
+    FROM organizations o WHERE o.org_id = r.client_org_id
+    ON CONFLICT (tenant_id, summary_date, client_org_id) DO UPDATE SET
+        worker_count = s.worker_count + EXCLUDED.worker_count,
+        total_hours = s.total_hours + EXCLUDED.total_hours,
+        total_revenue = s.total_revenue + EXCLUDED.total_revenue;
+
+    DELETE FROM daily_revenue_summary
+    WHERE tenant_id = r.tenant_id AND summary_date = r.operation_date
+      AND client_org_id = r.client_org_id AND worker_count <= 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_trg_daily_revenue_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_apply_daily_revenue_delta(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_apply_daily_revenue_delta(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_daily_revenue_summary ON daily_operations;
+CREATE TRIGGER trg_daily_revenue_summary
+AFTER INSERT OR UPDATE OR DELETE ON daily_operations
+FOR EACH ROW EXECUTE FUNCTION fn_trg_daily_revenue_summary();
+
+-- -----------------------------------------------------------------------------
+-- 検証（サマリーと daily_operations からの再計算の差分）
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION fn_verify_daily_revenue_summary(p_tenant_id UUID, p_from DATE, p_to DATE)
+RETURNS TABLE (
+    summary_date DATE,
+    client_org_id UUID,
+    expected_workers BIGINT,
+    actual_workers INTEGER,
+    expected_hours DECIMAL,
+    actual_hours DECIMAL,
+    expected_revenue BIGINT,
+    actual_revenue INTEGER
+) AS $$
+    WITH expected AS (
+        SELECT operation_date AS summary_date, client_org_id,
+               COUNT(DISTINCT person_id) AS workers,
+               COALESCE(SUM(worked_hours), 0) AS hours,
+               COALESCE(SUM(total_revenue), 0) AS revenue
+        FROM daily_operations
+        WHERE tenant_id = p_tenant_id
+          AND operation_date BETWEEN p_from AND p_to
+          AND status = 'confirmed'
+        GROUP BY operation_date, client_org_id
+    ),
+    actual AS (
+        SELECT summary_date, client_org_id, worker_count, total_hours, total_revenue
+        FROM daily_revenue_summary
+        WHERE tenant_id = p_tenant_id AND summary_date BETWEEN p_from AND p_to
+    )
+    SELECT
+        COALESCE(e.summary_date, a.summary_date),
+        COALESCE(e.client_org_id, a.client_org_id),
+        e.workers, a.worker_count,
+        e.hours, a.total_hours,
+        e.revenue, a.total_revenue
+    FROM expected e
+    FULL OUTER JOIN actual a
+      ON a.summary_date = e.summary_date AND a.client_org_id = e.client_org_id
+    WHERE e.workers IS DISTINCT FROM a.worker_count
+       OR e.hours IS DISTINCT FROM a.total_hours
+       OR e.revenue IS DISTINCT FROM a.total_revenue
+    ORDER BY 1, 2;
+$$ LANGUAGE sql STABLE;
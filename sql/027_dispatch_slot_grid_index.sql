@@ -0,0 +1,10 @@
+-- =============================================================================
+-- 027_dispatch_slot_grid_index.sql
+-- 派遣グリッド用インデックス（複数週の期間取得）
+-- =============================================================================
+
+-- グリッドは slot_date の範囲で実スロットのみを取得する
+CREATE INDEX IF NOT EXISTS idx_slots_live_date_client
+    ON dispatch_slots (slot_date, client_org_id)
+    INCLUDE (person_id)
+    WHERE is_simulation = FALSE;
@@ -0,0 +1,15 @@
+-- =============================================================================
+-- 028_worker_availability_indexes.sql
+-- 配置可能人材検索用インデックス
+-- =============================================================================
+
+-- 対象期間に有効な雇用の範囲検索（終了日なしは無期限として扱う）
+CREATE INDEX IF NOT EXISTS idx_emp_active_window
+    ON employments (COALESCE(end_date, 'infinity'::date), start_date)
+    INCLUDE (person_id, status)
+    WHERE deleted_at IS NULL;
+
+-- 人材×日の実スロット有無（NOT EXISTS 用）
+CREATE INDEX IF NOT EXISTS idx_slots_live_person_date
+    ON dispatch_slots (person_id, slot_date)
+    WHERE is_simulation = FALSE;
@@ -0,0 +1,28 @@
+-- =============================================================================
+-- 029_simulation_slot_deltas.sql
+-- シミュレーションセッションの差分（コピーオンライト）保存
+--
+-- セッションは実スロットを複製せず、変更分だけを is_simulation = TRUE の行で持つ:
+--   追加    base_slot_id IS NULL
+--   移動    base_slot_id = 実スロット、移動後の企業・日・人材を保持
+--   削除    base_slot_id = 実スロット、slot_status = 'removed'（墓標）
+-- =============================================================================
+
+ALTER TABLE dispatch_slots
+    ADD COLUMN IF NOT EXISTS base_slot_id UUID REFERENCES dispatch_slots(slot_id) ON DELETE CASCADE;
+
+-- セッション削除時に差分も消す
+ALTER TABLE dispatch_slots DROP CONSTRAINT IF EXISTS fk_slots_simulation_session;
+ALTER TABLE dispatch_slots
+    ADD CONSTRAINT fk_slots_simulation_session
+    FOREIGN KEY (simulation_session_id) REFERENCES simulation_sessions(session_id) ON DELETE CASCADE;
+
+-- セッションの差分取得・重ね合わせ用
+CREATE INDEX IF NOT EXISTS idx_slots_session_date
+    ON dispatch_slots (simulation_session_id, slot_date)
+    WHERE is_simulation = TRUE;
+
+-- 1セッション内で同じ実スロットへの差分は1行まで
+CREATE UNIQUE INDEX IF NOT EXISTS uq_slots_session_base
+    ON dispatch_slots (simulation_session_id, base_slot_id)
+    WHERE is_simulation = TRUE AND base_slot_id IS NOT NULL;
@@ -0,0 +1,39 @@
+-- =============================================================================
+-- 030_import_jobs.sql
+-- CSV インポートのバックグラウンドジョブ
+--
+-- アップロードされたファイルはジョブ行に保持し、ワーカーがチャンク単位でコミットしながら取り込む。
+-- 進捗（rows_committed と各件数）はチャンクのデータと同じトランザクションで更新するため、
+-- 失敗したジョブは rows_committed 行目の次から再開できる。
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS import_jobs (
+    job_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id),
+
+    import_type VARCHAR(30) NOT NULL,  -- 'slack_staff' | 'slack_visa' | 'smarthr'
+    options JSONB NOT NULL DEFAULT '{}',  -- {"bulk": true} など
+    file_name TEXT,
+    file_content BYTEA NOT NULL,
+
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- 'queued' | 'running' | 'completed' | 'failed'
+    attempts INTEGER NOT NULL DEFAULT 0,
+
+    -- 進捗（コミット済みチャンクの合計）
+    rows_committed INTEGER NOT NULL DEFAULT 0,
+    inserted_count INTEGER NOT NULL DEFAULT 0,
+    updated_count INTEGER NOT NULL DEFAULT 0,
+    skipped_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    errors JSONB NOT NULL DEFAULT '[]',  -- 先頭の行エラーのみ保持
+    last_error TEXT,
+
+    started_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_jobs_tenant_created
+    ON import_jobs (tenant_id, created_at DESC);
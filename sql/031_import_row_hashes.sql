@@ -0,0 +1,21 @@
+-- =============================================================================
+-- 031_import_row_hashes.sql
+-- インポート行のフィンガープリント（内容ハッシュ）
+--
+-- 取り込み元ごとに、正規化済みの行内容の SHA-256 を人材単位で保持する。
+-- 再インポート時にハッシュが一致した行は DB に書き込まずスキップする。
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS import_row_hashes (
+    tenant_id UUID NOT NULL REFERENCES tenants(tenant_id),
+    source VARCHAR(30) NOT NULL,  -- 'slack_staff' など
+    source_key TEXT NOT NULL,     -- 取り込み元での行のキー（slack_staff は氏名）
+    person_id UUID NOT NULL REFERENCES people(person_id) ON DELETE CASCADE,
+    row_hash CHAR(64) NOT NULL,
+    imported_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, source, source_key)
+);
+
+-- 人材削除時のカスケード・人材単位の参照用
+CREATE INDEX IF NOT EXISTS idx_import_row_hashes_person
+    ON import_row_hashes (person_id, source);
@@ -0,0 +1,15 @@
+-- =============================================================================
+-- 032_people_smarthr_crew_unique.sql
+-- SmartHR 社員番号による人材の一意照合
+--
+-- SmartHR の一括同期（SmartHRImporter.sync_csv_bulk）は社員番号で people を照合し、
+-- 氏名での照合は社員番号が未連携の人材に限る。テナント内で社員番号を一意にする。
+-- =============================================================================
+
+-- 既存データに重複がある場合は作成に失敗する。事前に確認:
+--   SELECT tenant_id, smarthr_crew_id, COUNT(*)
+--   FROM people WHERE smarthr_crew_id IS NOT NULL
+--   GROUP BY 1, 2 HAVING COUNT(*) > 1;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_people_smarthr_crew_unique
+    ON people (tenant_id, smarthr_crew_id)
+    WHERE smarthr_crew_id IS NOT NULL;
@@ -0,0 +1,34 @@
+-- =============================================================================
+-- 033_people_lookup_indexes.sql
+-- 人材・ビザ案件・企業のよく使う検索条件に合わせたインデックス
+--
+-- 人材の検索はほぼすべて tenant_id と deleted_at IS NULL で絞るため、
+-- tenant_id 先頭・論理削除を除いた部分インデックスにする。
+-- 確認: python check_query_plans.py
+-- =============================================================================
+
+-- 名前での人材照合（ビザ申請依頼リストの取り込み・ドライラン）
+-- ※ UPSERT の ON CONFLICT (tenant_id, (names->>'full_name')) は論理削除済みの行も対象のため、
+--   アービターは部分インデックスではない idx_people_names_unique のまま
+CREATE INDEX IF NOT EXISTS idx_people_active_full_name
+    ON people (tenant_id, (names->>'full_name'))
+    INCLUDE (person_id)
+    WHERE deleted_at IS NULL;
+
+-- SmartHR 一括同期の departures 判定（在籍中・社員番号順）と名寄せの読み込み（テナントの在籍者）
+CREATE INDEX IF NOT EXISTS idx_people_active_tenant_crew
+    ON people (tenant_id, smarthr_crew_id)
+    WHERE deleted_at IS NULL;
+
+-- ビザ案件の重複判定 (person_id, case_type, deadline)
+CREATE INDEX IF NOT EXISTS idx_visa_case_person_key
+    ON visa_cases (person_id, case_type, deadline);
+
+-- 派遣グリッドの企業一覧（business_division = 'dispatch'、名前順）
+CREATE INDEX IF NOT EXISTS idx_org_dispatch_name
+    ON organizations (name)
+    WHERE business_division = 'dispatch' AND deleted_at IS NULL;
+
+ANALYZE people;
+ANALYZE visa_cases;
+ANALYZE organizations;
@@ -29,3 +29,12 @@ async def get_db():
     """
     async with SessionLocal() as session:
         yield session
+
+async def get_asyncpg_connection(db: AsyncSession):
+    """
+    AsyncSession が使用している asyncpg のネイティブ接続を取得します。
+    COPY など SQLAlchemy 経由では使えない機能を、同一トランザクション内で利用するために使用します。
+    """
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection
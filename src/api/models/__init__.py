@@ -0,0 +1,35 @@
+"""
+SQLAlchemy モデル
+
+リレーションはクラス名の文字列（"Person" など）で互いを参照するため、どのモデルを import しても
+すべてのモデルがマッパーに登録されるようにここでまとめて読み込む。
+"""
+from src.api.models import (
+    billing,
+    candidate,
+    deal,
+    dispatch,
+    employment,
+    import_job,
+    kpi,
+    operation,
+    organization,
+    person,
+    tenant,
+    visa,
+)
+
+__all__ = [
+    "billing",
+    "candidate",
+    "deal",
+    "dispatch",
+    "employment",
+    "import_job",
+    "kpi",
+    "operation",
+    "organization",
+    "person",
+    "tenant",
+    "visa",
+]
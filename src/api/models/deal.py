@@ -51,6 +51,7 @@ class Deal(Base):
     # ステータス
     status = Column(String(50), default="lead") # 'lead', 'qualification', 'proposal', 'negotiation', 'won', 'lost', 'on_hold'
     probability = Column(Integer, default=0)
+    closed_at = Column(DateTime(timezone=True))  # won / lost になった日時（トリガーで設定、sql/025）
     
     # 担当
     sales_rep_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=True)
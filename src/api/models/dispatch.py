@@ -27,6 +27,7 @@ class DispatchSlot(Base):
     # シミュレーション用
     is_simulation = Column(Boolean, default=False)
     simulation_session_id = Column(UUID(as_uuid=True), ForeignKey("simulation_sessions.session_id"), nullable=True)
+    base_slot_id = Column(UUID(as_uuid=True), ForeignKey("dispatch_slots.slot_id"), nullable=True)  # 差分の対象となる実スロット
     
     notes = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
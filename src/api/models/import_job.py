@@ -0,0 +1,51 @@
+from sqlalchemy import Column, String, JSON, DateTime, func, ForeignKey, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from src.api.database import Base
+
+class ImportJob(Base):
+    """
+    インポートジョブモデル
+    CSV の取り込みをバックグラウンドでチャンク単位に実行し、進捗を保持します。
+    """
+    __tablename__ = "import_jobs"
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id"), nullable=False)
+
+    import_type = Column(String(30), nullable=False)  # 'slack_staff', 'slack_visa', 'smarthr'
+    options = Column(JSON, default={})
+    file_name = Column(String)
+    file_content = Column(LargeBinary, nullable=False)
+
+    status = Column(String(20), default="queued")  # 'queued', 'running', 'completed', 'failed'
+    attempts = Column(Integer, default=0)
+
+    # 進捗（コミット済みチャンクの合計）
+    rows_committed = Column(Integer, default=0)
+    inserted_count = Column(Integer, default=0)
+    updated_count = Column(Integer, default=0)
+    skipped_count = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+    errors = Column(JSON, default=[])
+    last_error = Column(String)
+
+    started_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ImportRowHash(Base):
+    """
+    インポート行のフィンガープリント
+    取り込み元ごとの正規化済み行内容のハッシュ。一致した行は再インポート時にスキップします。
+    """
+    __tablename__ = "import_row_hashes"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.tenant_id"), primary_key=True)
+    source = Column(String(30), primary_key=True)  # 'slack_staff', ...
+    source_key = Column(String, primary_key=True)  # slack_staff は氏名
+    person_id = Column(UUID(as_uuid=True), ForeignKey("people.person_id", ondelete="CASCADE"), nullable=False)
+    row_hash = Column(String(64), nullable=False)
+    imported_at = Column(DateTime(timezone=True), server_default=func.now())
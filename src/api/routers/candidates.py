@@ -20,12 +20,15 @@ async def search_candidates(
     nationalities: Optional[List[str]] = Query(None),
     skills: Optional[List[str]] = Query(None),
     keyword: Optional[str] = Query(None),
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="前ページの nextCursor（指定時は offset を無視）"),
+    exact_count: bool = Query(False, description="true の場合は total を正確に数える"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     候補者を検索します。
+    cursor を指定するとキーセットページング（在留期限・person_id 順）になります。
     """
     # テナントIDを取得 (デモ用に最初のテナントを使用)
     from src.api.models.tenant import Tenant
@@ -33,9 +36,13 @@ async def search_candidates(
     tenant = tenant_result.scalar_one_or_none()
     tenant_id = tenant.tenant_id if tenant else UUID("00000000-0000-0000-0000-000000000001")
 
-    res = await CandidateSearchService.search_candidates(
-        db, tenant_id, availability, visa_types, nationalities, skills, None, None, None, keyword, limit, offset
-    )
+    try:
+        res = await CandidateSearchService.search_candidates(
+            db, tenant_id, availability, visa_types, nationalities, skills, None, None, None, keyword, limit, offset,
+            cursor=cursor, exact_count=exact_count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return res
 
 @router.get("/{person_id}", response_model=CandidateInSearch, response_model_by_alias=False)
@@ -1,136 +1,95 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, and_, delete
+from sqlalchemy import and_, delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import date, timedelta
-from typing import List, Dict, Any
+from datetime import date
+from typing import List, Dict, Any, Optional
 from uuid import UUID
 
 from src.api.database import get_db
-from src.api.models.dispatch import DispatchSlot, SimulationSession
-from src.api.models.organization import Organization
-from src.api.models.person import Person
 from src.api.schemas.dispatch import (
-    DispatchGridResponse, ClientDispatchRow, DaySlot, WorkerSlot, 
-    DispatchSummary, AvailableWorker, SimulationSessionCreate, SimulationSessionRead
+    DispatchGridResponse, AvailableWorker, SimulationChange, SimulationSessionCreate, SimulationSessionRead,
+    AutoAssignResult, SlotBatchRequest, SlotBatchResult, CopyWeekRequest, CopyWeekResult
 )
+from src.api.services.dispatch_grid import DispatchGridBuilder
+from src.api.services.dispatch_optimizer import DispatchOptimizer
+from src.api.services.dispatch_simulation import DispatchSimulationService
+from src.api.services.dispatch_slots import DispatchSlotBatchService
+from src.api.services.worker_availability import WorkerAvailabilityService
 
 router = APIRouter()
 
 @router.get("/slots", response_model=DispatchGridResponse)
 async def get_dispatch_grid(
     week_start: date,
+    weeks: int = Query(1, ge=1, le=DispatchGridBuilder.MAX_WEEKS),
+    session_id: Optional[UUID] = Query(None, description="シミュレーションセッション（差分を重ねて表示）"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    指定された週の派遣配置グリッド（企業×曜日）を取得します。
+    指定された週から weeks 週分の派遣配置グリッド（企業×日）を取得します。
     """
-    week_end = week_start + timedelta(days=6)
-    
-    # 1. 派遣事業の全企業を取得
-    org_stmt = select(Organization).where(
-        Organization.business_division == 'dispatch',
-        Organization.deleted_at == None
-    )
-    orgs_result = await db.execute(org_stmt)
-    orgs = orgs_result.scalars().all()
-    
-    # 2. その週のスロット（実データ）を取得
-    slot_stmt = select(DispatchSlot, Person).join(
-        Person, DispatchSlot.person_id == Person.person_id, isouter=True
-    ).where(
-        DispatchSlot.week_start == week_start,
-        DispatchSlot.is_simulation == False
-    )
-    slots_result = await db.execute(slot_stmt)
-    slots_rows = slots_result.all()
+    return await DispatchGridBuilder.build(db, week_start, weeks, session_id)
 
-    # 3. グリッドの組み立て
-    client_rows = []
-    total_assigned = 0
-    total_required = 0
-    
-    for org in orgs:
-        required = org.settings.get("required_workers", 1) if org.settings else 1
-        total_required += (required * 7)
-        
-        day_slots = {}
-        for i in range(7):
-            curr_date = week_start + timedelta(days=i)
-            date_str = curr_date.isoformat()
-            
-            # この日のこの企業のワーカーを集計
-            workers = []
-            for slot, person in slots_rows:
-                if slot.client_org_id == org.org_id and slot.slot_date == curr_date:
-                    if person:
-                        workers.append(WorkerSlot(
-                            personId=person.person_id,
-                            name=person.names.get("full_name", "Unknown"),
-                            slotId=slot.slot_id
-                        ))
-                    total_assigned += 1
-            
-            count = len(workers)
-            status = "fulfilled" if count >= required else "partial" if count > 0 else "shortage"
-            
-            day_slots[date_str] = DaySlot(
-                workers=workers,
-                count=count,
-                required=required,
-                status=status
-            )
-            
-        client_rows.append(ClientDispatchRow(
-            clientOrgId=org.org_id,
-            clientName=org.name,
-            region=org.region,
-            businessDivision="dispatch",
-            requiredWorkers=required,
-            slots=day_slots
-        ))
+@router.post("/slots/batch", response_model=SlotBatchResult)
+async def apply_slot_operations(
+    batch: SlotBatchRequest,
+    tenant_id: UUID = Query(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    スロットの作成・移動・削除をまとめて検証し、1トランザクションで反映します。
+    同じ人の同日二重配置があればすべて取り消します。影響を受けたセルを返します。
+    """
+    if not batch.operations:
+        raise HTTPException(status_code=400, detail="operations must not be empty")
 
-    return DispatchGridResponse(
-        weekStart=week_start,
-        weekEnd=week_end,
-        clients=client_rows,
-        summary=DispatchSummary(
-            totalRequired=total_required,
-            totalAssigned=total_assigned,
-            fulfillmentRate=round((total_assigned / total_required * 100), 1) if total_required > 0 else 0
+    try:
+        return await DispatchSlotBatchService.apply_operations(db, tenant_id, batch.operations)
+    except LookupError as e:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/slots/copy-week", response_model=CopyWeekResult)
+async def copy_week_slots(
+    copy_in: CopyWeekRequest,
+    tenant_id: UUID = Query(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    指定週の配置を翌週（または target_week_start の週）へ複製します。
+    コピー先の同日に既に配置がある人はスキップします。
+    """
+    try:
+        return await DispatchSlotBatchService.copy_week(
+            db, tenant_id, copy_in.source_week_start, copy_in.target_week_start
         )
-    )
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/available-workers", response_model=List[AvailableWorker])
 async def get_available_workers(
     week_start: date,
+    weekdays: Optional[List[int]] = Query(None, description="0=月〜6=日（省略時は全日）"),
+    min_days: int = Query(1, ge=1, le=7),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    特定の週にどこにも配置されていない人材リストを返します。
+    特定の週に空きがある人材リストを、空き開始日が早い順に返します。
+
+    雇用期間・在留期限を満たし、実スロット（シミュレーション除く）がない日を空きとします。
     """
-    # 1. すべての人材を取得
-    person_stmt = select(Person).where(Person.deleted_at == None)
-    people = (await db.execute(person_stmt)).scalars().all()
-    
-    # 2. その週に配置済みの人材IDを取得
-    assigned_stmt = select(DispatchSlot.person_id).where(
-        DispatchSlot.week_start == week_start,
-        DispatchSlot.person_id != None
+    if weekdays and any(d < 0 or d > 6 for d in weekdays):
+        raise HTTPException(status_code=400, detail="weekdays must be between 0 and 6")
+
+    return await WorkerAvailabilityService.find_available(
+        db, week_start, weekdays=weekdays, min_days=min_days, limit=limit, offset=offset
     )
-    assigned_ids = (await db.execute(assigned_stmt)).scalars().all()
-    assigned_ids_set = set(assigned_ids)
-    
-    available = []
-    for p in people:
-        if p.person_id not in assigned_ids_set:
-            available.append(AvailableWorker(
-                personId=p.person_id,
-                name=p.names.get("full_name", "Unknown"),
-                nationality=p.demographics.get("nationality") if p.demographics else None,
-                availableFrom=None # 実際には雇用開始日などを参照
-            ))
-            
-    return available
 
 @router.post("/simulations", response_model=SimulationSessionRead)
 async def create_simulation(
@@ -140,22 +99,81 @@ async def create_simulation(
 ):
     """
     新しいシミュレーションセッションを開始します。
+    セッションは変更差分のみを保持し、実スロットは複製しません。
     """
-    new_session = SimulationSession(
-        tenant_id=tenant_id,
-        session_name=session_in.session_name,
-        base_date=date.today(),
-        start_week=session_in.week_start,
-        end_week=session_in.week_start + timedelta(days=6),
-        status="draft"
-    )
-    db.add(new_session)
-    await db.commit()
-    await db.refresh(new_session)
-    
-    return SimulationSessionRead(
-        sessionId=new_session.session_id,
-        sessionName=new_session.session_name,
-        weekStart=new_session.start_week,
-        status=new_session.status
+    return await DispatchSimulationService.create_session(
+        db, tenant_id, session_in.session_name, session_in.week_start, session_in.weeks
     )
+
+@router.get("/simulations/{session_id}", response_model=SimulationSessionRead)
+async def get_simulation(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """シミュレーションセッションと変更差分の一覧を取得します。"""
+    session = await DispatchSimulationService.get_session(db, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Simulation session not found")
+    return session
+
+@router.post("/simulations/{session_id}/changes", response_model=SimulationSessionRead)
+async def record_simulation_changes(
+    session_id: UUID,
+    changes: List[SimulationChange],
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    セッションに配置変更（add / remove / move）を記録します。
+    結果は GET /slots?session_id=... で実スロットに重ねて確認できます。
+    """
+    try:
+        return await DispatchSimulationService.record_changes(db, session_id, changes)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/simulations/{session_id}/auto-assign", response_model=AutoAssignResult)
+async def auto_assign_simulation(
+    session_id: UUID,
+    time_budget: float = Query(DispatchOptimizer.DEFAULT_TIME_BUDGET, gt=0, le=30),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    セッション期間の不足枠を自動割当し、追加差分としてセッションに書き込みます。
+    実スロットは apply するまで変わりません。
+    """
+    try:
+        return await DispatchOptimizer.propose(db, session_id, time_budget)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/simulations/{session_id}/apply", response_model=SimulationSessionRead)
+async def apply_simulation(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """セッションの差分を1トランザクションで実スロットへ反映します。"""
+    try:
+        return await DispatchSimulationService.apply(db, session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/simulations/{session_id}/discard", response_model=SimulationSessionRead)
+async def discard_simulation(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """セッションの差分を破棄します。"""
+    try:
+        return await DispatchSimulationService.discard(db, session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -1,48 +1,130 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.database import get_db
 from src.api.services.slack_list_importer import SlackListImporter
+from src.api.schemas.imports import ImportJobRead
+from src.api.services.import_diff import SlackImportDiff
+from src.api.services.import_jobs import ImportJobService
 from src.api.services.smarthr_importer import SmartHRImporter
 from uuid import UUID
 from typing import Dict, Any
 
 router = APIRouter()
 
+# アップロードは UploadFile.file（スプール済みの一時ファイル）を渡し、
+# 文字コード判定と行の読み出しは importer 側で逐次行う（csv_stream）。
+
 @router.post("/slack-hr-list")
 async def import_slack_hr_list(
     tenant_id: UUID = Form(...),
     file: UploadFile = File(...),
+    bulk: bool = Form(False),
+    dry_run: bool = Form(False),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     人材管理リスト鹿児島.csv をインポートします。
+    bulk=true の場合は COPY + セットベースの一括モードで取り込みます。
+    dry_run=true の場合は書き込まず、現在の people との項目単位の差分を返します。
     """
-    content = (await file.read()).decode("utf-8")
-    result = await SlackListImporter.import_staff_list(db, content, tenant_id)
-    return result
+    try:
+        if dry_run:
+            return await SlackImportDiff.diff_staff_list(db, file.file, tenant_id)
+        if bulk:
+            return await SlackListImporter.import_staff_list_bulk(db, file.file, tenant_id)
+        return await SlackListImporter.import_staff_list(db, file.file, tenant_id)
+    except UnicodeDecodeError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"CSV could not be decoded as UTF-8 or CP932: {e}")
 
 @router.post("/slack-visa-list")
 async def import_slack_visa_list(
     tenant_id: UUID = Form(...),
     file: UploadFile = File(...),
+    dry_run: bool = Form(False),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     ビザ申請依頼リスト.csv をインポートします。
+    dry_run=true の場合は書き込まず、作成される案件・既存案件・未登録の人材を返します。
     """
-    content = (await file.read()).decode("utf-8")
-    result = await SlackListImporter.import_visa_list(db, content, tenant_id)
-    return result
+    try:
+        if dry_run:
+            return await SlackImportDiff.diff_visa_list(db, file.file, tenant_id)
+        return await SlackListImporter.import_visa_list(db, file.file, tenant_id)
+    except UnicodeDecodeError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"CSV could not be decoded as UTF-8 or CP932: {e}")
 
 @router.post("/smarthr")
 async def import_smarthr(
     tenant_id: UUID = Form(...),
     file: UploadFile = File(...),
+    bulk: bool = Form(False),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     SmartHR CSV をインポートします。
+    bulk=true の場合は社員番号をキーにした一括同期モードで取り込み、
+    エクスポートに現れなかった人材を departures として返します。
+    """
+    try:
+        if bulk:
+            return await SmartHRImporter.sync_csv_bulk(db, file.file, tenant_id)
+        return await SmartHRImporter.import_csv(db, file.file, tenant_id)
+    except UnicodeDecodeError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"CSV could not be decoded as UTF-8 or CP932: {e}")
+
+@router.post("/jobs", response_model=ImportJobRead, status_code=202)
+async def create_import_job(
+    background_tasks: BackgroundTasks,
+    tenant_id: UUID = Form(...),
+    import_type: str = Form(..., description="slack_staff | slack_visa | smarthr"),
+    file: UploadFile = File(...),
+    bulk: bool = Form(False),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    content = (await file.read()).decode("utf-8")
-    result = await SmartHRImporter.import_csv(db, content, tenant_id)
-    return result
+    インポートをバックグラウンドジョブとして登録し、job_id をすぐに返します。
+    取り込みはチャンク単位でコミットされ、進捗は GET /jobs/{job_id} で確認できます。
+    """
+    try:
+        job = await ImportJobService.create_job(
+            db, tenant_id, import_type, file.file, file.filename, {"bulk": bulk}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(ImportJobService.run_job, job.job_id)
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ImportJobRead)
+async def get_import_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """インポートジョブの状態と進捗（処理行数・新規・更新・スキップ・エラー）を取得します。"""
+    job = await ImportJobService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@router.post("/jobs/{job_id}/restart", response_model=ImportJobRead, status_code=202)
+async def restart_import_job(
+    job_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    失敗した（またはワーカーが途絶えた）ジョブを、最後にコミットしたチャンクの次から再開します。
+    """
+    try:
+        job = await ImportJobService.restart_job(db, job_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    background_tasks.add_task(ImportJobService.run_job, job.job_id)
+    return job
@@ -19,7 +19,10 @@ async def get_company_kpi(
 ):
     """会社全体のKPIを取得"""
     tenant_id = UUID("00000000-0000-0000-0000-000000000001") # Dummy
-    return await KPICalculatorService.get_company_kpi(db, tenant_id, period)
+    try:
+        return await KPICalculatorService.get_company_kpi(db, tenant_id, period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/by-division", response_model=List[DivisionKPI])
 async def get_division_kpi(
@@ -27,8 +30,11 @@ async def get_division_kpi(
     db: AsyncSession = Depends(get_db)
 ):
     """事業別のKPIを取得"""
-    # 実際には CalculatorService で計算
-    return []
+    tenant_id = UUID("00000000-0000-0000-0000-000000000001") # Dummy
+    try:
+        return await KPICalculatorService.get_division_kpi(db, tenant_id, period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/by-user/{user_id}", response_model=UserKPI)
 async def get_user_kpi(
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import date
-from typing import List
+from datetime import date, timedelta
+from typing import List, Literal, Tuple
 from uuid import UUID
 
 from src.api.database import get_db
@@ -23,100 +23,85 @@ DIVISION_LABELS = {
     "it": "IT事業"
 }
 
+def _period_range(operation_date: date, period: str) -> Tuple[date, date]:
+    """基準日を含む 日 / 週（月曜始まり） / 月 の開始日と終了日"""
+    if period == "week":
+        start = operation_date - timedelta(days=operation_date.weekday())
+        return start, start + timedelta(days=6)
+    if period == "month":
+        start = operation_date.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    return operation_date, operation_date
+
 @router.get("/daily/by-division", response_model=DailyOperationsByDivisionResponse)
 async def get_daily_revenue_by_division(
     operation_date: date,
+    period: Literal["day", "week", "month"] = Query("day"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    事業区分別の日次売上サマリーを取得します。
+    事業区分別の売上サマリーを取得します。
+
+    period=week / month で基準日を含む週・月の合計を返します。
+    daily_revenue_worker_summary（トリガーで差分維持、confirmed のみ）を
+    ROLLUP(事業区分, 地域, 企業) で1回だけ集計し、人数は期間内の重複排除数です。
     """
-    # 全ての稼働データと組織情報を取得
-    stmt = (
-        select(DailyOperation, Organization)
-        .join(Organization, DailyOperation.client_org_id == Organization.org_id)
-        .where(DailyOperation.operation_date == operation_date)
-    )
-    result = await db.execute(stmt)
-    rows = result.all()
+    date_from, date_to = _period_range(operation_date, period)
 
-    summary = DailySummary(totalWorkers=0, totalRevenue=0, totalHours=0.0)
-    division_data = {} # division -> { workers: set, revenue, hours, regions: { region -> { revenue, clients: { org_id -> { name, workers: set, revenue } } } } }
+    rows = (await db.execute(
+        text("""
+            SELECT
+                GROUPING(o.business_division, COALESCE(o.region, '不明'), w.client_org_id) AS level,
+                o.business_division::text AS division,
+                COALESCE(o.region, '不明') AS region,
+                w.client_org_id,
+                MAX(o.name) AS name,
+                COUNT(DISTINCT w.person_id) AS worker_count,
+                SUM(w.total_hours) AS total_hours,
+                SUM(w.total_revenue) AS total_revenue
+            FROM daily_revenue_worker_summary w
+            JOIN organizations o ON o.org_id = w.client_org_id
+            WHERE w.summary_date BETWEEN :date_from AND :date_to
+            GROUP BY ROLLUP (o.business_division, COALESCE(o.region, '不明'), w.client_org_id)
+            ORDER BY division NULLS FIRST, region NULLS FIRST, level DESC, total_revenue DESC
+        """),
+        {"date_from": date_from, "date_to": date_to}
+    )).fetchall()
 
-    for op, org in rows:
-        div = org.business_division
-        reg = org.region or "不明"
-        rev = int(op.total_revenue) if op.total_revenue else 0
-        hrs = float(op.worked_hours)
-        
-        # 全体合計
-        summary.totalRevenue += rev
-        summary.totalHours += hrs
-        # workerCount は後で len(set) で計算するため、ここでは個別の ID を集める必要あり
-        # (簡単のため、ここでは行数を worker 数とするか、後の処理で集計)
+    # ROLLUP の行は 全体(7) → 事業区分(3) → 地域(1) → 企業(0) の順に並ぶ
+    summary = DailySummary(totalWorkers=0, totalRevenue=0, totalHours=0.0)
+    divisions: List[DivisionSummary] = []
 
-        if div not in division_data:
-            division_data[div] = {
-                "workers": set(),
-                "revenue": 0,
-                "hours": 0.0,
-                "regions": {}
-            }
-        
-        d = division_data[div]
-        d["workers"].add(op.person_id)
-        d["revenue"] += rev
-        d["hours"] += hrs
-        
-        if reg not in d["regions"]:
-            d["regions"][reg] = {"revenue": 0, "clients": {}}
-        
-        r = d["regions"][reg]
-        r["revenue"] += rev
-        
-        if org.org_id not in r["clients"]:
-            r["clients"][org.org_id] = {"name": org.name, "workers": set(), "revenue": 0}
-        
-        c = r["clients"][org.org_id]
-        c["workers"].add(op.person_id)
-        c["revenue"] += rev
+    for row in rows:
+        revenue = int(row.total_revenue or 0)
+        hours = float(row.total_hours or 0)
 
-    # Pydantic モデルへの変換
-    all_workers = set()
-    divisions = []
-    for div_id, d in division_data.items():
-        all_workers.update(d["workers"])
-        
-        regions = []
-        for reg_name, r in d["regions"].items():
-            clients = [
-                ClientSummary(
-                    org_id=oid,
-                    name=c["name"],
-                    workerCount=len(c["workers"]),
-                    totalRevenue=c["revenue"]
-                )
-                for oid, c in r["clients"].items()
-            ]
-            regions.append(RegionSummary(
-                region=reg_name,
-                totalRevenue=r["revenue"],
-                clients=clients
+        if row.level == 7:
+            summary = DailySummary(totalWorkers=row.worker_count, totalRevenue=revenue, totalHours=hours)
+        elif row.level == 3:
+            divisions.append(DivisionSummary(
+                division=row.division,
+                divisionName=DIVISION_LABELS.get(row.division, row.division),
+                workerCount=row.worker_count,
+                totalRevenue=revenue,
+                totalHours=hours,
+                regions=[]
+            ))
+        elif row.level == 1:
+            divisions[-1].regions.append(RegionSummary(region=row.region, totalRevenue=revenue, clients=[]))
+        else:
+            divisions[-1].regions[-1].clients.append(ClientSummary(
+                org_id=row.client_org_id,
+                name=row.name,
+                workerCount=row.worker_count,
+                totalRevenue=revenue
             ))
-            
-        divisions.append(DivisionSummary(
-            division=div_id,
-            divisionName=DIVISION_LABELS.get(div_id, div_id),
-            workerCount=len(d["workers"]),
-            totalRevenue=d["revenue"],
-            totalHours=d["hours"],
-            regions=regions
-        ))
-
-    summary.totalWorkers = len(all_workers)
 
     return DailyOperationsByDivisionResponse(
         date=operation_date,
+        dateFrom=date_from,
+        dateTo=date_to,
         summary=summary,
         divisions=divisions
     )
@@ -7,6 +7,7 @@ from uuid import UUID
 from src.api.database import get_db
 from src.api.models.person import Person
 from src.api.schemas.person import PersonRead, PersonCreate, PersonUpdate
+from src.api.services.candidate_search import CandidateSearchService
 
 router = APIRouter()
 
@@ -40,6 +41,7 @@ async def create_person(person_in: PersonCreate, db: AsyncSession = Depends(get_
     db.add(db_person)
     await db.commit()
     await db.refresh(db_person)
+    CandidateSearchService.invalidate_facet_cache(db_person.tenant_id)
     return db_person
 
 @router.put("/{person_id}", response_model=PersonRead)
@@ -66,6 +68,7 @@ async def update_person(
     
     await db.commit()
     await db.refresh(person)
+    CandidateSearchService.invalidate_facet_cache(person.tenant_id)
     return person
 
 @router.delete("/{person_id}")
@@ -84,5 +87,6 @@ async def delete_person(person_id: UUID, db: AsyncSession = Depends(get_db)):
     
     person.deleted_at = datetime.utcnow()
     await db.commit()
+    CandidateSearchService.invalidate_facet_cache(person.tenant_id)
     
     return {"message": "Person deleted successfully"}
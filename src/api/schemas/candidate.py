@@ -49,6 +49,8 @@ class CandidateSearchFilters(BaseModel):
 
 class CandidateSearchResponse(BaseModel):
     total: int
+    totalIsEstimate: bool = False
+    nextCursor: Optional[str] = None
     results: List[CandidateInSearch]
     filters: CandidateSearchFilters
 
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import date
+from datetime import date as Date
 from typing import Optional, List, Dict
 from src.api.schemas.common import BaseSchema
 
@@ -39,6 +40,7 @@ class AvailableWorker(BaseModel):
     name: str
     nationality: Optional[str]
     availableFrom: Optional[date]
+    availableDays: List[date] = []
     skills: List[str] = []
 
 class SimulationChange(BaseModel):
@@ -52,6 +54,7 @@ class SimulationChange(BaseModel):
 class SimulationSessionCreate(BaseModel):
     session_name: str
     week_start: date
+    weeks: int = 1
 
 class SimulationSessionRead(BaseModel):
     sessionId: UUID
@@ -59,3 +62,50 @@ class SimulationSessionRead(BaseModel):
     weekStart: date
     status: str
     changes: List[SimulationChange] = []
+
+class UnfilledCell(BaseModel):
+    clientOrgId: UUID
+    date: date
+    shortage: int
+
+class AutoAssignResult(BaseModel):
+    sessionId: UUID
+    assigned: int
+    totalRequired: int
+    totalFilled: int
+    fulfillmentRate: float
+    unfilled: List[UnfilledCell] = []
+    timedOut: bool = False
+    elapsedMs: int
+
+class SlotOperation(BaseModel):
+    op: str  # 'create' | 'move' | 'delete'
+    slotId: Optional[UUID] = None  # move / delete の対象
+    personId: Optional[UUID] = None
+    clientOrgId: Optional[UUID] = None
+    # フィールド名 date がクラス内で型の date を隠すため、別名で参照する
+    date: Optional[Date] = None
+
+class SlotBatchRequest(BaseModel):
+    operations: List[SlotOperation]
+
+class GridCell(BaseModel):
+    clientOrgId: UUID
+    date: date
+    cell: DaySlot
+
+class SlotBatchResult(BaseModel):
+    created: int
+    moved: int
+    deleted: int
+    cells: List[GridCell] = []
+
+class CopyWeekRequest(BaseModel):
+    source_week_start: date
+    target_week_start: Optional[date] = None
+
+class CopyWeekResult(BaseModel):
+    sourceWeekStart: date
+    targetWeekStart: date
+    copied: int
+    skipped: int
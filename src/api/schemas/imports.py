@@ -0,0 +1,22 @@
+from uuid import UUID
+from datetime import datetime
+from typing import Optional, List
+from src.api.schemas.common import BaseSchema
+
+class ImportJobRead(BaseSchema):
+    job_id: UUID
+    tenant_id: UUID
+    import_type: str
+    file_name: Optional[str] = None
+    status: str  # 'queued' | 'running' | 'completed' | 'failed'
+    attempts: int
+    rows_committed: int  # 処理済み（コミット済み）の行数
+    inserted_count: int
+    updated_count: int
+    skipped_count: int
+    error_count: int
+    errors: List[str] = []  # 先頭の行エラーのみ
+    last_error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
@@ -62,5 +62,7 @@ class DivisionSummary(BaseModel):
 
 class DailyOperationsByDivisionResponse(BaseModel):
     date: date
+    dateFrom: Optional[date] = None
+    dateTo: Optional[date] = None
     summary: DailySummary
     divisions: List[DivisionSummary]
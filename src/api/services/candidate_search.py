@@ -1,5 +1,9 @@
+import base64
+import json
 import logging
-from typing import List, Optional, Dict, Any
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, text, func
 from datetime import datetime, date, timedelta
@@ -10,6 +14,58 @@ from src.api.schemas.candidate import CandidateInSearch, FilterOption, Candidate
 logger = logging.getLogger(__name__)
 
 class CandidateSearchService:
+    # candidate_search_index から取得するカラム（v_candidate_search と同じ列名）
+    SEARCH_COLUMNS = """
+        person_id, full_name, last_kana, first_kana, nationality,
+        current_status, visa_type, visa_expiry, employment_status, phone,
+        skills AS skills_json, preferred_regions AS regions_json, expected_hourly_rate
+    """
+
+    # キーセットページングのソートキー（期限なしは末尾、sql/023 のインデックスと一致）
+    SORT_KEY = "COALESCE(visa_expiry, 'infinity'::date)"
+
+    # 空き状況（結果マッピングの avail_status と同じ判定を SQL で表現）
+    AVAILABILITY_EXPR = (
+        "CASE current_status::text WHEN 'assigned' THEN 'assigned' "
+        "WHEN 'ending_soon' THEN 'ending_soon' ELSE 'available' END"
+    )
+
+    AVAILABILITY_LABELS = {
+        "available": "即日可",
+        "ending_soon": "まもなく空き",
+        "assigned": "配置中",
+    }
+
+    VISA_TYPE_LABELS = {
+        "tokutei_gino_1": "特定技能1号",
+        "tokutei_gino_2": "特定技能2号",
+        "tokkatsu": "特定活動",
+        "gino_jisshu_1": "技能実習1号",
+        "gino_jisshu_2": "技能実習2号",
+        "gino_jisshu_3": "技能実習3号",
+        "engineer_specialist": "技術・人文知識・国際業務",
+        "student": "留学",
+        "dependent": "家族滞在",
+        "permanent_resident": "永住者",
+        "overseas_waiting": "海外待機",
+        "other": "その他",
+    }
+
+    SKILL_LABELS = {
+        "forklift": "フォークリフト",
+        "driver_license": "普通免許",
+        "large_vehicle": "大型免許",
+        "jlpt_n1": "JLPT N1",
+        "jlpt_n2": "JLPT N2",
+        "jlpt_n3": "JLPT N3",
+    }
+
+    # ファセット件数キャッシュ: (tenant_id, フィルタ署名) -> (期限, 索引バージョン, フィルタ)
+    # 署名にキーワードを含むため、最大件数を超えたら期限切れ → 最も古く使われたものの順に捨てる（LRU）
+    FACET_CACHE_TTL_SECONDS = 60
+    FACET_CACHE_MAX_ENTRIES = 1000
+    _facet_cache: "OrderedDict[Tuple[UUID, str], Tuple[float, Any, CandidateSearchFilters]]" = OrderedDict()
+
     @staticmethod
     async def search_candidates(
         db: AsyncSession,
@@ -23,62 +79,125 @@ class CandidateSearchService:
         max_hourly_rate: Optional[int] = None,
         keyword: Optional[str] = None,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        exact_count: bool = False
     ) -> Dict[str, Any]:
         """
-        v_candidate_search ビューを使用して候補者を検索します。
+        candidate_search_index（1人1行の実体化テーブル）を使用して候補者を検索します。
+        索引は people / employments のトリガーで差分更新されます（sql/022）。
+
+        ページング:
+        - cursor 指定時は (在留期限, person_id) によるキーセットページング（offset は無視）
+        - cursor 未指定時は従来どおり offset ページング
+        件数:
+        - exact_count=True の場合は同一クエリ内で正確に数える（offset ページングはウィンドウ関数
+          COUNT(*) OVER()、cursor 指定時はキーセット条件を含まないスカラーサブクエリ）
+        - それ以外はプランナの推定値（最終ページに到達した場合は正確な値）
         """
         # 1. 検索クエリの構築
-        # v_candidate_search は SQLAlchemy モデルではないため、text() または Table 経由で実行可能
-        # ここでは柔軟性と速度のため、SQL式を使用
-        
-        query = text("""
-            SELECT 
-                person_id, full_name, last_kana, first_kana, nationality, 
-                current_status, visa_type, visa_expiry, employment_status, phone,
-                skills_json, regions_json, expected_hourly_rate
-            FROM v_candidate_search
-            WHERE tenant_id = :tenant_id
-        """)
-        
-        # フィルタの適用
+        # 各フィルタは candidate_search_index のインデックスに対応
+        # (nationality / visa_type: btree, skills / regions: GIN, keyword: pg_trgm)
+        # ファセット対象のフィルタ（availability / nationality / visa_type / skill）は
+        # ファセット件数の計算で「自分以外のフィルタ」を適用するため別に保持する
         params = {"tenant_id": tenant_id}
         where_clauses = ["tenant_id = :tenant_id"]
-        
+        facet_conditions: Dict[str, str] = {}
+
+        if availability:
+            facet_conditions["availability"] = f"{CandidateSearchService.AVAILABILITY_EXPR} = ANY(:availability)"
+            params["availability"] = availability
+
         if visa_types:
-            where_clauses.append("visa_type = ANY(:visa_types)")
+            facet_conditions["visa_type"] = "visa_type = ANY(:visa_types)"
             params["visa_types"] = visa_types
             
         if nationalities:
-            where_clauses.append("nationality = ANY(:nationalities)")
+            facet_conditions["nationality"] = "nationality = ANY(:nationalities)"
             params["nationalities"] = nationalities
             
         if keyword:
-            where_clauses.append("(full_name ILIKE :kw OR last_kana ILIKE :kw)")
+            where_clauses.append("(full_name ILIKE :kw OR search_kana ILIKE :kw)")
             params["kw"] = f"%{keyword}%"
             
         if skills:
-            skill_conditions = []
-            for i, s in enumerate(skills):
-                p_name = f"skill_{i}"
-                skill_conditions.append(f"skills_json ? :{p_name}")
-                params[p_name] = s
-            where_clauses.append(f"({' OR '.join(skill_conditions)})")
+            facet_conditions["skill"] = "skills ?| CAST(:skills AS text[])"
+            params["skills"] = skills
+
+        if regions:
+            where_clauses.append("preferred_regions ?| CAST(:regions AS text[])")
+            params["regions"] = regions
+
+        if min_hourly_rate is not None:
+            where_clauses.append("expected_hourly_rate >= :min_hourly_rate")
+            params["min_hourly_rate"] = min_hourly_rate
+
+        if max_hourly_rate is not None:
+            where_clauses.append("expected_hourly_rate <= :max_hourly_rate")
+            params["max_hourly_rate"] = max_hourly_rate
+
+        common_where_str = " AND ".join(where_clauses)
+        where_clauses.extend(facet_conditions.values())
+
+        # 件数推定用（キーセット条件を含まないフィルタのみ）
+        filter_where_str = " AND ".join(where_clauses)
+        filter_params = dict(params)
+
+        if cursor:
+            cursor_expiry, cursor_person_id = CandidateSearchService._decode_cursor(cursor)
+            where_clauses.append(
+                f"({CandidateSearchService.SORT_KEY}, person_id) > (CAST(:cursor_expiry AS date), CAST(:cursor_person_id AS uuid))"
+            )
+            params["cursor_expiry"] = cursor_expiry
+            params["cursor_person_id"] = cursor_person_id
+            offset = 0
 
         # 最終的なクエリ構築
         where_str = " AND ".join(where_clauses)
-        sql = f"SELECT * FROM v_candidate_search WHERE {where_str} LIMIT :limit OFFSET :offset"
-        count_sql = f"SELECT COUNT(*) FROM v_candidate_search WHERE {where_str}"
+        count_column = ""
+        if exact_count:
+            # キーセット条件の後ろの行だけを数えないよう、カーソル指定時はフィルタのみで数える
+            count_column = (
+                f", (SELECT COUNT(*) FROM candidate_search_index WHERE {filter_where_str}) AS total_count"
+                if cursor else ", COUNT(*) OVER() AS total_count"
+            )
+        sql = f"""
+            SELECT {CandidateSearchService.SEARCH_COLUMNS},
+                   {CandidateSearchService.SORT_KEY} AS sort_expiry{count_column},
+                   (SELECT MAX(indexed_at) FROM candidate_search_index WHERE tenant_id = :tenant_id) AS index_version
+            FROM candidate_search_index
+            WHERE {where_str}
+            ORDER BY {CandidateSearchService.SORT_KEY}, person_id
+            LIMIT :limit OFFSET :offset
+        """
         
         params["limit"] = limit
         params["offset"] = offset
         
         result = await db.execute(text(sql), params)
         rows = result.all()
-        
-        count_params = {k: v for k, v in params.items() if k not in ["limit", "offset"]}
-        total_result = await db.execute(text(count_sql), count_params)
-        total = total_result.scalar() or 0
+
+        # 次ページのカーソル（取得件数が limit に満たなければ最終ページ）
+        next_cursor = None
+        if len(rows) == limit and rows:
+            last = rows[-1]
+            next_cursor = CandidateSearchService._encode_cursor(last.sort_expiry, last.person_id)
+
+        total_is_estimate = False
+        if exact_count and rows:
+            total = rows[0].total_count
+        elif exact_count or (not rows and offset > 0 and not cursor):
+            # 範囲外のページでは件数が取れない（offset + 0 も信用できない）ため COUNT を実行
+            total_result = await db.execute(
+                text(f"SELECT COUNT(*) FROM candidate_search_index WHERE {filter_where_str}"), filter_params
+            )
+            total = total_result.scalar() or 0
+        elif next_cursor is None and not cursor:
+            # offset ページングの最終ページ（1件以上取得）: 件数は確定
+            total = offset + len(rows)
+        else:
+            total = await CandidateSearchService._estimate_count(db, filter_where_str, filter_params)
+            total_is_estimate = True
 
         # 2. 結果のマッピング
         results = []
@@ -118,30 +237,188 @@ class CandidateSearchService:
                 phone=row.phone
             ))
 
-        # 3. フィルタオプションの構築 (本来は集計クエリを投げる)
-        filters = CandidateSearchFilters(
-            availabilities=[
-                FilterOption(value="available", label="即日可", count=45),
-                FilterOption(value="ending_soon", label="まもなく空き", count=23),
-            ],
-            nationalities=[
-                FilterOption(value="vietnam", label="ベトナム", count=78),
-                FilterOption(value="indonesia", label="インドネシア", count=52),
-            ],
-            visaTypes=[
-                FilterOption(value="ssw1", label="特定技能1号", count=120),
-            ],
-            skills=[
-                FilterOption(value="forklift", label="フォークリフト", count=34),
-            ]
+        # 3. フィルタオプションの構築（ファセット件数、テナント×フィルタ条件でキャッシュ）
+        index_version = rows[0].index_version if rows else None
+        filters = await CandidateSearchService._get_facets(
+            db, tenant_id, common_where_str, facet_conditions, filter_params, index_version
         )
 
         return {
             "total": total,
+            "totalIsEstimate": total_is_estimate,
+            "nextCursor": next_cursor,
             "results": results,
             "filters": filters
         }
 
+    @staticmethod
+    async def _get_facets(
+        db: AsyncSession,
+        tenant_id: UUID,
+        common_where_str: str,
+        facet_conditions: Dict[str, str],
+        params: Dict[str, Any],
+        index_version: Any
+    ) -> CandidateSearchFilters:
+        """
+        ファセット件数を返します。
+        索引バージョン（candidate_search_index の最終更新時刻）が変わらず TTL 内であればキャッシュを使用します。
+        """
+        signature = json.dumps(
+            {k: v for k, v in params.items() if k != "tenant_id"}, sort_keys=True, default=str
+        )
+        key = (tenant_id, signature)
+        now = time.monotonic()
+
+        cache = CandidateSearchService._facet_cache
+        cached = cache.get(key)
+        if cached and index_version is not None:
+            expires_at, cached_version, filters = cached
+            if expires_at > now and cached_version == index_version:
+                cache.move_to_end(key)
+                return filters
+
+        filters = await CandidateSearchService._compute_facets(db, common_where_str, facet_conditions, params)
+        if index_version is not None:
+            cache[key] = (now + CandidateSearchService.FACET_CACHE_TTL_SECONDS, index_version, filters)
+            cache.move_to_end(key)
+            CandidateSearchService._evict_facet_cache(now)
+        return filters
+
+    @staticmethod
+    def _evict_facet_cache(now: float) -> None:
+        """最大件数を超えていれば期限切れを捨て、それでも多ければ最も古く使われたものから捨てます"""
+        cache = CandidateSearchService._facet_cache
+        if len(cache) <= CandidateSearchService.FACET_CACHE_MAX_ENTRIES:
+            return
+        for key in [k for k, (expires_at, _, _) in cache.items() if expires_at <= now]:
+            del cache[key]
+        while len(cache) > CandidateSearchService.FACET_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def invalidate_facet_cache(tenant_id: Optional[UUID] = None) -> None:
+        """ファセット件数キャッシュを破棄します（tenant_id 省略時は全テナント）"""
+        if tenant_id is None:
+            CandidateSearchService._facet_cache.clear()
+            return
+        for key in [k for k in CandidateSearchService._facet_cache if k[0] == tenant_id]:
+            del CandidateSearchService._facet_cache[key]
+
+    @staticmethod
+    async def _compute_facets(
+        db: AsyncSession,
+        common_where_str: str,
+        facet_conditions: Dict[str, str],
+        params: Dict[str, Any]
+    ) -> CandidateSearchFilters:
+        """
+        ファセット件数を1クエリで集計します。
+        各ファセットの件数には「そのファセット以外」のフィルタを適用します（選択中の値以外の件数も表示するため）。
+        国籍・在留資格・空き状況は GROUPING SETS + FILTER 集計、スキルは配列展開して集計します。
+        """
+        def match(facet: str) -> str:
+            return f"m_{facet}"
+
+        def others(facet: str) -> str:
+            conds = [match(f) for f in ("availability", "nationality", "visa_type", "skill") if f != facet]
+            return " AND ".join(conds)
+
+        match_columns = ",\n".join(
+            f"({facet_conditions.get(f, 'TRUE')}) AS {match(f)}"
+            for f in ("availability", "nationality", "visa_type", "skill")
+        )
+
+        sql = f"""
+            WITH base AS (
+                SELECT
+                    nationality,
+                    visa_type,
+                    skills,
+                    {CandidateSearchService.AVAILABILITY_EXPR} AS availability,
+                    {match_columns}
+                FROM candidate_search_index
+                WHERE {common_where_str}
+            )
+            SELECT
+                CASE
+                    WHEN GROUPING(nationality) = 0 THEN 'nationality'
+                    WHEN GROUPING(visa_type) = 0 THEN 'visa_type'
+                    ELSE 'availability'
+                END AS facet,
+                COALESCE(nationality, visa_type, availability) AS value,
+                CASE
+                    WHEN GROUPING(nationality) = 0 THEN COUNT(*) FILTER (WHERE {others("nationality")})
+                    WHEN GROUPING(visa_type) = 0 THEN COUNT(*) FILTER (WHERE {others("visa_type")})
+                    ELSE COUNT(*) FILTER (WHERE {others("availability")})
+                END AS facet_count
+            FROM base
+            GROUP BY GROUPING SETS ((nationality), (visa_type), (availability))
+            UNION ALL
+            SELECT 'skill' AS facet, s.skill AS value, COUNT(*) AS facet_count
+            FROM base
+            CROSS JOIN LATERAL jsonb_array_elements_text(base.skills) AS s(skill)
+            WHERE {others("skill")}
+            GROUP BY s.skill
+        """
+        result = await db.execute(text(sql), params)
+
+        options: Dict[str, List[FilterOption]] = {
+            "availability": [], "nationality": [], "visa_type": [], "skill": []
+        }
+        for row in result.all():
+            if row.value is None or row.facet_count == 0:
+                continue
+            if row.facet == "nationality":
+                label = CandidateSearchService.get_nationality_name(row.value)
+            elif row.facet == "visa_type":
+                label = CandidateSearchService.VISA_TYPE_LABELS.get(row.value, row.value)
+            elif row.facet == "availability":
+                label = CandidateSearchService.AVAILABILITY_LABELS.get(row.value, row.value)
+            else:
+                label = CandidateSearchService.SKILL_LABELS.get(row.value, row.value)
+            options[row.facet].append(FilterOption(value=row.value, label=label, count=row.facet_count))
+
+        for values in options.values():
+            values.sort(key=lambda o: (-o.count, o.value))
+
+        return CandidateSearchFilters(
+            availabilities=options["availability"],
+            nationalities=options["nationality"],
+            visaTypes=options["visa_type"],
+            skills=options["skill"],
+        )
+
+    @staticmethod
+    def _encode_cursor(sort_expiry: date, person_id: UUID) -> str:
+        """キーセットカーソルをURLセーフな文字列に変換"""
+        expiry = "infinity" if sort_expiry in (None, date.max) else sort_expiry.isoformat()
+        payload = json.dumps([expiry, str(person_id)]).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[date, UUID]:
+        """カーソル文字列を (ソートキー日付, person_id) に復元。不正な場合は ValueError"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            expiry, person_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            # asyncpg は date.max を 'infinity' として送受信する
+            sort_expiry = date.max if expiry == "infinity" else date.fromisoformat(expiry)
+            return sort_expiry, UUID(person_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    @staticmethod
+    async def _estimate_count(db: AsyncSession, where_str: str, params: Dict[str, Any]) -> int:
+        """EXPLAIN の推定行数から件数を概算（クエリ自体は実行しない）"""
+        result = await db.execute(
+            text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM candidate_search_index WHERE {where_str}"), params
+        )
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
     @staticmethod
     def get_nationality_name(code: str) -> str:
         mapping = {
@@ -162,8 +439,9 @@ class CandidateSearchService:
         """
         特定の候補者の詳細情報を取得します。
         """
-        sql = text("""
-            SELECT * FROM v_candidate_search 
+        sql = text(f"""
+            SELECT {CandidateSearchService.SEARCH_COLUMNS}
+            FROM candidate_search_index
             WHERE tenant_id = :tenant_id AND person_id = :person_id
         """)
         
@@ -0,0 +1,84 @@
+"""
+CSV の逐次読み込み
+
+アップロードされたファイルを丸ごと read() / decode() せず、
+インクリメンタルデコーダを通して1行ずつ DictReader に渡す。
+Slack / SmartHR のエクスポートは UTF-8（BOM あり・なし）と CP932（Shift_JIS）が混在するため、
+文字コードはファイル先頭の BOM と UTF-8 としての妥当性から判定する。
+"""
+import codecs
+import csv
+import io
+import logging
+from typing import BinaryIO, Dict, Iterable, Iterator, List, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+# 文字列（既存のスクリプト）またはバイナリのファイルオブジェクト（アップロード）
+CsvSource = Union[str, BinaryIO]
+
+CHUNK_SIZE = 64 * 1024
+FALLBACK_ENCODING = "cp932"
+
+T = TypeVar("T")
+
+
+def detect_encoding(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    バイナリストリームの文字コードを判定し、先頭に巻き戻す。
+
+    - UTF-8 BOM があれば utf-8-sig
+    - 全体が UTF-8 として妥当なら utf-8（チャンク単位で検証するためメモリは一定）
+    - それ以外は cp932
+    """
+    head = stream.read(len(codecs.BOM_UTF8))
+    if head == codecs.BOM_UTF8:
+        stream.seek(0)
+        return "utf-8-sig"
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunk = head
+    try:
+        while chunk:
+            decoder.decode(chunk)
+            chunk = stream.read(chunk_size)
+        decoder.decode(b"", final=True)
+        encoding = "utf-8"
+    except UnicodeDecodeError:
+        encoding = FALLBACK_ENCODING
+
+    stream.seek(0)
+    return encoding
+
+
+def iter_csv_rows(source: CsvSource) -> Iterator[Dict[str, str]]:
+    """
+    CSV の各行を dict として逐次返す。
+
+    source が文字列ならそのまま（先頭の BOM は除去）、
+    ファイルオブジェクトなら文字コードを判定してから TextIOWrapper 経由で読む。
+    """
+    if isinstance(source, str):
+        yield from csv.DictReader(io.StringIO(source.lstrip("\ufeff")))
+        return
+
+    encoding = detect_encoding(source)
+    logger.info(f"CSV encoding detected: {encoding}")
+    text_stream = io.TextIOWrapper(source, encoding=encoding, newline="")
+    try:
+        yield from csv.DictReader(text_stream)
+    finally:
+        # 呼び出し元のファイルを閉じないよう切り離す
+        text_stream.detach()
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """要素を最大 size 件ずつのリストにまとめて返す"""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,158 @@
+"""
+インポート用の日付パーサ
+
+strptime を形式ごとに試す（失敗のたびに例外が出る）代わりに、互いに重ならない正規表現で
+形式を1回で判別し、同じ文字列の結果はキャッシュする。
+
+対応形式（NFKC 正規化後）:
+  西暦   2025-04-01 / 2025/4/1 / 2025.4.1 / 2025年4月1日
+  和暦   令和7年4月1日 / 令和元年5月1日 / R7.4.1 / H31/4/30（令和・平成・昭和）
+  日月順 4/1/2025 — 月/日 か 日/月 かは列単位で判定する（DateColumnParser）
+"""
+import re
+import unicodedata
+from datetime import date
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 元号 → 元年の前年（西暦 = オフセット + 元号年）
+ERA_OFFSETS = {
+    "令和": 2018, "R": 2018,
+    "平成": 1988, "H": 1988,
+    "昭和": 1925, "S": 1925,
+}
+
+_YMD = re.compile(r"^(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?$")
+_WAREKI = re.compile(r"^(令和|平成|昭和|[RHS])\s*(元|\d{1,2})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?$")
+_DMY_OR_MDY = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+
+
+def _normalize(value: str) -> str:
+    return unicodedata.normalize("NFKC", value).strip().strip('"').strip().upper()
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_normalized(value: str, day_first: bool) -> Optional[date]:
+    m = _YMD.match(value)
+    if m:
+        return _make_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+
+    m = _WAREKI.match(value)
+    if m:
+        era_year = 1 if m.group(2) == "元" else int(m.group(2))
+        return _make_date(ERA_OFFSETS[m.group(1)] + era_year, int(m.group(3)), int(m.group(4)))
+
+    m = _DMY_OR_MDY.match(value)
+    if m:
+        first, second, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        # どちらかが 12 を超えれば順序は確定する
+        if first > 12 or (day_first and second <= 12):
+            return _make_date(year, second, first)
+        return _make_date(year, first, second)
+
+    return None
+
+
+def parse_date(value: Optional[str], day_first: bool = False) -> Optional[date]:
+    """
+    1つの値をパースする。解釈できなければ None。
+    日/月 の順序が値だけで決まらない場合は day_first に従う（既定は月/日）。
+    """
+    if not value:
+        return None
+    normalized = _normalize(value)
+    if not normalized:
+        return None
+    return _parse_normalized(normalized, day_first)
+
+
+class DateColumnParser:
+    """
+    1つの日付列のパーサ
+
+    detect() で列のサンプルから 日/月 の順序を判定してから parse() で各値を読む。
+    13 以上の値がどちらの位置にも現れず順序を決められない列や、両方の証拠がある列は
+    ambiguous として warning を残す（その場合は月/日として読む）。
+    """
+
+    SAMPLE_SIZE = 500
+
+    def __init__(self, column: str):
+        self.column = column
+        self.day_first = False
+        self.ambiguous = False
+        self.detected = False
+
+    def detect(self, values: Iterable[Optional[str]]) -> "DateColumnParser":
+        day_first_evidence = 0
+        month_first_evidence = 0
+        undecided = 0
+
+        for i, value in enumerate(values):
+            if i >= self.SAMPLE_SIZE:
+                break
+            if not value:
+                continue
+            m = _DMY_OR_MDY.match(_normalize(value))
+            if not m:
+                continue
+            first, second = int(m.group(1)), int(m.group(2))
+            if first > 12 >= second:
+                day_first_evidence += 1
+            elif second > 12 >= first:
+                month_first_evidence += 1
+            elif first != second:
+                undecided += 1
+
+        self.day_first = day_first_evidence > 0 and month_first_evidence == 0
+        self.ambiguous = (day_first_evidence > 0 and month_first_evidence > 0) or (
+            undecided > 0 and day_first_evidence == 0 and month_first_evidence == 0
+        )
+        self.detected = True
+        return self
+
+    def parse(self, value: Optional[str]) -> Optional[date]:
+        return parse_date(value, self.day_first)
+
+    def parse_column(self, values: List[Optional[str]]) -> List[Optional[date]]:
+        """列全体を判定してから1回で読む"""
+        if not self.detected:
+            self.detect(values)
+        return [self.parse(v) for v in values]
+
+    @property
+    def warning(self) -> Optional[str]:
+        if not self.ambiguous:
+            return None
+        return f"Column '{self.column}' has ambiguous D/M vs M/D dates; parsed as month/day"
+
+    @classmethod
+    def for_rows(cls, columns: Iterable[str], rows: List[Dict[str, str]]) -> Dict[str, "DateColumnParser"]:
+        """行のサンプルから各列のパーサを作る"""
+        return {column: cls(column).detect(row.get(column) for row in rows) for column in columns}
+
+    @classmethod
+    def for_numbered_rows(
+        cls,
+        columns: Iterable[str],
+        rows: Iterable[Tuple[int, Dict[str, str]]]
+    ) -> Tuple[Dict[str, "DateColumnParser"], Iterator[Tuple[int, Dict[str, str]]]]:
+        """
+        (行番号, 行) の列の先頭 SAMPLE_SIZE 行で判定し、パーサと（先読み分を戻した）行の列を返す。
+        """
+        rows = iter(rows)
+        head: List[Tuple[int, Any]] = list(islice(rows, cls.SAMPLE_SIZE))
+        parsers = cls.for_rows(columns, [row for _, row in head])
+        return parsers, chain(head, rows)
+
+    @staticmethod
+    def warnings(parsers: Dict[str, "DateColumnParser"]) -> List[str]:
+        return [p.warning for p in parsers.values() if p.warning]
@@ -0,0 +1,164 @@
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.schemas.dispatch import (
+    DispatchGridResponse, ClientDispatchRow, DaySlot, WorkerSlot, DispatchSummary
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchGridBuilder:
+    """
+    派遣配置グリッド（企業×日）の組み立て
+
+    スロットは期間分を1回だけ取得し、(client_org_id, slot_date) をキーにした
+    索引へ振り分けてからセルを埋めるため、企業数×日数×スロット数の走査にならない。
+    シミュレーションセッションを指定すると、その差分を重ねた状態を返す。
+    """
+
+    MAX_WEEKS = 12
+
+    # 実スロットにセッション差分（sql/029）を重ねた期間内のスロット。
+    # 差分のある実スロットは除外し、セッション側の追加・移動行（墓標以外）を加える。
+    # :session_id が NULL なら実スロットのみ。
+    OVERLAY_SLOTS_SQL = """
+        SELECT s.slot_id, s.client_org_id, s.slot_date, s.person_id
+        FROM dispatch_slots s
+        WHERE s.slot_date BETWEEN :date_from AND :date_to
+          AND s.is_simulation = FALSE
+          AND NOT EXISTS (
+              SELECT 1 FROM dispatch_slots d
+              WHERE d.simulation_session_id = CAST(:session_id AS uuid)
+                AND d.is_simulation = TRUE
+                AND d.base_slot_id = s.slot_id
+          )
+        UNION ALL
+        SELECT d.slot_id, d.client_org_id, d.slot_date, d.person_id
+        FROM dispatch_slots d
+        WHERE d.simulation_session_id = CAST(:session_id AS uuid)
+          AND d.is_simulation = TRUE
+          AND d.slot_status <> 'removed'
+          AND d.slot_date BETWEEN :date_from AND :date_to
+    """
+
+    @staticmethod
+    async def build(
+        db: AsyncSession,
+        week_start: date,
+        weeks: int = 1,
+        session_id: Optional[UUID] = None
+    ) -> DispatchGridResponse:
+        days = 7 * weeks
+        period_end = week_start + timedelta(days=days - 1)
+
+        orgs = await DispatchGridBuilder._fetch_orgs(db)
+        slots = await DispatchGridBuilder._fetch_slots(db, week_start, period_end, session_id)
+        return DispatchGridBuilder.assemble(orgs, slots, week_start, days)
+
+    @staticmethod
+    async def _fetch_orgs(db: AsyncSession) -> List[Any]:
+        """派遣事業の全企業"""
+        result = await db.execute(text("""
+            SELECT org_id, name, region, settings
+            FROM organizations
+            WHERE business_division = 'dispatch' AND deleted_at IS NULL
+            ORDER BY name
+        """))
+        return result.fetchall()
+
+    @staticmethod
+    async def _fetch_slots(
+        db: AsyncSession,
+        date_from: date,
+        date_to: date,
+        session_id: Optional[UUID] = None
+    ) -> List[Any]:
+        """期間内のスロット（session_id 指定時はセッションの差分を重ねる）"""
+        result = await db.execute(
+            text(f"""
+                WITH overlay AS ({DispatchGridBuilder.OVERLAY_SLOTS_SQL})
+                SELECT
+                    o.slot_id,
+                    o.client_org_id,
+                    o.slot_date,
+                    o.person_id,
+                    p.names->>'full_name' AS person_name
+                FROM overlay o
+                LEFT JOIN people p ON p.person_id = o.person_id
+                WHERE o.client_org_id IS NOT NULL
+                  AND o.person_id IS NOT NULL
+            """),
+            {"date_from": date_from, "date_to": date_to, "session_id": session_id}
+        )
+        return result.fetchall()
+
+    @staticmethod
+    def index_slots(slots: Iterable[Any]) -> Dict[Tuple[UUID, date], List[WorkerSlot]]:
+        """スロットを (client_org_id, slot_date) ごとの WorkerSlot リストにまとめる"""
+        index: Dict[Tuple[UUID, date], List[WorkerSlot]] = defaultdict(list)
+        for s in slots:
+            index[(s.client_org_id, s.slot_date)].append(WorkerSlot(
+                personId=s.person_id,
+                name=s.person_name or "Unknown",
+                slotId=s.slot_id
+            ))
+        return index
+
+    @staticmethod
+    def make_cell(workers: List[WorkerSlot], required: int) -> DaySlot:
+        """1セル（企業×日）の充足状況"""
+        count = len(workers)
+        status = "fulfilled" if count >= required else "partial" if count > 0 else "shortage"
+        return DaySlot(workers=workers, count=count, required=required, status=status)
+
+    @staticmethod
+    def assemble(
+        orgs: List[Any],
+        slots: Iterable[Any],
+        week_start: date,
+        days: int
+    ) -> DispatchGridResponse:
+        index = DispatchGridBuilder.index_slots(slots)
+        dates = [(week_start + timedelta(days=i)) for i in range(days)]
+        date_keys = [d.isoformat() for d in dates]
+
+        client_rows = []
+        total_assigned = 0
+        total_required = 0
+
+        for org in orgs:
+            required = (org.settings or {}).get("required_workers", 1)
+            total_required += required * days
+
+            day_slots = {}
+            for curr_date, date_str in zip(dates, date_keys):
+                cell = DispatchGridBuilder.make_cell(index.get((org.org_id, curr_date), []), required)
+                total_assigned += cell.count
+                day_slots[date_str] = cell
+
+            client_rows.append(ClientDispatchRow(
+                clientOrgId=org.org_id,
+                clientName=org.name,
+                region=org.region,
+                businessDivision="dispatch",
+                requiredWorkers=required,
+                slots=day_slots
+            ))
+
+        return DispatchGridResponse(
+            weekStart=week_start,
+            weekEnd=week_start + timedelta(days=days - 1),
+            clients=client_rows,
+            summary=DispatchSummary(
+                totalRequired=total_required,
+                totalAssigned=total_assigned,
+                fulfillmentRate=round((total_assigned / total_required * 100), 1) if total_required > 0 else 0
+            )
+        )
@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.schemas.dispatch import AutoAssignResult, UnfilledCell
+from src.api.services.dispatch_grid import DispatchGridBuilder
+from src.api.services.dispatch_simulation import DispatchSimulationService
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchOptimizer:
+    """
+    派遣スロットの自動割当
+
+    日ごとに「人材 → 企業（容量 = 不足人数）」の二部グラフで最大フロー（b-マッチング）を解く。
+      - 1人1日1枠（既存スロットがある人はその日は対象外）
+      - 雇用期間・在留期限内であること
+      - 企業の required_skills（Organization.settings）を people.skills がすべて満たすこと
+    希望地域と前日と同じ企業（継続性）を優先する貪欲法で初期解を作り、
+    増加路で充足数を最大化する。time_budget を超えたら増加路探索を打ち切り、
+    その時点の解（貪欲解以上）を返す。結果はシミュレーションセッションに追加差分として書く。
+    """
+
+    DEFAULT_TIME_BUDGET = 3.0
+
+    @staticmethod
+    async def propose(
+        db: AsyncSession,
+        session_id: UUID,
+        time_budget: float = DEFAULT_TIME_BUDGET
+    ) -> AutoAssignResult:
+        started = time.perf_counter()
+        session = await DispatchSimulationService._get_draft(db, session_id)
+        date_from, date_to = session.start_week, session.end_week
+        days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+
+        clients = await DispatchOptimizer._fetch_clients(db, session.tenant_id)
+        workers = await DispatchOptimizer._fetch_workers(db, session.tenant_id, date_from, date_to)
+        booked = await DispatchOptimizer._fetch_booked(db, session_id, date_from, date_to)
+
+        remaining = time_budget - (time.perf_counter() - started)
+        assignments, timed_out = await asyncio.to_thread(
+            DispatchOptimizer.solve, days, clients, workers, booked, remaining
+        )
+
+        for (person_id, org_id, slot_date) in assignments:
+            DispatchSimulationService._add_delta(db, session, person_id, org_id, slot_date)
+        await db.commit()
+
+        # 充足状況（既存スロット + 今回の割当）
+        filled: Dict[Tuple[UUID, date], int] = {}
+        for (_, org_id, slot_date) in booked:
+            filled[(org_id, slot_date)] = filled.get((org_id, slot_date), 0) + 1
+        for (_, org_id, slot_date) in assignments:
+            filled[(org_id, slot_date)] = filled.get((org_id, slot_date), 0) + 1
+
+        total_required = 0
+        total_filled = 0
+        unfilled = []
+        for c in clients:
+            for d in days:
+                count = filled.get((c["org_id"], d), 0)
+                total_required += c["required"]
+                total_filled += min(count, c["required"])
+                if count < c["required"]:
+                    unfilled.append(UnfilledCell(clientOrgId=c["org_id"], date=d, shortage=c["required"] - count))
+
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            f"Auto-assign {session_id}: {len(assignments)} slots, "
+            f"{total_filled}/{total_required} filled in {elapsed_ms}ms (timed_out={timed_out})"
+        )
+
+        return AutoAssignResult(
+            sessionId=session_id,
+            assigned=len(assignments),
+            totalRequired=total_required,
+            totalFilled=total_filled,
+            fulfillmentRate=round(total_filled / total_required * 100, 1) if total_required else 0,
+            unfilled=unfilled,
+            timedOut=timed_out,
+            elapsedMs=elapsed_ms
+        )
+
+    # ------------------------------------------------------------------
+    # 入力の取得
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _fetch_clients(db: AsyncSession, tenant_id: UUID) -> List[Dict[str, Any]]:
+        result = await db.execute(
+            text("""
+                SELECT org_id, region, settings
+                FROM organizations
+                WHERE tenant_id = :tenant_id
+                  AND business_division = 'dispatch'
+                  AND deleted_at IS NULL
+            """),
+            {"tenant_id": tenant_id}
+        )
+        clients = []
+        for row in result:
+            settings = row.settings or {}
+            clients.append({
+                "org_id": row.org_id,
+                "required": int(settings.get("required_workers", 1)),
+                "region": row.region,
+                "required_skills": set(settings.get("required_skills", [])),
+            })
+        return clients
+
+    @staticmethod
+    async def _fetch_workers(
+        db: AsyncSession, tenant_id: UUID, date_from: date, date_to: date
+    ) -> List[Dict[str, Any]]:
+        """
+        期間に有効な雇用がある人材。配置可能期間は雇用ごとの期間と在留期限の重なりで、
+        雇用の間の空白期間には配置しない（WorkerAvailabilityService の日ごとの判定と同じ）。
+        """
+        result = await db.execute(
+            text("""
+                SELECT
+                    p.person_id,
+                    array_agg(e.start_date ORDER BY e.start_date) AS employment_starts,
+                    array_agg(COALESCE(e.end_date, 'infinity'::date) ORDER BY e.start_date) AS employment_ends,
+                    p.visa_expiry_date,
+                    p.skills,
+                    p.preferred_regions
+                FROM employments e
+                JOIN people p ON p.person_id = e.person_id AND p.deleted_at IS NULL
+                WHERE e.tenant_id = :tenant_id
+                  AND e.deleted_at IS NULL
+                  AND e.status::text IN ('active', 'pending')
+                  AND e.start_date <= :date_to
+                  AND COALESCE(e.end_date, 'infinity'::date) >= :date_from
+                GROUP BY p.person_id
+            """),
+            {"tenant_id": tenant_id, "date_from": date_from, "date_to": date_to}
+        )
+        workers = []
+        for row in result:
+            periods = []
+            for start, end in zip(row.employment_starts, row.employment_ends):
+                if row.visa_expiry_date and row.visa_expiry_date < end:
+                    end = row.visa_expiry_date
+                if start <= end:
+                    periods.append((start, end))
+            workers.append({
+                "person_id": row.person_id,
+                "periods": periods,
+                "skills": set(row.skills or []),
+                "regions": set(row.preferred_regions or []),
+            })
+        return workers
+
+    @staticmethod
+    def _is_available(worker: Dict[str, Any], d: date) -> bool:
+        return any(start <= d <= end for start, end in worker["periods"])
+
+    @staticmethod
+    async def _fetch_booked(
+        db: AsyncSession, session_id: UUID, date_from: date, date_to: date
+    ) -> List[Tuple[UUID, UUID, date]]:
+        """セッション差分を重ねた既存スロット (person_id, client_org_id, slot_date)"""
+        result = await db.execute(
+            text(f"""
+                WITH overlay AS ({DispatchGridBuilder.OVERLAY_SLOTS_SQL})
+                SELECT person_id, client_org_id, slot_date
+                FROM overlay
+                WHERE person_id IS NOT NULL AND client_org_id IS NOT NULL
+            """),
+            {"session_id": session_id, "date_from": date_from, "date_to": date_to}
+        )
+        return [(r.person_id, r.client_org_id, r.slot_date) for r in result]
+
+    # ------------------------------------------------------------------
+    # 求解（DB に触れない純粋関数）
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def solve(
+        days: List[date],
+        clients: List[Dict[str, Any]],
+        workers: List[Dict[str, Any]],
+        booked: List[Tuple[UUID, UUID, date]],
+        time_budget: float
+    ) -> Tuple[List[Tuple[UUID, UUID, date]], bool]:
+        """割当 (person_id, client_org_id, slot_date) のリストと、時間切れかどうかを返す"""
+        deadline = time.perf_counter() + max(time_budget, 0)
+        timed_out = False
+
+        booked_people: Set[Tuple[UUID, date]] = {(p, d) for (p, _, d) in booked}
+        booked_count: Dict[Tuple[UUID, date], int] = {}
+        for (_, org_id, d) in booked:
+            booked_count[(org_id, d)] = booked_count.get((org_id, d), 0) + 1
+
+        # スキル要件は日によらないので、人材ごとの候補企業を先に絞る
+        skill_ok: Dict[UUID, List[Dict[str, Any]]] = {
+            w["person_id"]: [c for c in clients if c["required_skills"] <= w["skills"]] for w in workers
+        }
+
+        assignments: List[Tuple[UUID, UUID, date]] = []
+        previous: Dict[UUID, UUID] = {}  # 前日の割当先（継続性の優先に使う）
+
+        for d in days:
+            capacity = {
+                c["org_id"]: c["required"] - booked_count.get((c["org_id"], d), 0) for c in clients
+            }
+            capacity = {org_id: cap for org_id, cap in capacity.items() if cap > 0}
+            if not capacity:
+                continue
+
+            adjacency: Dict[UUID, List[UUID]] = {}
+            for w in workers:
+                person_id = w["person_id"]
+                if (person_id, d) in booked_people or not DispatchOptimizer._is_available(w, d):
+                    continue
+                options = [c for c in skill_ok[person_id] if c["org_id"] in capacity]
+                if not options:
+                    continue
+                prev = previous.get(person_id)
+                options.sort(key=lambda c: (
+                    c["org_id"] != prev,
+                    not (c["region"] and c["region"] in w["regions"]),
+                    -capacity[c["org_id"]]
+                ))
+                adjacency[person_id] = [c["org_id"] for c in options]
+
+            matched, day_timed_out = DispatchOptimizer._match_day(adjacency, capacity, deadline)
+            timed_out = timed_out or day_timed_out
+
+            previous = matched
+            assignments.extend((person_id, org_id, d) for person_id, org_id in matched.items())
+
+        return assignments, timed_out
+
+    @staticmethod
+    def _match_day(
+        adjacency: Dict[UUID, List[UUID]],
+        capacity: Dict[UUID, int],
+        deadline: float
+    ) -> Tuple[Dict[UUID, UUID], bool]:
+        """
+        容量付き二部マッチング。貪欲な初期解の後、未割当の人材ごとに
+        BFS で増加路（人材 → 企業 → その企業の割当人材 → …）を探す。
+        """
+        assigned: Dict[UUID, UUID] = {}
+        members: Dict[UUID, List[UUID]] = {org_id: [] for org_id in capacity}
+
+        # 選択肢の少ない人材から埋める
+        order = sorted(adjacency, key=lambda p: len(adjacency[p]))
+        unmatched = []
+        for person_id in order:
+            for org_id in adjacency[person_id]:
+                if len(members[org_id]) < capacity[org_id]:
+                    assigned[person_id] = org_id
+                    members[org_id].append(person_id)
+                    break
+            else:
+                unmatched.append(person_id)
+
+        for start in unmatched:
+            if all(len(members[o]) >= capacity[o] for o in capacity):
+                break
+            if time.perf_counter() > deadline:
+                return assigned, True
+
+            # BFS: parent[org] = 到達元の人材、parent_person[person] = 到達元の企業
+            parent_of_org: Dict[UUID, UUID] = {}
+            parent_of_person: Dict[UUID, Optional[UUID]] = {start: None}
+            queue = deque([start])
+            target = None
+            while queue and target is None:
+                person_id = queue.popleft()
+                for org_id in adjacency[person_id]:
+                    if org_id in parent_of_org:
+                        continue
+                    parent_of_org[org_id] = person_id
+                    if len(members[org_id]) < capacity[org_id]:
+                        target = org_id
+                        break
+                    for other in members[org_id]:
+                        if other not in parent_of_person:
+                            parent_of_person[other] = org_id
+                            queue.append(other)
+
+            if target is None:
+                continue
+
+            # 増加路に沿って付け替え
+            org_id = target
+            while org_id is not None:
+                person_id = parent_of_org[org_id]
+                previous_org = parent_of_person[person_id]
+                if previous_org is not None:
+                    members[previous_org].remove(person_id)
+                assigned[person_id] = org_id
+                members[org_id].append(person_id)
+                org_id = previous_org
+
+        return assigned, False
@@ -0,0 +1,343 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.models.dispatch import DispatchSlot, SimulationSession
+from src.api.schemas.dispatch import SimulationChange, SimulationSessionRead
+from src.api.services.dispatch_grid import DispatchGridBuilder
+from src.api.services.dispatch_slots import DispatchSlotBatchService
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchSimulationService:
+    """
+    派遣配置シミュレーション（コピーオンライト）
+
+    セッションは実スロットを複製せず、変更分だけを dispatch_slots の
+    is_simulation = TRUE 行として保持する（sql/029）。
+      追加: base_slot_id なし / 移動: base_slot_id + 移動先 / 削除: base_slot_id + 'removed'
+    グリッドは DispatchGridBuilder.OVERLAY_SLOTS_SQL で実スロットに重ねて表示し、
+    apply で差分を1トランザクションで実スロットへ反映する。
+    """
+
+    REMOVED = "removed"
+
+    @staticmethod
+    async def create_session(
+        db: AsyncSession,
+        tenant_id: UUID,
+        session_name: str,
+        week_start: date,
+        weeks: int = 1
+    ) -> SimulationSessionRead:
+        session = SimulationSession(
+            tenant_id=tenant_id,
+            session_name=session_name,
+            base_date=date.today(),
+            start_week=week_start,
+            end_week=week_start + timedelta(days=7 * weeks - 1),
+            status="draft"
+        )
+        db.add(session)
+        await db.commit()
+        await db.refresh(session)
+        return await DispatchSimulationService.get_session(db, session.session_id)
+
+    @staticmethod
+    async def get_session(db: AsyncSession, session_id: UUID) -> Optional[SimulationSessionRead]:
+        session = await db.get(SimulationSession, session_id)
+        if not session:
+            return None
+
+        return SimulationSessionRead(
+            sessionId=session.session_id,
+            sessionName=session.session_name,
+            weekStart=session.start_week,
+            status=session.status,
+            changes=await DispatchSimulationService._list_changes(db, session_id)
+        )
+
+    @staticmethod
+    async def record_changes(
+        db: AsyncSession,
+        session_id: UUID,
+        changes: List[SimulationChange]
+    ) -> SimulationSessionRead:
+        """
+        変更をセッションの差分として記録する。
+        対象は実スロットにセッション差分を重ねた現在の状態で探す。
+        apply の二重配置チェックはセッション期間だけを見るため、期間外の日付の変更は受け付けない。
+        """
+        session = await DispatchSimulationService._get_draft(db, session_id)
+        for change in changes:
+            if not session.start_week <= change.date <= session.end_week:
+                raise ValueError(
+                    f"Change date {change.date} is outside the session range "
+                    f"{session.start_week}..{session.end_week}"
+                )
+
+        # 1件ごとに flush し、同じ人・日への後続の変更が直前の差分を見つけられるようにする
+        for change in changes:
+            if change.action == "add":
+                if not change.toClientId:
+                    raise ValueError("toClientId is required for add")
+                DispatchSimulationService._add_delta(db, session, change.personId, change.toClientId, change.date)
+                await db.flush()
+                continue
+
+            if change.action not in ("remove", "move"):
+                raise ValueError(f"Unknown action: {change.action}")
+            if not change.fromClientId:
+                raise ValueError(f"fromClientId is required for {change.action}")
+            if change.action == "move" and not change.toClientId:
+                raise ValueError("toClientId is required for move")
+
+            delta = await DispatchSimulationService._find_delta(
+                db, session_id, change.personId, change.fromClientId, change.date
+            )
+            if delta:
+                if change.action == "move":
+                    delta.client_org_id = change.toClientId
+                elif delta.base_slot_id:
+                    delta.slot_status = DispatchSimulationService.REMOVED
+                else:
+                    # セッション内で追加した行は、削除すれば差分ごと消える
+                    await db.delete(delta)
+                await db.flush()
+                continue
+
+            live = await DispatchSimulationService._find_live(
+                db, session_id, change.personId, change.fromClientId, change.date
+            )
+            if not live:
+                raise ValueError(
+                    f"No slot for person {change.personId} at {change.fromClientId} on {change.date}"
+                )
+            db.add(DispatchSlot(
+                tenant_id=session.tenant_id,
+                week_start=live.week_start,
+                week_end=live.week_end,
+                slot_date=live.slot_date,
+                assignment_id=live.assignment_id,
+                client_org_id=change.toClientId if change.action == "move" else live.client_org_id,
+                person_id=live.person_id,
+                slot_status=live.slot_status if change.action == "move" else DispatchSimulationService.REMOVED,
+                is_simulation=True,
+                simulation_session_id=session_id,
+                base_slot_id=live.slot_id
+            ))
+            await db.flush()
+
+        await db.commit()
+        return await DispatchSimulationService.get_session(db, session_id)
+
+    @staticmethod
+    async def apply(db: AsyncSession, session_id: UUID) -> SimulationSessionRead:
+        """
+        差分を実スロットへ反映する（削除 → 移動 → 追加、1トランザクション）。
+        反映後の状態で同じ人が同じ日に複数配置される場合は反映しない。
+        一括操作・週コピーと同じテナント単位のロックを取ってから検査・反映する。
+        """
+        session = await DispatchSimulationService._get_draft(db, session_id)
+        await DispatchSlotBatchService._lock_tenant(db, session.tenant_id)
+        params = {
+            "session_id": session_id,
+            "date_from": session.start_week,
+            "date_to": session.end_week,
+        }
+
+        # 期間外の差分は下の二重配置チェックの対象外になるため反映しない
+        outside = (await db.execute(text("""
+            SELECT slot_date FROM dispatch_slots
+            WHERE simulation_session_id = :session_id AND is_simulation = TRUE
+              AND slot_date NOT BETWEEN :date_from AND :date_to
+            LIMIT 1
+        """), params)).first()
+        if outside:
+            raise ValueError(f"Session has a change on {outside.slot_date} outside its range")
+
+        conflicts = (await db.execute(
+            text(f"""
+                WITH overlay AS ({DispatchGridBuilder.OVERLAY_SLOTS_SQL})
+                SELECT person_id, slot_date
+                FROM overlay
+                WHERE person_id IS NOT NULL
+                GROUP BY person_id, slot_date
+                HAVING COUNT(*) > 1
+                LIMIT 1
+            """),
+            params
+        )).first()
+        if conflicts:
+            raise ValueError(f"Person {conflicts.person_id} is double booked on {conflicts.slot_date}")
+
+        summary = await DispatchSimulationService._count_changes(db, session_id)
+
+        # 削除（墓標は base_slot_id の ON DELETE CASCADE で一緒に消える）
+        await db.execute(text("""
+            DELETE FROM dispatch_slots
+            WHERE slot_id IN (
+                SELECT base_slot_id FROM dispatch_slots
+                WHERE simulation_session_id = :session_id AND is_simulation = TRUE
+                  AND base_slot_id IS NOT NULL AND slot_status = 'removed'
+            )
+        """), {"session_id": session_id})
+
+        # 移動
+        await db.execute(text("""
+            UPDATE dispatch_slots live
+            SET client_org_id = d.client_org_id,
+                person_id = d.person_id,
+                slot_date = d.slot_date,
+                week_start = d.week_start,
+                week_end = d.week_end,
+                slot_status = d.slot_status,
+                updated_at = NOW()
+            FROM dispatch_slots d
+            WHERE d.simulation_session_id = :session_id AND d.is_simulation = TRUE
+              AND d.base_slot_id = live.slot_id
+        """), {"session_id": session_id})
+
+        # 追加
+        await db.execute(text("""
+            INSERT INTO dispatch_slots (
+                tenant_id, week_start, week_end, slot_date, assignment_id,
+                client_org_id, person_id, slot_status, notes
+            )
+            SELECT tenant_id, week_start, week_end, slot_date, assignment_id,
+                   client_org_id, person_id, slot_status, notes
+            FROM dispatch_slots
+            WHERE simulation_session_id = :session_id AND is_simulation = TRUE
+              AND base_slot_id IS NULL
+        """), {"session_id": session_id})
+
+        await db.execute(text("""
+            DELETE FROM dispatch_slots
+            WHERE simulation_session_id = :session_id AND is_simulation = TRUE
+        """), {"session_id": session_id})
+
+        session.status = "applied"
+        session.changes_summary = summary
+        await db.commit()
+        logger.info(f"Applied simulation {session_id}: {summary}")
+        return await DispatchSimulationService.get_session(db, session_id)
+
+    @staticmethod
+    async def discard(db: AsyncSession, session_id: UUID) -> SimulationSessionRead:
+        session = await DispatchSimulationService._get_draft(db, session_id)
+        await db.execute(text("""
+            DELETE FROM dispatch_slots
+            WHERE simulation_session_id = :session_id AND is_simulation = TRUE
+        """), {"session_id": session_id})
+        session.status = "discarded"
+        await db.commit()
+        return await DispatchSimulationService.get_session(db, session_id)
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _get_draft(db: AsyncSession, session_id: UUID) -> SimulationSession:
+        session = await db.get(SimulationSession, session_id)
+        if not session:
+            raise LookupError(f"Simulation session not found: {session_id}")
+        if session.status != "draft":
+            raise ValueError(f"Simulation session is already {session.status}")
+        return session
+
+    @staticmethod
+    def _add_delta(db: AsyncSession, session: SimulationSession, person_id: UUID, client_org_id: UUID, slot_date: date):
+        week_start = slot_date - timedelta(days=slot_date.weekday())
+        db.add(DispatchSlot(
+            tenant_id=session.tenant_id,
+            week_start=week_start,
+            week_end=week_start + timedelta(days=6),
+            slot_date=slot_date,
+            client_org_id=client_org_id,
+            person_id=person_id,
+            slot_status="planned",
+            is_simulation=True,
+            simulation_session_id=session.session_id
+        ))
+
+    @staticmethod
+    async def _find_delta(
+        db: AsyncSession, session_id: UUID, person_id: UUID, client_org_id: UUID, slot_date: date
+    ) -> Optional[DispatchSlot]:
+        """セッション内の有効な差分行（追加・移動）"""
+        result = await db.execute(select(DispatchSlot).where(
+            DispatchSlot.simulation_session_id == session_id,
+            DispatchSlot.is_simulation == True,
+            DispatchSlot.slot_status != DispatchSimulationService.REMOVED,
+            DispatchSlot.person_id == person_id,
+            DispatchSlot.client_org_id == client_org_id,
+            DispatchSlot.slot_date == slot_date
+        ).limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def _find_live(
+        db: AsyncSession, session_id: UUID, person_id: UUID, client_org_id: UUID, slot_date: date
+    ) -> Optional[DispatchSlot]:
+        """セッションでまだ変更されていない実スロット"""
+        overridden = select(DispatchSlot.base_slot_id).where(
+            DispatchSlot.simulation_session_id == session_id,
+            DispatchSlot.is_simulation == True,
+            DispatchSlot.base_slot_id != None
+        )
+        result = await db.execute(select(DispatchSlot).where(
+            DispatchSlot.is_simulation == False,
+            DispatchSlot.person_id == person_id,
+            DispatchSlot.client_org_id == client_org_id,
+            DispatchSlot.slot_date == slot_date,
+            DispatchSlot.slot_id.not_in(overridden)
+        ).limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def _list_changes(db: AsyncSession, session_id: UUID) -> List[SimulationChange]:
+        result = await db.execute(text("""
+            SELECT
+                CASE
+                    WHEN d.base_slot_id IS NULL THEN 'add'
+                    WHEN d.slot_status = 'removed' THEN 'remove'
+                    ELSE 'move'
+                END AS action,
+                d.person_id,
+                p.names->>'full_name' AS person_name,
+                b.client_org_id AS from_client_id,
+                CASE WHEN d.slot_status = 'removed' THEN NULL ELSE d.client_org_id END AS to_client_id,
+                d.slot_date
+            FROM dispatch_slots d
+            LEFT JOIN dispatch_slots b ON b.slot_id = d.base_slot_id
+            LEFT JOIN people p ON p.person_id = d.person_id
+            WHERE d.simulation_session_id = :session_id AND d.is_simulation = TRUE
+            ORDER BY d.slot_date, person_name
+        """), {"session_id": session_id})
+        return [
+            SimulationChange(
+                action=row.action,
+                personId=row.person_id,
+                personName=row.person_name or "Unknown",
+                fromClientId=row.from_client_id,
+                toClientId=row.to_client_id,
+                date=row.slot_date
+            )
+            for row in result
+        ]
+
+    @staticmethod
+    async def _count_changes(db: AsyncSession, session_id: UUID) -> Dict[str, Any]:
+        row = (await db.execute(text("""
+            SELECT
+                COUNT(*) FILTER (WHERE base_slot_id IS NULL) AS added,
+                COUNT(*) FILTER (WHERE base_slot_id IS NOT NULL AND slot_status <> 'removed') AS moved,
+                COUNT(*) FILTER (WHERE slot_status = 'removed') AS removed
+            FROM dispatch_slots
+            WHERE simulation_session_id = :session_id AND is_simulation = TRUE
+        """), {"session_id": session_id})).one()
+        return {"added": row.added, "moved": row.moved, "removed": row.removed}
@@ -0,0 +1,311 @@
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.database import get_asyncpg_connection
+from src.api.schemas.dispatch import (
+    SlotOperation, SlotBatchResult, GridCell, CopyWeekResult
+)
+from src.api.services.dispatch_grid import DispatchGridBuilder
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchSlotBatchService:
+    """
+    派遣スロットの一括操作（ドラッグ＆ドロップ・前週コピー）
+
+    操作はまとめて検証（同じ人の同日二重配置がないこと）してから、
+    削除 → 移動（unnest による一括 UPDATE）→ 作成（COPY）の順に1トランザクションで反映する。
+    同じテナントの一括操作はアドバイザリロックで直列化し、検証と反映の間に割り込ませない。
+    """
+
+    SLOT_COLUMNS = (
+        "slot_id", "tenant_id", "week_start", "week_end", "slot_date",
+        "client_org_id", "person_id", "slot_status"
+    )
+
+    @staticmethod
+    async def apply_operations(
+        db: AsyncSession,
+        tenant_id: UUID,
+        operations: List[SlotOperation]
+    ) -> SlotBatchResult:
+        await DispatchSlotBatchService._lock_tenant(db, tenant_id)
+
+        creates, moves, deletes = DispatchSlotBatchService._split(operations)
+
+        # 移動・削除対象の既存スロット
+        target_ids = [op.slotId for op in moves] + [op.slotId for op in deletes]
+        existing = await DispatchSlotBatchService._load_slots(db, tenant_id, target_ids)
+        missing = [str(i) for i in target_ids if i not in existing]
+        if missing:
+            raise LookupError(f"Slots not found: {', '.join(missing)}")
+
+        # 反映後の (person_id, slot_date) を組み立てる
+        new_rows: List[Dict[str, Any]] = []
+        for op in creates:
+            new_rows.append({
+                "slot_id": uuid4(),
+                "person_id": op.personId,
+                "client_org_id": op.clientOrgId,
+                "slot_date": op.date,
+            })
+        moved_rows: List[Dict[str, Any]] = []
+        for op in moves:
+            current = existing[op.slotId]
+            moved_rows.append({
+                "slot_id": op.slotId,
+                "person_id": op.personId or current.person_id,
+                "client_org_id": op.clientOrgId or current.client_org_id,
+                "slot_date": op.date or current.slot_date,
+            })
+
+        await DispatchSlotBatchService._check_double_booking(
+            db, tenant_id, new_rows + moved_rows, excluded_ids=set(target_ids)
+        )
+
+        # 反映
+        if deletes:
+            await db.execute(
+                text("DELETE FROM dispatch_slots WHERE slot_id = ANY(CAST(:ids AS uuid[]))"),
+                {"ids": [op.slotId for op in deletes]}
+            )
+
+        if moved_rows:
+            await db.execute(
+                text("""
+                    UPDATE dispatch_slots s
+                    SET client_org_id = v.client_org_id,
+                        person_id = v.person_id,
+                        slot_date = v.slot_date,
+                        week_start = v.week_start,
+                        week_end = v.week_start + 6,
+                        updated_at = NOW()
+                    FROM unnest(
+                        CAST(:ids AS uuid[]), CAST(:clients AS uuid[]), CAST(:persons AS uuid[]),
+                        CAST(:dates AS date[]), CAST(:week_starts AS date[])
+                    ) AS v(slot_id, client_org_id, person_id, slot_date, week_start)
+                    WHERE s.slot_id = v.slot_id
+                """),
+                {
+                    "ids": [r["slot_id"] for r in moved_rows],
+                    "clients": [r["client_org_id"] for r in moved_rows],
+                    "persons": [r["person_id"] for r in moved_rows],
+                    "dates": [r["slot_date"] for r in moved_rows],
+                    "week_starts": [DispatchSlotBatchService._week_start(r["slot_date"]) for r in moved_rows],
+                }
+            )
+
+        if new_rows:
+            conn = await get_asyncpg_connection(db)
+            await conn.copy_records_to_table(
+                "dispatch_slots",
+                records=[
+                    (
+                        r["slot_id"], tenant_id,
+                        DispatchSlotBatchService._week_start(r["slot_date"]),
+                        DispatchSlotBatchService._week_start(r["slot_date"]) + timedelta(days=6),
+                        r["slot_date"], r["client_org_id"], r["person_id"], "planned"
+                    )
+                    for r in new_rows
+                ],
+                columns=list(DispatchSlotBatchService.SLOT_COLUMNS),
+            )
+
+        await db.commit()
+
+        # 影響を受けたセル（移動元・移動先・作成先・削除元）を返す
+        touched: Set[Tuple[UUID, date]] = {(r["client_org_id"], r["slot_date"]) for r in new_rows + moved_rows}
+        touched |= {(existing[i].client_org_id, existing[i].slot_date) for i in target_ids}
+        cells = await DispatchSlotBatchService._load_cells(db, touched)
+
+        logger.info(
+            f"Slot batch for {tenant_id}: {len(creates)} created, {len(moves)} moved, {len(deletes)} deleted"
+        )
+        return SlotBatchResult(created=len(creates), moved=len(moves), deleted=len(deletes), cells=cells)
+
+    @staticmethod
+    async def copy_week(
+        db: AsyncSession,
+        tenant_id: UUID,
+        source_week_start: date,
+        target_week_start: Optional[date] = None
+    ) -> CopyWeekResult:
+        """
+        source 週の実スロットを target 週（省略時は翌週）へ INSERT ... SELECT で複製する。
+        コピー先の同日に既に配置がある人はスキップする。
+        週は月曜始まり（_week_start と同じ）のため、source_week_start は月曜日でなければならない。
+        """
+        if source_week_start != DispatchSlotBatchService._week_start(source_week_start):
+            raise ValueError("source_week_start must be a Monday")
+        target_week_start = target_week_start or source_week_start + timedelta(days=7)
+        shift = (target_week_start - source_week_start).days
+        if shift == 0 or shift % 7 != 0:
+            raise ValueError("target_week_start must be a different week aligned with source_week_start")
+
+        await DispatchSlotBatchService._lock_tenant(db, tenant_id)
+
+        row = (await db.execute(
+            text("""
+                WITH source AS (
+                    SELECT DISTINCT ON (s.person_id, s.slot_date) s.*
+                    FROM dispatch_slots s
+                    WHERE s.tenant_id = :tenant_id
+                      AND s.is_simulation = FALSE
+                      AND s.person_id IS NOT NULL
+                      AND s.slot_date BETWEEN :source_from AND :source_to
+                    ORDER BY s.person_id, s.slot_date, s.created_at
+                ),
+                inserted AS (
+                    INSERT INTO dispatch_slots (
+                        tenant_id, week_start, week_end, slot_date, assignment_id,
+                        client_org_id, person_id, slot_status, notes
+                    )
+                    SELECT
+                        src.tenant_id, CAST(:target_from AS date), CAST(:target_to AS date), src.slot_date + CAST(:shift AS integer),
+                        src.assignment_id, src.client_org_id, src.person_id, 'planned', src.notes
+                    FROM source src
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM dispatch_slots t
+                        WHERE t.person_id = src.person_id
+                          AND t.slot_date = src.slot_date + CAST(:shift AS integer)
+                          AND t.is_simulation = FALSE
+                    )
+                    RETURNING 1
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM source) AS source_count,
+                    (SELECT COUNT(*) FROM inserted) AS copied
+            """),
+            {
+                "tenant_id": tenant_id,
+                "source_from": source_week_start,
+                "source_to": source_week_start + timedelta(days=6),
+                "target_from": target_week_start,
+                "target_to": target_week_start + timedelta(days=6),
+                "shift": shift,
+            }
+        )).one()
+        await db.commit()
+
+        return CopyWeekResult(
+            sourceWeekStart=source_week_start,
+            targetWeekStart=target_week_start,
+            copied=row.copied,
+            skipped=row.source_count - row.copied
+        )
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _split(operations: List[SlotOperation]):
+        creates, moves, deletes = [], [], []
+        seen: Set[UUID] = set()
+        for i, op in enumerate(operations):
+            if op.op == "create":
+                if not (op.personId and op.clientOrgId and op.date):
+                    raise ValueError(f"operations[{i}]: create requires personId, clientOrgId and date")
+                creates.append(op)
+                continue
+            if op.op not in ("move", "delete"):
+                raise ValueError(f"operations[{i}]: unknown op '{op.op}'")
+            if not op.slotId:
+                raise ValueError(f"operations[{i}]: {op.op} requires slotId")
+            if op.slotId in seen:
+                raise ValueError(f"operations[{i}]: slot {op.slotId} appears more than once")
+            seen.add(op.slotId)
+            (moves if op.op == "move" else deletes).append(op)
+        return creates, moves, deletes
+
+    @staticmethod
+    async def _lock_tenant(db: AsyncSession, tenant_id: UUID):
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext('dispatch_slots:' || :tenant_id))"),
+            {"tenant_id": str(tenant_id)}
+        )
+
+    @staticmethod
+    async def _load_slots(db: AsyncSession, tenant_id: UUID, slot_ids: List[UUID]) -> Dict[UUID, Any]:
+        if not slot_ids:
+            return {}
+        result = await db.execute(
+            text("""
+                SELECT slot_id, client_org_id, person_id, slot_date
+                FROM dispatch_slots
+                WHERE slot_id = ANY(CAST(:ids AS uuid[]))
+                  AND tenant_id = :tenant_id
+                  AND is_simulation = FALSE
+                FOR UPDATE
+            """),
+            {"ids": slot_ids, "tenant_id": tenant_id}
+        )
+        return {row.slot_id: row for row in result}
+
+    @staticmethod
+    async def _check_double_booking(
+        db: AsyncSession,
+        tenant_id: UUID,
+        rows: List[Dict[str, Any]],
+        excluded_ids: Set[UUID]
+    ):
+        """反映後に同じ人が同じ日に2枠以上持たないことを確認する"""
+        keys = [(r["person_id"], r["slot_date"]) for r in rows if r["person_id"]]
+        if not keys:
+            return
+
+        counts = Counter(keys)
+        result = await db.execute(
+            text("""
+                SELECT s.slot_id, s.person_id, s.slot_date
+                FROM dispatch_slots s
+                JOIN unnest(CAST(:persons AS uuid[]), CAST(:dates AS date[])) AS k(person_id, slot_date)
+                  ON s.person_id = k.person_id AND s.slot_date = k.slot_date
+                WHERE s.is_simulation = FALSE
+            """),
+            {"persons": [k[0] for k in keys], "dates": [k[1] for k in keys]}
+        )
+        seen_ids: Set[UUID] = set()
+        for row in result:
+            if row.slot_id in excluded_ids or row.slot_id in seen_ids:
+                continue
+            seen_ids.add(row.slot_id)
+            counts[(row.person_id, row.slot_date)] += 1
+
+        conflicts = [f"{person_id} on {slot_date}" for (person_id, slot_date), n in counts.items() if n > 1]
+        if conflicts:
+            raise ValueError(f"Double booking: {', '.join(conflicts)}")
+
+    @staticmethod
+    async def _load_cells(db: AsyncSession, keys: Set[Tuple[UUID, date]]) -> List[GridCell]:
+        if not keys:
+            return []
+        date_from = min(d for _, d in keys)
+        date_to = max(d for _, d in keys)
+
+        orgs = (await db.execute(
+            text("SELECT org_id, settings FROM organizations WHERE org_id = ANY(CAST(:ids AS uuid[]))"),
+            {"ids": list({org_id for org_id, _ in keys})}
+        )).fetchall()
+        required = {o.org_id: (o.settings or {}).get("required_workers", 1) for o in orgs}
+
+        slots = await DispatchGridBuilder._fetch_slots(db, date_from, date_to)
+        index = DispatchGridBuilder.index_slots(s for s in slots if (s.client_org_id, s.slot_date) in keys)
+
+        return [
+            GridCell(
+                clientOrgId=org_id,
+                date=slot_date,
+                cell=DispatchGridBuilder.make_cell(index.get((org_id, slot_date), []), required.get(org_id, 1))
+            )
+            for org_id, slot_date in sorted(keys, key=lambda k: (str(k[0]), k[1]))
+        ]
+
+    @staticmethod
+    def _week_start(d: date) -> date:
+        return d - timedelta(days=d.weekday())
@@ -0,0 +1,306 @@
+"""
+Slackリスト取り込みのドライラン（差分プレビュー）
+
+CSV をバッチ単位で読み、バッチごとに people / visa_cases を1〜2クエリでまとめて引いて
+取り込んだ場合の変更を項目単位で返す。DB には一切書き込まない。
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.services.csv_stream import CsvSource, batched, iter_csv_rows
+from src.api.services.date_parser import DateColumnParser
+from src.api.services.org_normalizer import OrganizationResolver
+from src.api.services.slack_list_importer import SlackListImporter
+
+logger = logging.getLogger(__name__)
+
+
+class SlackImportDiff:
+    """
+    import_staff_list / import_visa_list のドライラン
+
+    比較条件は SlackListImporter.STAFF_UPSERT_CHANGED_SQL と同じで、
+    ここで no-op と判定された行は本番の取り込みでも UPDATE されない。
+    企業名は読み込み済みの企業・エイリアスだけで解決し、解決できない名前は
+    unresolved_companies として返す（本番では類似度一致または新規作成になる）。
+    """
+
+    BATCH_SIZE = 2000
+
+    # 単純比較する people のカラム（JSONB マージ以外）
+    SCALAR_FIELDS = ("current_status", "nationality", "current_visa_type", "visa_expiry_date")
+
+    @classmethod
+    async def diff_staff_list(cls, db: AsyncSession, csv_content: CsvSource, tenant_id: UUID) -> Dict[str, Any]:
+        resolver = await OrganizationResolver.load(db, tenant_id)
+        diff: Dict[str, Any] = {
+            "dry_run": True,
+            "new_people": [],
+            "updated_people": [],
+            "visa_expiry_changes": [],
+            "status_changes": [],
+            "org_reassignments": [],
+            "unresolved_companies": set(),
+            "noop_count": 0,
+            "skip_count": 0,
+            "errors": [],
+            "warnings": [],
+        }
+
+        # 日付列の形式はファイル先頭で1回だけ判定する（本番のインポートと同じ）
+        date_parsers, numbered_rows = DateColumnParser.for_numbered_rows(
+            SlackListImporter.STAFF_DATE_COLUMNS, enumerate(iter_csv_rows(csv_content), start=2)
+        )
+        cls._add_warnings(diff, date_parsers)
+
+        for rows in batched(numbered_rows, cls.BATCH_SIZE):
+            records = cls._parse_staff_batch(rows, diff, date_parsers)
+            existing = await cls._fetch_people(db, tenant_id, list(records))
+            for full_name, record in records.items():
+                cls._diff_person(record, existing.get(full_name), resolver, diff)
+
+        diff["unresolved_companies"] = sorted(diff["unresolved_companies"])
+        diff["total_processed"] = (
+            len(diff["new_people"]) + len(diff["updated_people"]) + diff["noop_count"] + diff["skip_count"]
+        )
+        return diff
+
+    @classmethod
+    async def diff_visa_list(cls, db: AsyncSession, csv_content: CsvSource, tenant_id: UUID) -> Dict[str, Any]:
+        resolver = await OrganizationResolver.load(db, tenant_id)
+        diff: Dict[str, Any] = {
+            "dry_run": True,
+            "new_cases": [],
+            "missing_people": [],
+            "unresolved_companies": set(),
+            "existing_count": 0,
+            "duplicate_count": 0,
+            "warnings": [],
+        }
+        seen: Set[Tuple[UUID, str, Any]] = set()
+
+        date_parsers, numbered_rows = DateColumnParser.for_numbered_rows(
+            SlackListImporter.VISA_DATE_COLUMNS, enumerate(iter_csv_rows(csv_content), start=2)
+        )
+        cls._add_warnings(diff, date_parsers)
+
+        for rows in batched(numbered_rows, cls.BATCH_SIZE):
+            parsed = []
+            for row_num, row in rows:
+                name = row.get("名前", "").strip()
+                if not name:
+                    continue
+                org_name = row.get("受入れ企業") or row.get("会社名")
+                parsed.append({
+                    "row": row_num,
+                    "name": name,
+                    "org_name": org_name,
+                    "case_type": SlackListImporter.safe_map(
+                        row.get("申請種類"), SlackListImporter.CASE_TYPE_MAP, "notification"
+                    ),
+                    "deadline": date_parsers["期限日"].parse(row.get("期限日")),
+                })
+
+            # ビザ案件は論理削除済みの人材には付けない（import_visa_rows と同じ）
+            people = await cls._fetch_people(db, tenant_id, list({p["name"] for p in parsed}), active_only=True)
+            person_ids = [p.person_id for p in people.values()]
+            existing_cases = await cls._fetch_visa_case_keys(db, tenant_id, person_ids)
+
+            for item in parsed:
+                person = people.get(item["name"])
+                if not person:
+                    diff["missing_people"].append({"row": item["row"], "name": item["name"]})
+                    continue
+
+                key = (person.person_id, item["case_type"], item["deadline"])
+                if key in existing_cases:
+                    diff["existing_count"] += 1
+                    continue
+                if key in seen:
+                    diff["duplicate_count"] += 1
+                    continue
+                seen.add(key)
+
+                org_id = resolver.peek_org_id(item["org_name"]) if item["org_name"] else None
+                if item["org_name"] and org_id is None:
+                    diff["unresolved_companies"].add(item["org_name"].strip())
+                diff["new_cases"].append({
+                    "row": item["row"],
+                    "name": item["name"],
+                    "case_type": item["case_type"],
+                    "deadline": item["deadline"],
+                    "client_org_id": org_id,
+                })
+
+        diff["unresolved_companies"] = sorted(diff["unresolved_companies"])
+        return diff
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _add_warnings(diff: Dict[str, Any], date_parsers: Dict[str, DateColumnParser]):
+        diff["warnings"].extend(
+            w for w in DateColumnParser.warnings(date_parsers) if w not in diff["warnings"]
+        )
+
+    @classmethod
+    def _parse_staff_batch(
+        cls,
+        rows: List[Tuple[int, Dict[str, str]]],
+        diff: Dict[str, Any],
+        date_parsers: Dict[str, DateColumnParser]
+    ) -> Dict[str, Dict[str, Any]]:
+        """バッチをパースし、同名行は一括インポートと同じ規則で統合する"""
+        records: Dict[str, Dict[str, Any]] = {}
+        for row_num, row in rows:
+            full_name = row.get("名前", "").strip().strip('"')
+            try:
+                record = SlackListImporter._parse_staff_row(row, row_num, date_parsers)
+            except Exception as e:
+                diff["errors"].append(f"Row {row_num} ({full_name}): {str(e)}")
+                diff["skip_count"] += 1
+                continue
+
+            if record is None:
+                diff["skip_count"] += 1
+                continue
+
+            if full_name in records:
+                SlackListImporter._merge_duplicate_staff_record(records[full_name], record)
+            else:
+                records[full_name] = record
+        return records
+
+    @staticmethod
+    async def _fetch_people(
+        db: AsyncSession,
+        tenant_id: UUID,
+        names: List[str],
+        active_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        名前 → 現在の people 行（(tenant_id, full_name) のインデックスを使う1クエリ）
+        人材の UPSERT は論理削除済みの行にも当たるため、既定では論理削除済みも含めます。
+        """
+        if not names:
+            return {}
+        active_filter = "AND deleted_at IS NULL" if active_only else ""
+        result = await db.execute(
+            text(f"""
+                SELECT
+                    names->>'full_name' AS full_name,
+                    person_id,
+                    demographics,
+                    contact_info,
+                    current_status::text AS current_status,
+                    current_status_notes,
+                    nationality,
+                    current_visa_type::text AS current_visa_type,
+                    visa_expiry_date,
+                    org_id
+                FROM people
+                WHERE tenant_id = :tenant_id
+                  AND names->>'full_name' = ANY(CAST(:names AS text[]))
+                  {active_filter}
+            """),
+            {"tenant_id": tenant_id, "names": names}
+        )
+        return {row.full_name: row for row in result}
+
+    @staticmethod
+    async def _fetch_visa_case_keys(
+        db: AsyncSession,
+        tenant_id: UUID,
+        person_ids: List[UUID]
+    ) -> Set[Tuple[UUID, str, Any]]:
+        if not person_ids:
+            return set()
+        result = await db.execute(
+            text("""
+                SELECT person_id, case_type::text AS case_type, deadline
+                FROM visa_cases
+                WHERE tenant_id = :tenant_id
+                  AND person_id = ANY(CAST(:person_ids AS uuid[]))
+            """),
+            {"tenant_id": tenant_id, "person_ids": person_ids}
+        )
+        return {(row.person_id, row.case_type, row.deadline) for row in result}
+
+    @classmethod
+    def _diff_person(
+        cls,
+        record: Dict[str, Any],
+        current: Optional[Any],
+        resolver: OrganizationResolver,
+        diff: Dict[str, Any]
+    ):
+        row_num = record["row_num"]
+        full_name = record["full_name"]
+        company_name = record["company_name"]
+
+        org_id = resolver.peek_org_id(company_name) if company_name else None
+        if company_name and org_id is None:
+            diff["unresolved_companies"].add(company_name)
+
+        if current is None:
+            diff["new_people"].append({"row": row_num, "name": full_name, "org_id": org_id})
+            return
+
+        changes: Dict[str, Any] = {}
+
+        # JSONB は || マージ後の値で比較し、変わるキーだけを返す
+        for field in ("demographics", "contact_info"):
+            before = getattr(current, field) or {}
+            changed = {
+                key: {"from": before.get(key), "to": value}
+                for key, value in record[field].items()
+                if key not in before or before[key] != value
+            }
+            if changed or getattr(current, field) is None:
+                changes[field] = changed
+
+        status_notes = json.dumps(record["status_notes"], ensure_ascii=False)
+        if current.current_status_notes != status_notes:
+            changes["current_status_notes"] = cls._json_text_diff(current.current_status_notes, record["status_notes"])
+
+        for field in cls.SCALAR_FIELDS:
+            if getattr(current, field) != record[field]:
+                changes[field] = {"from": getattr(current, field), "to": record[field]}
+
+        if org_id is not None and current.org_id != org_id:
+            changes["org_id"] = {"from": current.org_id, "to": org_id}
+            diff["org_reassignments"].append({
+                "row": row_num, "name": full_name, "company_name": company_name,
+                "from_org_id": current.org_id, "to_org_id": org_id,
+            })
+
+        if not changes:
+            diff["noop_count"] += 1
+            return
+
+        diff["updated_people"].append({"row": row_num, "name": full_name, "changes": changes})
+        if "visa_expiry_date" in changes:
+            diff["visa_expiry_changes"].append({"row": row_num, "name": full_name, **changes["visa_expiry_date"]})
+        if "current_status" in changes:
+            diff["status_changes"].append({"row": row_num, "name": full_name, **changes["current_status"]})
+
+    @staticmethod
+    def _json_text_diff(before_text: Optional[str], after: Dict[str, Any]) -> Dict[str, Any]:
+        """TEXT に JSON として保存された値の、変わるキーだけを返す"""
+        try:
+            before = json.loads(before_text) if before_text else {}
+        except ValueError:
+            return {"from": before_text, "to": after}
+        if not isinstance(before, dict):
+            return {"from": before_text, "to": after}
+        keys = set(before) | set(after)
+        return {
+            key: {"from": before.get(key), "to": after.get(key)}
+            for key in sorted(keys)
+            if before.get(key) != after.get(key)
+        }
@@ -0,0 +1,91 @@
+"""
+インポート行のフィンガープリント（内容ハッシュ）
+
+正規化済みの行内容を SHA-256 で要約し、import_row_hashes に取り込み元・人材単位で保存する。
+再インポート時は保存済みハッシュとバッチ単位で突き合わせ、一致した行は書き込み前にスキップする。
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class ImportFingerprint:
+    """
+    取り込み元ごとの行ハッシュの計算・読み込み・保存
+
+    source_key は取り込み元での行のキーで、people への対応付けは KEY_COLUMNS の式で行う。
+    """
+
+    # 正規化ルールを変えたら上げる（保存済みのハッシュをすべて無効にする）
+    VERSION = 1
+
+    # source_key と突き合わせる people の列
+    KEY_COLUMNS = {
+        "full_name": "p.names->>'full_name'",
+        "smarthr_crew_id": "p.smarthr_crew_id",
+    }
+
+    @classmethod
+    def compute(cls, record: Dict[str, Any], fields: Iterable[str]) -> str:
+        """record の fields を正規化した JSON のハッシュ（キー順・日付表現に依存しない）"""
+        payload = {"v": cls.VERSION, **{field: record.get(field) for field in fields}}
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    async def load(db: AsyncSession, tenant_id: UUID, source: str, keys: List[str]) -> Dict[str, str]:
+        """source_key -> 保存済みハッシュ（1クエリ）"""
+        if not keys:
+            return {}
+        result = await db.execute(
+            text("""
+                SELECT source_key, row_hash
+                FROM import_row_hashes
+                WHERE tenant_id = :tenant_id
+                  AND source = :source
+                  AND source_key = ANY(CAST(:keys AS text[]))
+            """),
+            {"tenant_id": tenant_id, "source": source, "keys": keys}
+        )
+        return {row.source_key: row.row_hash for row in result}
+
+    @classmethod
+    async def store(
+        cls,
+        db: AsyncSession,
+        tenant_id: UUID,
+        source: str,
+        hashes: Dict[str, str],
+        key_column: str = "full_name"
+    ):
+        """
+        取り込んだ行のハッシュを保存する（1クエリ）。
+        取り込みと同じトランザクションで呼び、失敗時は一緒に巻き戻るようにする。
+        """
+        if not hashes:
+            return
+        await db.execute(
+            text(f"""
+                INSERT INTO import_row_hashes (tenant_id, source, source_key, person_id, row_hash, imported_at)
+                SELECT CAST(:tenant_id AS uuid), :source, k.source_key, p.person_id, k.row_hash, NOW()
+                FROM unnest(CAST(:keys AS text[]), CAST(:hashes AS text[])) AS k(source_key, row_hash)
+                JOIN people p
+                  ON p.tenant_id = CAST(:tenant_id AS uuid)
+                 AND {cls.KEY_COLUMNS[key_column]} = k.source_key
+                ON CONFLICT (tenant_id, source, source_key)
+                DO UPDATE SET
+                    person_id = EXCLUDED.person_id,
+                    row_hash = EXCLUDED.row_hash,
+                    imported_at = NOW()
+            """),
+            {
+                "tenant_id": tenant_id,
+                "source": source,
+                "keys": list(hashes),
+                "hashes": list(hashes.values()),
+            }
+        )
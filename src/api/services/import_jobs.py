@@ -0,0 +1,260 @@
+import io
+import json
+import logging
+from itertools import islice
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.database import SessionLocal
+from src.api.schemas.imports import ImportJobRead
+from src.api.services.csv_stream import batched, iter_csv_rows
+from src.api.services.date_parser import DateColumnParser
+from src.api.services.org_normalizer import OrganizationResolver
+from src.api.services.slack_list_importer import SlackListImporter
+from src.api.services.smarthr_importer import SmartHRImporter
+
+logger = logging.getLogger(__name__)
+
+
+class ImportJobService:
+    """
+    CSV インポートのバックグラウンドジョブ
+
+    アップロード時はファイルを import_jobs に保存して job_id を返すだけにし、
+    取り込みは run_job が CHUNK_ROWS 行ずつ行う。各チャンクのデータと進捗カウンタは
+    同じトランザクションでコミットするため、失敗・中断したジョブは restart で
+    rows_committed 行の次から再開できる（処理済みの行は二重に取り込まない）。
+    """
+
+    IMPORT_TYPES = ("slack_staff", "slack_visa", "smarthr")
+    CHUNK_ROWS = 500
+    MAX_STORED_ERRORS = 200
+    # heartbeat がこれより古い running ジョブはワーカーが落ちたものとみなす
+    STALE_AFTER_MINUTES = 5
+
+    JOB_COLUMNS = """
+        job_id, tenant_id, import_type, file_name, status, attempts,
+        rows_committed, inserted_count, updated_count, skipped_count,
+        error_count, errors, last_error, started_at, finished_at, created_at
+    """
+
+    @staticmethod
+    async def create_job(
+        db: AsyncSession,
+        tenant_id: UUID,
+        import_type: str,
+        upload: BinaryIO,
+        file_name: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> ImportJobRead:
+        if import_type not in ImportJobService.IMPORT_TYPES:
+            raise ValueError(f"import_type must be one of: {', '.join(ImportJobService.IMPORT_TYPES)}")
+
+        row = (await db.execute(
+            text(f"""
+                INSERT INTO import_jobs (tenant_id, import_type, options, file_name, file_content)
+                VALUES (:tenant_id, :import_type, CAST(:options AS jsonb), :file_name, :file_content)
+                RETURNING {ImportJobService.JOB_COLUMNS}
+            """),
+            {
+                "tenant_id": tenant_id,
+                "import_type": import_type,
+                "options": json.dumps(options or {}),
+                "file_name": file_name,
+                "file_content": upload.read(),
+            }
+        )).one()
+        await db.commit()
+        return ImportJobRead.model_validate(row)
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: UUID) -> Optional[ImportJobRead]:
+        row = (await db.execute(
+            text(f"SELECT {ImportJobService.JOB_COLUMNS} FROM import_jobs WHERE job_id = :job_id"),
+            {"job_id": job_id}
+        )).one_or_none()
+        return ImportJobRead.model_validate(row) if row else None
+
+    @staticmethod
+    async def restart_job(db: AsyncSession, job_id: UUID) -> ImportJobRead:
+        """
+        失敗した（または heartbeat が途絶えた）ジョブを再キューする。進捗はそのまま引き継ぐ。
+        実行が始まる前にワーカーが落ちて queued のまま残ったジョブも、STALE_AFTER_MINUTES を過ぎれば再実行できる。
+        """
+        row = (await db.execute(
+            text(f"""
+                UPDATE import_jobs
+                SET status = 'queued', last_error = NULL, finished_at = NULL, updated_at = NOW()
+                WHERE job_id = :job_id
+                  AND (
+                      status = 'failed'
+                      OR (status = 'running'
+                          AND heartbeat_at < NOW() - make_interval(mins => :stale_minutes))
+                      OR (status = 'queued'
+                          AND COALESCE(updated_at, created_at) < NOW() - make_interval(mins => :stale_minutes))
+                  )
+                RETURNING {ImportJobService.JOB_COLUMNS}
+            """),
+            {"job_id": job_id, "stale_minutes": ImportJobService.STALE_AFTER_MINUTES}
+        )).one_or_none()
+        await db.commit()
+
+        if row:
+            return ImportJobRead.model_validate(row)
+
+        job = await ImportJobService.get_job(db, job_id)
+        if not job:
+            raise LookupError(f"Import job not found: {job_id}")
+        raise ValueError(f"Import job is {job.status} and cannot be restarted")
+
+    @staticmethod
+    async def run_job(job_id: UUID):
+        """
+        ジョブを実行する（BackgroundTasks から呼ぶ）。
+        リクエストのセッションは閉じているため、専用のセッションを開く。
+        """
+        async with SessionLocal() as db:
+            job = await ImportJobService._claim(db, job_id)
+            if not job:
+                logger.info(f"Import job {job_id} is not queued; skipping")
+                return
+
+            try:
+                await ImportJobService._process(db, job)
+            except Exception as e:
+                logger.exception(f"Import job {job_id} failed")
+                await db.rollback()
+                await db.execute(
+                    text("""
+                        UPDATE import_jobs
+                        SET status = 'failed', last_error = :error, finished_at = NOW(), updated_at = NOW()
+                        WHERE job_id = :job_id
+                    """),
+                    {"job_id": job_id, "error": str(e)}
+                )
+                await db.commit()
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _claim(db: AsyncSession, job_id: UUID) -> Optional[Any]:
+        """queued のジョブを running にする（同じジョブを2つのワーカーが処理しないように）"""
+        job = (await db.execute(
+            text("""
+                UPDATE import_jobs
+                SET status = 'running',
+                    attempts = attempts + 1,
+                    started_at = COALESCE(started_at, NOW()),
+                    heartbeat_at = NOW(),
+                    updated_at = NOW()
+                WHERE job_id = :job_id AND status = 'queued'
+                RETURNING job_id, tenant_id, import_type, options, file_content, rows_committed
+            """),
+            {"job_id": job_id}
+        )).one_or_none()
+        await db.commit()
+        return job
+
+    @staticmethod
+    async def _process(db: AsyncSession, job: Any):
+        options = job.options or {}
+        resolver = None
+        if job.import_type in ("slack_staff", "slack_visa"):
+            resolver = await OrganizationResolver.load(db, job.tenant_id)
+
+        # 行番号はファイル先頭から数え、コミット済みの行は読み飛ばす
+        rows = enumerate(iter_csv_rows(io.BytesIO(job.file_content)), start=2)
+        rows = islice(rows, job.rows_committed, None)
+
+        if job.rows_committed:
+            logger.info(f"Resuming import job {job.job_id} after {job.rows_committed} rows")
+
+        # 日付列の形式は再開時もファイル先頭から判定し、全チャンクで同じものを使う
+        date_parsers = ImportJobService._detect_date_formats(job)
+
+        for chunk in batched(rows, ImportJobService.CHUNK_ROWS):
+            result = await ImportJobService._import_chunk(db, job, options, resolver, date_parsers, chunk)
+            await ImportJobService._record_progress(db, job.job_id, len(chunk), result)
+            await db.commit()
+
+        await db.execute(
+            text("""
+                UPDATE import_jobs
+                SET status = 'completed', finished_at = NOW(), updated_at = NOW()
+                WHERE job_id = :job_id
+            """),
+            {"job_id": job.job_id}
+        )
+        await db.commit()
+        if resolver:
+            logger.info(f"Organization resolver stats: {resolver.get_stats()}")
+
+    @staticmethod
+    def _detect_date_formats(job: Any) -> Dict[str, DateColumnParser]:
+        """ファイル先頭の SAMPLE_SIZE 行から日付列の 日/月 順を判定する"""
+        columns = {
+            "slack_staff": SlackListImporter.STAFF_DATE_COLUMNS,
+            "slack_visa": SlackListImporter.VISA_DATE_COLUMNS,
+            "smarthr": SmartHRImporter.DATE_COLUMNS,
+        }[job.import_type]
+        head = list(islice(iter_csv_rows(io.BytesIO(job.file_content)), DateColumnParser.SAMPLE_SIZE))
+        return DateColumnParser.for_rows(columns, head)
+
+    @staticmethod
+    async def _import_chunk(
+        db: AsyncSession,
+        job: Any,
+        options: Dict[str, Any],
+        resolver: Optional[OrganizationResolver],
+        date_parsers: Dict[str, DateColumnParser],
+        chunk: List[Tuple[int, Dict[str, str]]]
+    ) -> Dict[str, Any]:
+        if job.import_type == "slack_staff":
+            if options.get("bulk"):
+                return await SlackListImporter.import_staff_rows_bulk(
+                    db, chunk, job.tenant_id, resolver, date_parsers
+                )
+            return await SlackListImporter.import_staff_rows(db, chunk, job.tenant_id, resolver, date_parsers)
+        if job.import_type == "slack_visa":
+            return await SlackListImporter.import_visa_rows(db, chunk, job.tenant_id, resolver, date_parsers)
+        return await SmartHRImporter.import_rows(db, chunk, job.tenant_id, date_parsers)
+
+    @staticmethod
+    async def _record_progress(db: AsyncSession, job_id: UUID, rows: int, result: Dict[str, Any]):
+        """チャンクの結果を加算する（チャンクのデータと同じトランザクション）"""
+        errors = result.get("errors", [])
+        await db.execute(
+            text("""
+                UPDATE import_jobs
+                SET rows_committed = rows_committed + :rows,
+                    inserted_count = inserted_count + :inserted,
+                    updated_count = updated_count + :updated,
+                    skipped_count = skipped_count + :skipped,
+                    error_count = error_count + :error_count,
+                    errors = (
+                        SELECT COALESCE(jsonb_agg(e.value ORDER BY e.ord), '[]'::jsonb)
+                        FROM (
+                            SELECT value, ord
+                            FROM jsonb_array_elements(errors || CAST(:errors AS jsonb)) WITH ORDINALITY AS t(value, ord)
+                            ORDER BY ord
+                            LIMIT :max_errors
+                        ) e
+                    ),
+                    heartbeat_at = NOW(),
+                    updated_at = NOW()
+                WHERE job_id = :job_id
+            """),
+            {
+                "job_id": job_id,
+                "rows": rows,
+                "inserted": result.get("success_count", 0),
+                "updated": result.get("update_count", 0),
+                "skipped": result.get("skip_count", 0),
+                "error_count": len(errors),
+                "errors": json.dumps(errors[:ImportJobService.MAX_STORED_ERRORS], ensure_ascii=False),
+                "max_errors": ImportJobService.MAX_STORED_ERRORS,
+            }
+        )
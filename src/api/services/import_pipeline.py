@@ -0,0 +1,258 @@
+"""
+ローカルCSVの一括インポート（依存関係つきの並行実行）
+
+ステージと依存関係:
+  orgs    : 人材管理リスト・ビザ申請依頼リストの企業名をまとめて先に解決（未登録の企業を作成）
+  staff   : 人材管理リスト（orgs の後）
+  visa    : ビザ申請依頼リスト（staff の後。人材を名前で引くため）
+  smarthr : SmartHR（staff の後。同じ人材行を2つの接続で同時に UPSERT しないため）
+
+visa と smarthr は互いに独立しているため、別々のセッション（プールの別接続）で並行に実行します。
+CSV の読み込み・パースは開始時にファイルごとにスレッドで先行させ、前のステージの書き込みと重ねます。
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.services.csv_stream import batched, iter_csv_rows
+from src.api.services.date_parser import DateColumnParser
+from src.api.services.org_normalizer import OrganizationResolver
+from src.api.services.slack_list_importer import SlackListImporter
+from src.api.services.smarthr_importer import SmartHRImporter
+
+logger = logging.getLogger(__name__)
+
+Rows = List[Tuple[int, Dict[str, str]]]
+
+
+class StageTiming:
+    """1ステージの所要時間と件数"""
+
+    def __init__(self, name: str, depends_on: Tuple[str, ...]):
+        self.name = name
+        self.depends_on = depends_on
+        self.rows = 0
+        self.wait_seconds = 0.0    # 依存ステージ・ファイルのパース待ち
+        self.parse_seconds = 0.0   # CSV の読み込み・パース（スレッド）
+        self.write_seconds = 0.0   # DB への書き込み（コミットまで）
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.skipped = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.write_seconds if self.write_seconds else 0.0
+
+
+class ImportPipeline:
+    """
+    人材管理リスト・ビザ申請依頼リスト・SmartHR CSV の一括インポート
+
+    使い方:
+        pipeline = ImportPipeline(SessionLocal, tenant_id, staff_path=..., visa_path=..., smarthr_path=...)
+        timings = await pipeline.run()
+        print(ImportPipeline.format_report(timings, pipeline.elapsed))
+    """
+
+    STAFF_BATCH_SIZE = 5000
+
+    # ステージ → 依存するステージ
+    STAGES = {
+        "orgs": (),
+        "staff": ("orgs",),
+        "visa": ("orgs", "staff"),
+        "smarthr": ("staff",),
+    }
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        tenant_id: UUID,
+        staff_path: Optional[str] = None,
+        visa_path: Optional[str] = None,
+        smarthr_path: Optional[str] = None
+    ):
+        self.session_factory = session_factory
+        self.tenant_id = tenant_id
+        self.paths = {"staff": staff_path, "visa": visa_path, "smarthr": smarthr_path}
+        self.timings = {name: StageTiming(name, deps) for name, deps in self.STAGES.items()}
+        self.resolver: Optional[OrganizationResolver] = None
+        self.elapsed = 0.0
+        self._parsed: Dict[str, "asyncio.Task[Tuple[Rows, float]]"] = {}
+
+    async def run(self) -> Dict[str, StageTiming]:
+        """全ステージを実行し、ステージごとの結果と所要時間を返します（失敗したステージは error に記録）"""
+        started = time.perf_counter()
+
+        # ファイルの読み込み・パースを先にすべて開始する
+        for name, path in self.paths.items():
+            if path:
+                self._parsed[name] = asyncio.create_task(asyncio.to_thread(self._read_rows, path))
+
+        stages: Dict[str, asyncio.Task] = {}
+        runners = {
+            "orgs": self._run_orgs,
+            "staff": self._run_staff,
+            "visa": self._run_visa,
+            "smarthr": self._run_smarthr,
+        }
+        for name, deps in self.STAGES.items():
+            stages[name] = asyncio.create_task(
+                self._run_stage(self.timings[name], [stages[d] for d in deps], runners[name])
+            )
+        await asyncio.gather(*stages.values(), return_exceptions=True)
+
+        self.elapsed = time.perf_counter() - started
+        return self.timings
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_rows(path: str) -> Tuple[Rows, float]:
+        """CSV を読み込んで (行番号, 行) のリストにする（スレッドで実行）"""
+        started = time.perf_counter()
+        with open(path, "rb") as f:
+            rows = list(enumerate(iter_csv_rows(f), start=2))
+        return rows, time.perf_counter() - started
+
+    async def _rows(self, name: str, timing: StageTiming) -> Optional[Rows]:
+        task = self._parsed.get(name)
+        if task is None:
+            return None
+        rows, parse_seconds = await task
+        timing.parse_seconds += parse_seconds
+        return rows
+
+    async def _run_stage(
+        self,
+        timing: StageTiming,
+        dependencies: List[asyncio.Task],
+        runner: Callable[[StageTiming], Any]
+    ):
+        waited = time.perf_counter()
+        try:
+            await asyncio.gather(*dependencies)
+        except Exception as e:
+            timing.error = f"dependency failed: {e}"
+            raise
+
+        try:
+            await runner(timing)
+        except Exception as e:
+            logger.error(f"Import stage '{timing.name}' failed: {e}")
+            timing.error = str(e)
+            raise
+        finally:
+            # 待ち時間 = 開始から書き込み開始までのうち、パース以外
+            total = time.perf_counter() - waited
+            timing.wait_seconds = max(0.0, total - timing.write_seconds - timing.parse_seconds)
+
+    async def _write(self, timing: StageTiming, work: Callable[[AsyncSession], Any]) -> Any:
+        """別セッションで work を実行してコミットし、書き込み時間を記録する"""
+        started = time.perf_counter()
+        async with self.session_factory() as db:
+            result = await work(db)
+            await db.commit()
+        timing.write_seconds += time.perf_counter() - started
+        return result
+
+    # ------------------------------------------------------------------
+
+    async def _run_orgs(self, timing: StageTiming):
+        staff_rows = await self._rows("staff", timing)
+        visa_rows = await self._rows("visa", timing)
+
+        # 各インポーターが resolver に渡すのと同じ企業名を集める
+        names = set()
+        for _, row in staff_rows or []:
+            companies = SlackListImporter._parse_company_names(row.get("受入れ企業", ""))
+            if companies:
+                names.add(SlackListImporter._normalize_company_name(companies[0]))
+        for _, row in visa_rows or []:
+            org_name = row.get("受入れ企業") or row.get("会社名")
+            if org_name:
+                names.add(org_name)
+        names.discard("")
+
+        async def resolve(db: AsyncSession):
+            # 解決済みの resolver は以降のステージで共有する（すべてキャッシュヒットになり DB を使わない）
+            self.resolver = await OrganizationResolver.load(db, self.tenant_id)
+            for name in sorted(names):
+                await self.resolver.get_org_id(db, name)
+
+        await self._write(timing, resolve)
+        timing.rows = len(names)
+        timing.result = {"company_names": len(names), **self.resolver.get_stats()}
+
+    async def _run_staff(self, timing: StageTiming):
+        rows = await self._rows("staff", timing)
+        if rows is None:
+            timing.skipped = True
+            return
+
+        # 日付列の形式はファイル先頭で1回だけ判定し、全バッチで同じものを使う
+        date_parsers = DateColumnParser.for_rows(
+            SlackListImporter.STAFF_DATE_COLUMNS, [row for _, row in rows[:DateColumnParser.SAMPLE_SIZE]]
+        )
+
+        async def write(db: AsyncSession):
+            result = SlackListImporter._import_result(0, 0, 0, [])
+            for batch in batched(rows, self.STAFF_BATCH_SIZE):
+                part = await SlackListImporter.import_staff_rows_bulk(
+                    db, batch, self.tenant_id, self.resolver, date_parsers
+                )
+                SlackListImporter.accumulate_result(result, part)
+            return result
+
+        timing.result = await self._write(timing, write)
+        timing.rows = len(rows)
+
+    async def _run_visa(self, timing: StageTiming):
+        rows = await self._rows("visa", timing)
+        if rows is None:
+            timing.skipped = True
+            return
+        timing.result = await self._write(
+            timing, lambda db: SlackListImporter.import_visa_rows(db, rows, self.tenant_id, self.resolver)
+        )
+        timing.rows = len(rows)
+
+    async def _run_smarthr(self, timing: StageTiming):
+        rows = await self._rows("smarthr", timing)
+        if rows is None:
+            timing.skipped = True
+            return
+        timing.result = await self._write(
+            timing, lambda db: SmartHRImporter.import_rows(db, rows, self.tenant_id)
+        )
+        timing.rows = len(rows)
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def format_report(timings: Dict[str, StageTiming], elapsed: float) -> str:
+        """ステージごとの所要時間・スループットの表"""
+        lines = [
+            f"    {'ステージ':<10}{'依存':<14}{'件数':>8}{'待ち(s)':>10}{'パース(s)':>11}{'書込(s)':>10}{'件/秒':>10}",
+            "    " + "─" * 71,
+        ]
+        for timing in timings.values():
+            deps = ",".join(timing.depends_on) or "-"
+            if timing.skipped:
+                status = "  (スキップ)"
+            elif timing.error:
+                status = f"  ❌ {timing.error[:40]}"
+            else:
+                status = ""
+            lines.append(
+                f"    {timing.name:<12}{deps:<16}{timing.rows:>8}{timing.wait_seconds:>10.2f}"
+                f"{timing.parse_seconds:>11.2f}{timing.write_seconds:>10.2f}{timing.rows_per_second:>10.1f}{status}"
+            )
+        serial = sum(t.parse_seconds + t.write_seconds for t in timings.values())
+        lines.append("    " + "─" * 71)
+        lines.append(f"    合計 {elapsed:.2f} 秒（直列に実行した場合の合計 {serial:.2f} 秒）")
+        return "\n".join(lines)
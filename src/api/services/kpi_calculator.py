@@ -1,16 +1,41 @@
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, text
-from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from datetime import date
 from uuid import UUID
 
 from src.api.models.kpi import KPITarget
-from src.api.schemas.kpi import CompanyKPI, KPIMetric, DivisionSummary, TrendPoint
+from src.api.schemas.kpi import CompanyKPI, DivisionKPI, KPIMetric, DivisionSummary, TrendPoint
 
 logger = logging.getLogger(__name__)
 
+DIVISION_LABELS = {
+    "dispatch": "派遣事業",
+    "subcontracting": "農受託事業",
+    "support": "登録支援事業",
+    "it": "IT事業"
+}
+
+DIVISION_ICONS = {
+    "dispatch": "🚜",
+    "subcontracting": "🌾",
+    "support": "🤝",
+    "it": "💻"
+}
+
+TREND_MONTHS = 6
+TOP_CLIENTS_LIMIT = 5
+
+
 class KPICalculatorService:
+    """
+    KPI 計算サービス
+
+    集計は 025_kpi_rollups.sql の月次ロールアップ（トリガーで差分更新）から読み、
+    リクエスト時に daily_operations 等の明細を走査しない。
+    """
+
     @staticmethod
     async def get_company_kpi(
         db: AsyncSession,
@@ -20,90 +45,346 @@ class KPICalculatorService:
         """
         会社全体KPIを計算
         """
-        # 目標値の取得
-        target_stmt = select(KPITarget).where(
-            KPITarget.tenant_id == tenant_id,
-            KPITarget.period == period,
-            KPITarget.target_type == 'company'
-        )
-        targets_res = await db.execute(target_stmt)
-        targets = {t.metric: t.target_value for t in targets_res.scalars().all()}
+        month = KPICalculatorService._parse_period(period)
+        months = [KPICalculatorService._shift_month(month, -i) for i in range(TREND_MONTHS - 1, -1, -1)]
+        prev_month = months[-2]
 
-        # 実績値の計算 (モック/集計クエリ)
-        # 実際には daily_operations や deals テーブルから集計する
+        targets = await KPICalculatorService._get_targets(db, tenant_id, period, "company")
+        clients = await KPICalculatorService._fetch_client_rollup(db, tenant_id, months[0], month)
+        workers = await KPICalculatorService._fetch_worker_counts(db, tenant_id, months[0], month)
+        company = await KPICalculatorService._fetch_company_rollup(db, tenant_id, prev_month, month)
+
+        # 月別の会社合計
+        totals: Dict[date, Dict[str, float]] = {
+            m: {"revenue": 0, "worked_days": 0, "scheduled_days": 0} for m in months
+        }
+        for r in clients:
+            t = totals[r.period_month]
+            t["revenue"] += r.revenue
+            t["worked_days"] += r.worked_days
+            t["scheduled_days"] += r.scheduled_days
+
+        def active_workers(m: date) -> int:
+            return workers.get((m, None, None), 0)
+
+        def company_value(m: date, key: str) -> int:
+            row = company.get(m)
+            return getattr(row, key) if row else 0
+
+        cur, prev = totals[month], totals[prev_month]
         summary = {
-            "revenue": KPIMetric(
-                value=5760000,
-                target=targets.get("revenue", 6000000),
-                achievement=96.0,
-                trend="up",
-                changePercent=8.5,
-                previousValue=5310000
+            "revenue": KPICalculatorService._metric(
+                cur["revenue"], prev["revenue"], targets.get("revenue")
             ),
-            "activeWorkers": KPIMetric(
-                value=48,
-                target=targets.get("active_workers", 52),
-                achievement=92.3,
-                trend="stable",
-                changePercent=2.1
+            "activeWorkers": KPICalculatorService._metric(
+                active_workers(month), active_workers(prev_month), targets.get("active_workers")
             ),
-            "utilizationRate": KPIMetric(
-                value=87.3,
-                target=targets.get("utilization_rate", 90.0),
-                achievement=97.0,
-                trend="up"
+            "utilizationRate": KPICalculatorService._metric(
+                KPICalculatorService._rate(cur["worked_days"], cur["scheduled_days"]),
+                KPICalculatorService._rate(prev["worked_days"], prev["scheduled_days"]),
+                targets.get("utilization_rate")
             ),
-            "dealConversionRate": KPIMetric(
-                value=35.5,
-                target=targets.get("conversion_rate", 40.0),
-                achievement=88.8,
-                trend="up"
+            "dealConversionRate": KPICalculatorService._metric(
+                KPICalculatorService._conversion_rate(company.get(month)),
+                KPICalculatorService._conversion_rate(company.get(prev_month)),
+                targets.get("conversion_rate")
             ),
-            "newWorkers": KPIMetric(
-                value=5,
-                target=targets.get("new_workers", 8),
-                achievement=62.5
+            "newWorkers": KPICalculatorService._metric(
+                company_value(month, "new_workers"), company_value(prev_month, "new_workers"),
+                targets.get("new_workers")
             ),
-            "newClients": KPIMetric(
-                value=2,
-                target=targets.get("new_clients", 3),
-                achievement=66.7
+            "newClients": KPICalculatorService._metric(
+                company_value(month, "new_clients"), company_value(prev_month, "new_clients"),
+                targets.get("new_clients")
             ),
-            "noticeComplianceRate": KPIMetric(
-                value=98.5,
-                target=targets.get("compliance_rate", 100.0),
-                achievement=98.5
+            "noticeComplianceRate": KPICalculatorService._metric(
+                KPICalculatorService._compliance_rate(company.get(month), month),
+                KPICalculatorService._compliance_rate(company.get(prev_month), prev_month),
+                targets.get("compliance_rate")
             )
         }
 
         # 事業別サマリー
+        by_division_totals: Dict[str, Dict[str, float]] = {}
+        for r in clients:
+            if r.period_month != month:
+                continue
+            d = by_division_totals.setdefault(r.division, {"revenue": 0, "worked_days": 0, "scheduled_days": 0})
+            d["revenue"] += r.revenue
+            d["worked_days"] += r.worked_days
+            d["scheduled_days"] += r.scheduled_days
+
         by_division = [
             DivisionSummary(
-                division="dispatch", divisionName="派遣事業",
-                revenue=3000000, revenueShare=52.1, workers=25, utilizationRate=89.3
-            ),
-            DivisionSummary(
-                division="subcontracting", divisionName="農受託事業",
-                revenue=1800000, revenueShare=31.3, workers=15, utilizationRate=88.2
+                division=division,
+                divisionName=DIVISION_LABELS.get(division, division),
+                revenue=d["revenue"],
+                revenueShare=KPICalculatorService._rate(d["revenue"], cur["revenue"]),
+                workers=workers.get((month, division, None), 0),
+                utilizationRate=KPICalculatorService._rate(d["worked_days"], d["scheduled_days"])
             )
+            for division, d in sorted(by_division_totals.items(), key=lambda kv: -kv[1]["revenue"])
         ]
 
-        # トレンドデータ (直近6ヶ月のモック)
+        # トレンドデータ (直近6ヶ月)
         trends = {
             "revenue": [
-                TrendPoint(month="2024-08", value=4800000),
-                TrendPoint(month="2024-09", value=5100000),
-                TrendPoint(month="2024-10", value=4900000),
-                TrendPoint(month="2024-11", value=5300000),
-                TrendPoint(month="2024-12", value=5310000),
-                TrendPoint(month="2025-01", value=5760000)
+                TrendPoint(month=m.strftime("%Y-%m"), value=totals[m]["revenue"]) for m in months
+            ],
+            "activeWorkers": [
+                TrendPoint(month=m.strftime("%Y-%m"), value=active_workers(m)) for m in months
+            ],
+            "utilizationRate": [
+                TrendPoint(
+                    month=m.strftime("%Y-%m"),
+                    value=KPICalculatorService._rate(totals[m]["worked_days"], totals[m]["scheduled_days"])
+                )
+                for m in months
             ]
         }
 
         return CompanyKPI(
             period=period,
-            periodLabel="2025年1月",
+            periodLabel=f"{month.year}年{month.month}月",
             summary=summary,
             byDivision=by_division,
             trends=trends
         )
+
+    @staticmethod
+    async def get_division_kpi(
+        db: AsyncSession,
+        tenant_id: UUID,
+        period: str
+    ) -> List[DivisionKPI]:
+        """
+        事業別KPIを計算
+        """
+        month = KPICalculatorService._parse_period(period)
+        prev_month = KPICalculatorService._shift_month(month, -1)
+
+        clients = await KPICalculatorService._fetch_client_rollup(db, tenant_id, prev_month, month)
+        workers = await KPICalculatorService._fetch_worker_counts(db, tenant_id, prev_month, month)
+
+        # (月, 事業区分) ごとの合計
+        totals: Dict[Tuple[date, str], Dict[str, float]] = {}
+        client_rows: Dict[str, List[Any]] = {}
+        for r in clients:
+            t = totals.setdefault(
+                (r.period_month, r.division),
+                {"revenue": 0, "total_hours": 0, "worked_days": 0, "scheduled_days": 0, "clients": 0}
+            )
+            t["revenue"] += r.revenue
+            t["total_hours"] += float(r.total_hours)
+            t["worked_days"] += r.worked_days
+            t["scheduled_days"] += r.scheduled_days
+            if r.worked_days > 0:
+                t["clients"] += 1
+            if r.period_month == month:
+                client_rows.setdefault(r.division, []).append(r)
+
+        empty = {"revenue": 0, "total_hours": 0, "worked_days": 0, "scheduled_days": 0, "clients": 0}
+        divisions = sorted(
+            {division for (_, division) in totals},
+            key=lambda d: -totals.get((month, d), empty)["revenue"]
+        )
+
+        result = []
+        for division in divisions:
+            cur = totals.get((month, division), empty)
+            prev = totals.get((prev_month, division), empty)
+            targets = await KPICalculatorService._get_targets(db, tenant_id, period, "division", division)
+
+            top_clients = sorted(client_rows.get(division, []), key=lambda r: -r.revenue)[:TOP_CLIENTS_LIMIT]
+
+            result.append(DivisionKPI(
+                division=division,
+                divisionName=DIVISION_LABELS.get(division, division),
+                icon=DIVISION_ICONS.get(division, "📊"),
+                metrics={
+                    "revenue": KPICalculatorService._metric(
+                        cur["revenue"], prev["revenue"], targets.get("revenue")
+                    ),
+                    "workers": KPICalculatorService._metric(
+                        workers.get((month, division, None), 0),
+                        workers.get((prev_month, division, None), 0),
+                        targets.get("active_workers")
+                    ),
+                    "clients": KPICalculatorService._metric(
+                        cur["clients"], prev["clients"], targets.get("clients")
+                    ),
+                    "utilizationRate": KPICalculatorService._metric(
+                        KPICalculatorService._rate(cur["worked_days"], cur["scheduled_days"]),
+                        KPICalculatorService._rate(prev["worked_days"], prev["scheduled_days"]),
+                        targets.get("utilization_rate")
+                    ),
+                    "avgHourlyRate": KPICalculatorService._metric(
+                        round(cur["revenue"] / cur["total_hours"]) if cur["total_hours"] else 0,
+                        round(prev["revenue"] / prev["total_hours"]) if prev["total_hours"] else 0,
+                        targets.get("avg_hourly_rate")
+                    )
+                },
+                topClients=[
+                    {
+                        "name": r.client_name,
+                        "revenue": r.revenue,
+                        "workers": workers.get((month, division, r.client_org_id), 0)
+                    }
+                    for r in top_clients
+                ]
+            ))
+
+        return result
+
+    # ------------------------------------------------------------------
+    # ロールアップ読み出し
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _get_targets(
+        db: AsyncSession,
+        tenant_id: UUID,
+        period: str,
+        target_type: str,
+        target_entity_id: Optional[str] = None
+    ) -> Dict[str, float]:
+        stmt = select(KPITarget).where(
+            KPITarget.tenant_id == tenant_id,
+            KPITarget.period == period,
+            KPITarget.target_type == target_type
+        )
+        if target_entity_id is not None:
+            stmt = stmt.where(KPITarget.target_entity_id == target_entity_id)
+        res = await db.execute(stmt)
+        return {t.metric: float(t.target_value) for t in res.scalars().all()}
+
+    @staticmethod
+    async def _fetch_client_rollup(
+        db: AsyncSession,
+        tenant_id: UUID,
+        from_month: date,
+        to_month: date
+    ) -> List[Any]:
+        """企業別ロールアップ（事業区分は organizations から付与）"""
+        res = await db.execute(text("""
+            SELECT
+                k.period_month,
+                k.client_org_id,
+                o.name AS client_name,
+                o.business_division::text AS division,
+                k.revenue,
+                k.total_hours,
+                k.scheduled_days,
+                k.worked_days
+            FROM kpi_monthly_client_rollup k
+            JOIN organizations o ON o.org_id = k.client_org_id
+            WHERE k.tenant_id = :tenant_id
+              AND k.period_month BETWEEN :from_month AND :to_month
+        """), {"tenant_id": tenant_id, "from_month": from_month, "to_month": to_month})
+        return res.fetchall()
+
+    @staticmethod
+    async def _fetch_worker_counts(
+        db: AsyncSession,
+        tenant_id: UUID,
+        from_month: date,
+        to_month: date
+    ) -> Dict[Tuple[date, Optional[str], Optional[UUID]], int]:
+        """
+        稼働人数（重複排除）を 月 / 月×事業区分 / 月×事業区分×企業 の粒度で返す。
+        キーは (period_month, division, client_org_id)。集約した粒度は None。
+        """
+        res = await db.execute(text("""
+            SELECT
+                w.period_month,
+                o.business_division::text AS division,
+                w.client_org_id,
+                COUNT(DISTINCT w.person_id) AS workers
+            FROM kpi_monthly_worker_rollup w
+            JOIN organizations o ON o.org_id = w.client_org_id
+            WHERE w.tenant_id = :tenant_id
+              AND w.period_month BETWEEN :from_month AND :to_month
+            GROUP BY GROUPING SETS (
+                (w.period_month, o.business_division, w.client_org_id),
+                (w.period_month, o.business_division),
+                (w.period_month)
+            )
+        """), {"tenant_id": tenant_id, "from_month": from_month, "to_month": to_month})
+        return {(r.period_month, r.division, r.client_org_id): r.workers for r in res}
+
+    @staticmethod
+    async def _fetch_company_rollup(
+        db: AsyncSession,
+        tenant_id: UUID,
+        from_month: date,
+        to_month: date
+    ) -> Dict[date, Any]:
+        res = await db.execute(text("""
+            SELECT period_month, new_workers, new_clients, deals_won, deals_lost,
+                   notices_due, notices_on_time, notices_late
+            FROM kpi_monthly_company_rollup
+            WHERE tenant_id = :tenant_id
+              AND period_month BETWEEN :from_month AND :to_month
+        """), {"tenant_id": tenant_id, "from_month": from_month, "to_month": to_month})
+        return {r.period_month: r for r in res}
+
+    # ------------------------------------------------------------------
+    # 指標計算
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _parse_period(period: str) -> date:
+        """'YYYY-MM' を月初日に変換"""
+        try:
+            year, month = period.split("-")
+            return date(int(year), int(month), 1)
+        except (ValueError, AttributeError):
+            raise ValueError(f"Invalid period: {period} (expected YYYY-MM)")
+
+    @staticmethod
+    def _shift_month(month: date, delta: int) -> date:
+        index = month.year * 12 + (month.month - 1) + delta
+        return date(index // 12, index % 12 + 1, 1)
+
+    @staticmethod
+    def _rate(numerator: float, denominator: float) -> float:
+        return round(numerator / denominator * 100, 1) if denominator else 0.0
+
+    @staticmethod
+    def _conversion_rate(row: Any) -> float:
+        if not row:
+            return 0.0
+        return KPICalculatorService._rate(row.deals_won, row.deals_won + row.deals_lost)
+
+    @staticmethod
+    def _compliance_rate(row: Any, month: date) -> float:
+        """
+        届出遵守率。月が締まっていれば未提出も違反として数え、
+        当月は提出済み分のみで評価する。
+        """
+        if not row:
+            return 100.0
+        month_closed = KPICalculatorService._shift_month(month, 1) <= date.today()
+        denominator = row.notices_due if month_closed else row.notices_on_time + row.notices_late
+        return KPICalculatorService._rate(row.notices_on_time, denominator) if denominator else 100.0
+
+    @staticmethod
+    def _metric(value: float, previous: float, target: Optional[float]) -> KPIMetric:
+        change = round((value - previous) / previous * 100, 1) if previous else None
+        if change is None:
+            trend = "up" if value > 0 else "stable"
+        elif change > 1:
+            trend = "up"
+        elif change < -1:
+            trend = "down"
+        else:
+            trend = "stable"
+
+        return KPIMetric(
+            value=value,
+            target=target,
+            achievement=round(value / target * 100, 1) if target else None,
+            trend=trend,
+            changePercent=change,
+            previousValue=previous
+        )
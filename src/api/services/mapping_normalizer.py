@@ -0,0 +1,87 @@
+"""
+CSV 値のマッピング（表記ゆれ吸収）
+
+マッピング辞書ごとに一度だけキーを NFKC 正規化して索引を作り、
+値の検索は 完全一致 → 最長一致の部分一致 の順で行う。
+部分一致は長いキーから順に、値の中の同じ長さの部分文字列を集合で引くため、
+辞書の並び順に結果が左右されない（同じ長さなら値の中で先に現れるキーを採用）。
+"""
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class CompiledMapping:
+    """
+    1つのマッピング辞書を正規化済みの索引にしたもの
+
+    キーの正規化:  NFKC（全角英数字・記号 → 半角、半角カナ → 全角）+ 前後の空白除去
+    検索順:        None → 完全一致 → 最長一致の部分一致 → 既定値
+    """
+
+    _cache: Dict[int, Tuple[dict, "CompiledMapping"]] = {}
+
+    def __init__(self, mapping: Dict[Optional[str], Any]):
+        self.none_value = mapping.get(None)
+        self.has_none = None in mapping
+        self.has_blank = "" in mapping
+        self.blank_value = mapping.get("")
+
+        self.exact: Dict[str, Any] = {}
+        for key, value in mapping.items():
+            if key is None:
+                continue
+            # 正規化後に同じになるキーは最初の定義を優先する
+            self.exact.setdefault(self.normalize(key), value)
+
+        # 部分一致用: キー長（降順）ごとのキー集合
+        by_length: Dict[int, Set[str]] = {}
+        for key in self.exact:
+            if key:
+                by_length.setdefault(len(key), set()).add(key)
+        self.lengths: List[int] = sorted(by_length, reverse=True)
+        self.by_length = by_length
+
+    @classmethod
+    def for_mapping(cls, mapping: Dict[Optional[str], Any]) -> "CompiledMapping":
+        """辞書ごとにコンパイル結果をキャッシュして返す（マッピング定数は不変である前提）"""
+        cached = cls._cache.get(id(mapping))
+        if cached is not None and cached[0] is mapping:
+            return cached[1]
+        compiled = cls(mapping)
+        cls._cache[id(mapping)] = (mapping, compiled)
+        return compiled
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return unicodedata.normalize("NFKC", value).strip()
+
+    def match(self, value: Optional[str]) -> Tuple[bool, Any]:
+        """(一致したか, 値)。None は辞書に None キーがあれば一致とみなす。"""
+        if value is None:
+            return self.has_none, self.none_value
+
+        normalized = self.normalize(value)
+        if normalized in self.exact:
+            return True, self.exact[normalized]
+        if not normalized:
+            return False, None
+
+        size = len(normalized)
+        for length in self.lengths:
+            if length > size:
+                continue
+            keys = self.by_length[length]
+            for start in range(size - length + 1):
+                candidate = normalized[start:start + length]
+                if candidate in keys:
+                    return True, self.exact[candidate]
+        return False, None
+
+    def lookup(self, value: Optional[str], default: Any = None) -> Any:
+        """SlackListImporter.safe_map と同じ既定値の規則で値を返す"""
+        if value is None:
+            return self.none_value if self.has_none else default
+        found, mapped = self.match(value)
+        if found:
+            return mapped
+        return default or (self.blank_value if self.has_blank else default)
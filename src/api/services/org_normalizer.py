@@ -9,9 +9,11 @@ CSVからインポートされる企業名の表記ゆれを吸収し、統一
 - "(株)芝原" / "芝原-派遣" / "(株)芝原, 芝原-派遣" → "(株)芝原"
 - "スグクル(株)-委託" → "スグクル株式会社"
 """
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.models.organization import Organization, OrganizationAlias
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 import re
 import logging
@@ -78,6 +80,12 @@ class OrganizationNormalizer:
         "市囿庄一": "市囿庄一",
     }
     
+    # 類似度（pg_trgm similarity）の閾値
+    # AUTO_ALIAS 以上: 既存企業のエイリアスとして自動登録
+    # REVIEW 以上 AUTO_ALIAS 未満: 新規企業として作成し、候補企業を付けて要確認キューに積む
+    AUTO_ALIAS_THRESHOLD = 0.6
+    REVIEW_THRESHOLD = 0.3
+
     @staticmethod
     def _normalize_company_string(name: str) -> str:
         """
@@ -150,31 +158,87 @@ class OrganizationNormalizer:
             if alias:
                 return alias.org_id
         
-        # 3. 部分一致検索（LIKE）
-        like_pattern = f"%{normalized_name}%"
-        stmt = select(Organization).where(
-            Organization.name.ilike(like_pattern),
-            Organization.tenant_id == tenant_id,
-            Organization.deleted_at == None
-        ).limit(1)
-        result = await db.execute(stmt)
-        org = result.scalar_one_or_none()
-        if org:
+        # 3. 類似度検索（pg_trgm）
+        match = await OrganizationNormalizer.find_similar_organization(db, normalized_name, tenant_id)
+        if match and match["score"] >= OrganizationNormalizer.AUTO_ALIAS_THRESHOLD:
             # 見つかった場合、エイリアスも追加
             new_alias = OrganizationAlias(
-                org_id=org.org_id,
+                org_id=match["org_id"],
                 alias_name=original_name,
-                source="partial_match"
+                source="similarity_match"
             )
             try:
-                db.add(new_alias)
-                await db.flush()
+                async with db.begin_nested():
+                    db.add(new_alias)
             except Exception:
                 pass  # 重複エラーは無視
-            return org.org_id
+            return match["org_id"]
             
         # 4. 見つからない場合は新規作成
         final_name = canonical_name or normalized_name or original_name
+        new_org = await OrganizationNormalizer._create_organization(
+            db, tenant_id, final_name, original_name,
+            review_candidate=OrganizationNormalizer._review_candidate(match)
+        )
+        return new_org.org_id
+
+    @staticmethod
+    async def find_similar_organization(db: AsyncSession, name: str, tenant_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        企業名・エイリアスから類似度が最も高い企業を1件返します。
+        pg_trgm の % 演算子（GIN インデックス利用）で候補を絞り込み、similarity() の降順で決定します。
+        戻り値: {"org_id", "matched_name", "score"} または None
+        """
+        if not name:
+            return None
+
+        result = await db.execute(text("""
+            SELECT org_id, matched_name, score
+            FROM (
+                SELECT o.org_id, o.name AS matched_name, similarity(o.name, :name) AS score
+                FROM organizations o
+                WHERE o.tenant_id = :tenant_id
+                  AND o.deleted_at IS NULL
+                  AND o.name % :name
+                UNION ALL
+                SELECT a.org_id, a.alias_name AS matched_name, similarity(a.alias_name, :name) AS score
+                FROM organization_aliases a
+                JOIN organizations o ON o.org_id = a.org_id
+                WHERE o.tenant_id = :tenant_id
+                  AND o.deleted_at IS NULL
+                  AND a.alias_name % :name
+            ) candidates
+            ORDER BY score DESC, matched_name
+            LIMIT 1
+        """), {"name": name, "tenant_id": tenant_id})
+        row = result.first()
+        if not row:
+            return None
+        return {"org_id": row.org_id, "matched_name": row.matched_name, "score": float(row.score)}
+
+    @staticmethod
+    def _review_candidate(match: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """自動エイリアス化はしないが、要確認として提示する類似候補"""
+        if not match or match["score"] < OrganizationNormalizer.REVIEW_THRESHOLD:
+            return None
+        return {
+            "org_id": str(match["org_id"]),
+            "name": match["matched_name"],
+            "score": round(match["score"], 3),
+        }
+
+    @staticmethod
+    async def _create_organization(
+        db: AsyncSession,
+        tenant_id: UUID,
+        final_name: str,
+        original_name: str,
+        review_candidate: Optional[Dict[str, Any]] = None
+    ) -> Organization:
+        """
+        インポート由来の企業を新規作成し、元の名前をエイリアスとして登録します。
+        類似候補がある場合は settings.review_candidate に記録し、確認待ちにします。
+        """
         logger.info(f"Creating new organization: '{final_name}' (input: '{original_name}')")
         
         # org_type を推測
@@ -191,6 +255,8 @@ class OrganizationNormalizer:
                 "original_input": original_name,
             }
         )
+        if review_candidate:
+            new_org.settings["review_candidate"] = review_candidate
         db.add(new_org)
         await db.flush()
         
@@ -203,7 +269,7 @@ class OrganizationNormalizer:
             )
             db.add(new_alias)
         
-        return new_org.org_id
+        return new_org
 
     @classmethod
     async def register_alias(cls, db: AsyncSession, org_id: UUID, alias_name: str, source: str = "manual") -> bool:
@@ -231,3 +297,183 @@ class OrganizationNormalizer:
         stmt = select(OrganizationAlias).where(OrganizationAlias.org_id == org_id)
         result = await db.execute(stmt)
         return result.scalars().all()
+
+
+class OrganizationResolver:
+    """
+    テナント単位の企業名解決キャッシュ
+    organizations / organization_aliases をインポート（またはリクエストのバッチ）ごとに一度だけ読み込み、
+    完全一致・エイリアス・KNOWN_ALIASES による解決をメモリ上で行います。
+    新規作成した企業・エイリアスはキャッシュにも書き戻します。
+    """
+
+    def __init__(self, tenant_id: UUID):
+        self.tenant_id = tenant_id
+        self.orgs_by_name: Dict[str, UUID] = {}
+        self.aliases: Dict[str, UUID] = {}
+        self._resolved: Dict[str, Optional[UUID]] = {}
+        self.stats: Dict[str, int] = {
+            "cache_hits": 0,        # 同じ入力名の再解決
+            "exact_hits": 0,        # organizations.name との完全一致
+            "alias_hits": 0,        # organization_aliases との一致
+            "known_alias_hits": 0,  # KNOWN_ALIASES の正式名で一致
+            "similarity_matches": 0,   # 類似度一致（エイリアス自動登録）
+            "created": 0,           # 新規作成
+        }
+
+    @classmethod
+    async def load(cls, db: AsyncSession, tenant_id: UUID) -> "OrganizationResolver":
+        """
+        テナントの企業とエイリアスを読み込んだリゾルバを返します（2クエリ）。
+        """
+        resolver = cls(tenant_id)
+
+        org_result = await db.execute(
+            select(Organization.org_id, Organization.name).where(
+                Organization.tenant_id == tenant_id,
+                Organization.deleted_at == None
+            ).order_by(Organization.created_at)
+        )
+        for org_id, name in org_result.all():
+            # 同名が複数ある場合は最初に作成された企業を優先
+            resolver.orgs_by_name.setdefault(name, org_id)
+
+        alias_result = await db.execute(
+            select(OrganizationAlias.alias_name, OrganizationAlias.org_id)
+            .join(Organization, OrganizationAlias.org_id == Organization.org_id)
+            .where(
+                Organization.tenant_id == tenant_id,
+                Organization.deleted_at == None
+            )
+        )
+        resolver.aliases = {alias_name: org_id for alias_name, org_id in alias_result.all()}
+
+        return resolver
+
+    @property
+    def hit_count(self) -> int:
+        """DBへの問い合わせなしで解決できた件数"""
+        return sum(self.stats[k] for k in ("cache_hits", "exact_hits", "alias_hits", "known_alias_hits"))
+
+    @property
+    def miss_count(self) -> int:
+        """類似度検索または新規作成が必要だった件数"""
+        return self.stats["similarity_matches"] + self.stats["created"]
+
+    def get_stats(self) -> Dict[str, int]:
+        """ヒット/ミスのカウンタを返します"""
+        return {**self.stats, "hits": self.hit_count, "misses": self.miss_count}
+
+    def _lookup(self, search_names: List[str], canonical_name: Optional[str]) -> Optional[UUID]:
+        """メモリ上の企業名・エイリアス辞書から検索（get_org_id_by_name の手順1・2と同順）"""
+        for table, stat in ((self.orgs_by_name, "exact_hits"), (self.aliases, "alias_hits")):
+            for search_name in search_names:
+                if search_name and search_name in table:
+                    is_known = search_name == canonical_name and search_name not in search_names[:2]
+                    self.stats["known_alias_hits" if is_known else stat] += 1
+                    return table[search_name]
+        return None
+
+    async def _add_alias(self, db: AsyncSession, org_id: UUID, alias_name: str, source: str) -> None:
+        """
+        エイリアスを登録してキャッシュに反映します。
+        既に登録済み（一意制約違反）の場合は、DB 上のエイリアスの企業をキャッシュします
+        （他テナントの企業・削除済みの企業であればキャッシュしません）。
+        """
+        if alias_name in self.aliases:
+            return
+        try:
+            async with db.begin_nested():
+                db.add(OrganizationAlias(org_id=org_id, alias_name=alias_name, source=source))
+        except IntegrityError:
+            existing = await db.execute(
+                select(OrganizationAlias.org_id)
+                .join(Organization, OrganizationAlias.org_id == Organization.org_id)
+                .where(
+                    OrganizationAlias.alias_name == alias_name,
+                    Organization.tenant_id == self.tenant_id,
+                    Organization.deleted_at == None
+                )
+            )
+            existing_org_id = existing.scalar_one_or_none()
+            if existing_org_id is not None:
+                self.aliases[alias_name] = existing_org_id
+            return
+        self.aliases[alias_name] = org_id
+
+    def peek_org_id(self, name: str) -> Optional[UUID]:
+        """
+        読み込み済みの企業名・エイリアスだけで org_id を引きます（ドライラン用）。
+        類似度検索・新規作成は行わず、解決できなければ None を返します。
+        """
+        if not name:
+            return None
+
+        original_name = name.strip()
+        if original_name in self._resolved:
+            return self._resolved[original_name]
+
+        normalized_name = OrganizationNormalizer._normalize_company_string(name)
+        canonical_name = (
+            OrganizationNormalizer.KNOWN_ALIASES.get(original_name)
+            or OrganizationNormalizer.KNOWN_ALIASES.get(normalized_name)
+        )
+        for search_name in (original_name, normalized_name, canonical_name):
+            if search_name and search_name in self.orgs_by_name:
+                return self.orgs_by_name[search_name]
+        for search_name in (original_name, normalized_name, canonical_name):
+            if search_name and search_name in self.aliases:
+                return self.aliases[search_name]
+        return None
+
+    async def get_org_id(self, db: AsyncSession, name: str) -> Optional[UUID]:
+        """
+        企業名（またはエイリアス名）から org_id を取得します。
+        解決手順は OrganizationNormalizer.get_org_id_by_name と同じです。
+        """
+        if not name:
+            return None
+
+        original_name = name.strip()
+        if original_name in self._resolved:
+            self.stats["cache_hits"] += 1
+            return self._resolved[original_name]
+
+        normalized_name = OrganizationNormalizer._normalize_company_string(name)
+
+        # 0. 既知のエイリアスチェック
+        canonical_name = OrganizationNormalizer.KNOWN_ALIASES.get(original_name)
+        if not canonical_name:
+            canonical_name = OrganizationNormalizer.KNOWN_ALIASES.get(normalized_name)
+
+        search_names = [original_name, normalized_name]
+        if canonical_name:
+            search_names.append(canonical_name)
+
+        # 1-2. 完全一致・エイリアス（メモリ）
+        org_id = self._lookup(search_names, canonical_name)
+
+        # 3. 類似度検索（pg_trgm）
+        match = None
+        if org_id is None:
+            match = await OrganizationNormalizer.find_similar_organization(db, normalized_name, self.tenant_id)
+            if match and match["score"] >= OrganizationNormalizer.AUTO_ALIAS_THRESHOLD:
+                org_id = match["org_id"]
+                self.stats["similarity_matches"] += 1
+                await self._add_alias(db, org_id, original_name, "similarity_match")
+
+        # 4. 新規作成（類似候補があれば要確認として記録）
+        if org_id is None:
+            final_name = canonical_name or normalized_name or original_name
+            new_org = await OrganizationNormalizer._create_organization(
+                db, self.tenant_id, final_name, original_name,
+                review_candidate=OrganizationNormalizer._review_candidate(match)
+            )
+            org_id = new_org.org_id
+            self.stats["created"] += 1
+            self.orgs_by_name[final_name] = org_id
+            if original_name != final_name:
+                self.aliases[original_name] = org_id
+
+        self._resolved[original_name] = org_id
+        return org_id
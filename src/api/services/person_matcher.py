@@ -0,0 +1,283 @@
+"""
+人材の名寄せ（SmartHR ⇔ Slackリスト）
+
+同じ人が取り込み元ごとに別表記で登録されている場合に、候補ペアを見つけてスコアを付けます。
+
+表記ゆれのパターン:
+- 全角・半角、空白の有無          "グエン　ヴァン　アン" / "ｸﾞｴﾝ ｳﾞｧﾝ ｱﾝ"
+- 姓名の順序                     "NGUYEN VAN AN" / "VAN AN NGUYEN"
+- カタカナ表記とローマ字表記      "グエン ティ ホア" / "NGUYEN THI HOA"
+- 発音区別符号                   "Nguyễn Thị Hoa" / "NGUYEN THI HOA"
+
+全員分のブロッキングキー（正規化氏名・トークン集合・読み・ローマ字・生年月日）をメモリ上で作り、
+キーを共有するペアだけを比較するため、人数が増えても比較回数は候補ペアの数に比例します。
+"""
+import re
+import unicodedata
+from datetime import date
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+# 氏名の区切りとして扱う文字（NFKC 後）
+_SEPARATORS = re.compile(r"[\s・,.\-_/()\[\]]+")
+
+# カタカナ → ローマ字（ヘボン式を簡略化）。2文字の拗音を先に引く。
+_KANA_DIGRAPHS = {
+    "キャ": "kya", "キュ": "kyu", "キョ": "kyo", "シャ": "sha", "シュ": "shu", "ショ": "sho",
+    "チャ": "cha", "チュ": "chu", "チョ": "cho", "ニャ": "nya", "ニュ": "nyu", "ニョ": "nyo",
+    "ヒャ": "hya", "ヒュ": "hyu", "ヒョ": "hyo", "ミャ": "mya", "ミュ": "myu", "ミョ": "myo",
+    "リャ": "rya", "リュ": "ryu", "リョ": "ryo", "ギャ": "gya", "ギュ": "gyu", "ギョ": "gyo",
+    "ジャ": "ja", "ジュ": "ju", "ジョ": "jo", "ビャ": "bya", "ビュ": "byu", "ビョ": "byo",
+    "ピャ": "pya", "ピュ": "pyu", "ピョ": "pyo", "ジェ": "je", "シェ": "she", "チェ": "che",
+    "ティ": "ti", "ディ": "di", "トゥ": "tu", "ドゥ": "du", "ファ": "fa", "フィ": "fi",
+    "フェ": "fe", "フォ": "fo", "ウィ": "wi", "ウェ": "we", "ウォ": "wo", "ヴァ": "va",
+    "ヴィ": "vi", "ヴェ": "ve", "ヴォ": "vo", "ツァ": "tsa", "イェ": "ye",
+}
+_KANA = {
+    "ア": "a", "イ": "i", "ウ": "u", "エ": "e", "オ": "o",
+    "カ": "ka", "キ": "ki", "ク": "ku", "ケ": "ke", "コ": "ko",
+    "サ": "sa", "シ": "shi", "ス": "su", "セ": "se", "ソ": "so",
+    "タ": "ta", "チ": "chi", "ツ": "tsu", "テ": "te", "ト": "to",
+    "ナ": "na", "ニ": "ni", "ヌ": "nu", "ネ": "ne", "ノ": "no",
+    "ハ": "ha", "ヒ": "hi", "フ": "fu", "ヘ": "he", "ホ": "ho",
+    "マ": "ma", "ミ": "mi", "ム": "mu", "メ": "me", "モ": "mo",
+    "ヤ": "ya", "ユ": "yu", "ヨ": "yo",
+    "ラ": "ra", "リ": "ri", "ル": "ru", "レ": "re", "ロ": "ro",
+    "ワ": "wa", "ヲ": "o", "ン": "n",
+    "ガ": "ga", "ギ": "gi", "グ": "gu", "ゲ": "ge", "ゴ": "go",
+    "ザ": "za", "ジ": "ji", "ズ": "zu", "ゼ": "ze", "ゾ": "zo",
+    "ダ": "da", "ヂ": "ji", "ヅ": "zu", "デ": "de", "ド": "do",
+    "バ": "ba", "ビ": "bi", "ブ": "bu", "ベ": "be", "ボ": "bo",
+    "パ": "pa", "ピ": "pi", "プ": "pu", "ペ": "pe", "ポ": "po",
+    "ヴ": "vu", "ァ": "a", "ィ": "i", "ゥ": "u", "ェ": "e", "ォ": "o",
+    "ャ": "ya", "ュ": "yu", "ョ": "yo",
+}
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """NFKC + 大文字小文字・区切り文字の違いを除いた氏名"""
+    if not value:
+        return ""
+    return _SEPARATORS.sub("", unicodedata.normalize("NFKC", value).casefold())
+
+
+def name_tokens(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [t for t in _SEPARATORS.split(unicodedata.normalize("NFKC", value).casefold()) if t]
+
+
+def to_katakana(value: str) -> str:
+    """ひらがな → カタカナ"""
+    return "".join(chr(ord(c) + 0x60) if "ぁ" <= c <= "ゖ" else c for c in value)
+
+
+def is_kana(value: str) -> bool:
+    return bool(value) and all("ァ" <= c <= "ヺ" or c == "ー" for c in value)
+
+
+def to_latin(token: str) -> str:
+    """
+    1トークンをローマ字（ASCII 小文字）にします。
+    カタカナはローマ字に、発音区別符号は除去し、表記の揺れやすい音を寄せます（l→r, v→b, 長音・重子音の省略）。
+    """
+    token = to_katakana(token)
+    out: List[str] = []
+    i = 0
+    while i < len(token):
+        pair = token[i:i + 2]
+        if pair in _KANA_DIGRAPHS:
+            out.append(_KANA_DIGRAPHS[pair])
+            i += 2
+        else:
+            # 促音・長音は重子音・長音と同じく省略する
+            if token[i] not in "ッー":
+                out.append(_KANA.get(token[i], token[i]))
+            i += 1
+
+    latin = unicodedata.normalize("NFKD", "".join(out))
+    latin = "".join(c for c in latin if c.isascii() and c.isalpha()).lower()
+    latin = latin.replace("l", "r").replace("v", "b")
+    # 長音（ou, uu, oo, ee ...）と重子音を1文字に
+    latin = re.sub(r"(.)\1+", r"\1", latin).replace("ou", "o")
+    return latin
+
+
+# ローマ字表記とカタカナ表記で揺れる綴り（ベトナム語・インドネシア語の人名に多い）
+_SKELETON_FOLDS = (
+    (re.compile(r"^ng"), "g"),   # Nguyen → グエン
+    (re.compile(r"ng$"), "n"),   # Cuong → クオン
+    (re.compile(r"tr|ch"), "c"),  # Tran → チャン
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"qu"), "k"),
+    (re.compile(r"([tkgd])h"), r"\1"),  # Thi → ティ
+    (re.compile(r"c"), "k"),
+)
+
+
+def skeleton(latin: str) -> str:
+    """
+    ローマ字トークンの子音骨格（先頭文字 + 以降の子音）。
+    カタカナ化で母音が足されたり綴りが変わったりしても一致しやすい粗いキーです。
+    """
+    for pattern, replacement in _SKELETON_FOLDS:
+        latin = pattern.sub(replacement, latin)
+    if not latin:
+        return ""
+    return latin[0] + re.sub(r"[aeiouyhw]", "", latin[1:])
+
+
+class PersonKeys:
+    """1人分のブロッキングキーと比較用の表記"""
+
+    __slots__ = ("person_id", "compact", "tokens", "kana", "latin", "latin_tokens", "skeleton", "birth_date")
+
+    def __init__(
+        self,
+        person_id: UUID,
+        full_name: str,
+        kana: Optional[str] = None,
+        birth_date: Optional[date] = None
+    ):
+        self.person_id = person_id
+        self.compact = normalize_name(full_name)
+        tokens = name_tokens(full_name)
+        self.tokens = " ".join(sorted(tokens))
+
+        # 読み: 明示的なカナがなければ、氏名自体がカナならそれを使う
+        kana_compact = normalize_name(to_katakana(unicodedata.normalize("NFKC", kana))) if kana else ""
+        if not kana_compact and is_kana(to_katakana(self.compact)):
+            kana_compact = to_katakana(self.compact)
+        self.kana = kana_compact
+
+        latin_tokens = sorted(t for t in (to_latin(t) for t in tokens) if t)
+        if not latin_tokens and kana:
+            latin_tokens = sorted(t for t in (to_latin(t) for t in name_tokens(kana)) if t)
+        self.latin_tokens = latin_tokens
+        self.latin = "".join(latin_tokens)
+        self.skeleton = " ".join(sorted(skeleton(t) for t in latin_tokens))
+        self.birth_date = birth_date
+
+    def blocking_keys(self) -> Set[str]:
+        keys = set()
+        if self.compact:
+            keys.add(f"n:{self.compact}")
+        if self.tokens:
+            keys.add(f"t:{self.tokens}")
+        if self.kana:
+            keys.add(f"k:{self.kana}")
+        if self.latin:
+            keys.add(f"l:{self.latin}")
+            keys.add(f"s:{self.skeleton}")
+        if self.birth_date:
+            keys.add(f"b:{self.birth_date.isoformat()}")
+        return keys
+
+
+class PersonMatcher:
+    """
+    2つの人材集合（SmartHR 連携済み / Slack のみ）の間で同一人物の候補を探します。
+
+    スコア:
+      1.00  正規化氏名が一致
+      0.95  姓名のトークン集合が一致、または読み（カナ）が一致
+      0.90  ローマ字表記が一致
+      0.85  ローマ字の子音骨格が一致（カタカナ表記 ⇔ ローマ字表記）
+      それ以外はローマ字表記の類似度 × 0.85
+    生年月日が両方にあって異なる場合は 0（候補から除外）、一致すれば +0.1（上限 1.0）。
+    子音骨格・類似度による一致は母音の違う別人も拾うため、生年月日が一致しても
+    FUZZY_SCORE_CAP で頭打ちにし、自動統合せず要確認に回す。
+    """
+
+    AUTO_MERGE_SCORE = 0.9   # これ以上で、相互に唯一の最良候補なら自動で統合
+    REVIEW_SCORE = 0.75      # これ以上は要確認として返す
+    FUZZY_SCORE_CAP = 0.89   # 子音骨格・類似度一致の上限（AUTO_MERGE_SCORE 未満）
+    MAX_BLOCK_SIZE = 200     # これより大きいブロック（ありふれた姓・誕生日）は候補生成に使わない
+
+    @classmethod
+    def score(cls, a: PersonKeys, b: PersonKeys) -> Tuple[float, str]:
+        if a.birth_date and b.birth_date and a.birth_date != b.birth_date:
+            return 0.0, "birth_date_mismatch"
+
+        if a.compact and a.compact == b.compact:
+            score, reason = 1.0, "name"
+        elif a.tokens and a.tokens == b.tokens:
+            score, reason = 0.95, "name_tokens"
+        elif a.kana and a.kana == b.kana:
+            score, reason = 0.95, "kana"
+        elif a.latin and a.latin == b.latin:
+            score, reason = 0.9, "latin"
+        elif a.skeleton and a.skeleton == b.skeleton:
+            score, reason = 0.85, "latin_skeleton"
+        elif a.latin and b.latin:
+            score, reason = SequenceMatcher(None, a.latin, b.latin).ratio() * 0.85, "latin_similarity"
+        else:
+            return 0.0, "no_comparable_name"
+
+        fuzzy = reason in ("latin_skeleton", "latin_similarity")
+        if a.birth_date and a.birth_date == b.birth_date:
+            score, reason = min(1.0, score + 0.1), f"{reason}+birth_date"
+        if fuzzy:
+            score = min(score, cls.FUZZY_SCORE_CAP)
+        return round(score, 3), reason
+
+    @classmethod
+    def candidate_pairs(cls, left: Iterable[PersonKeys], right: Iterable[PersonKeys]) -> Set[Tuple[int, int]]:
+        """キーを共有する (left の添字, right の添字) の組"""
+        blocks: Dict[str, Tuple[List[int], List[int]]] = {}
+        for side, people in enumerate((left, right)):
+            for i, person in enumerate(people):
+                for key in person.blocking_keys():
+                    blocks.setdefault(key, ([], []))[side].append(i)
+
+        pairs: Set[Tuple[int, int]] = set()
+        for left_ids, right_ids in blocks.values():
+            if not left_ids or not right_ids or len(left_ids) + len(right_ids) > cls.MAX_BLOCK_SIZE:
+                continue
+            pairs.update((i, j) for i in left_ids for j in right_ids)
+        return pairs
+
+    @classmethod
+    def match(cls, left: List[PersonKeys], right: List[PersonKeys]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        候補ペアを採点し、merge（自動統合）/ review（要確認）/ conflicts（同点の最良候補が複数）に分けます。
+        merge は left・right のどちらから見ても唯一の最良候補であるペアだけです。
+        """
+        scored: List[Tuple[float, str, int, int]] = []
+        for i, j in cls.candidate_pairs(left, right):
+            score, reason = cls.score(left[i], right[j])
+            if score >= cls.REVIEW_SCORE:
+                scored.append((score, reason, i, j))
+
+        best_left: Dict[int, List[Tuple[float, int]]] = {}
+        best_right: Dict[int, List[Tuple[float, int]]] = {}
+        for score, _, i, j in scored:
+            best_left.setdefault(i, []).append((score, j))
+            best_right.setdefault(j, []).append((score, i))
+
+        def unique_best(candidates: List[Tuple[float, int]], other: int) -> Optional[bool]:
+            """other が唯一の最良候補なら True、同点の最良候補があれば None、そうでなければ False"""
+            top = max(score for score, _ in candidates)
+            winners = [idx for score, idx in candidates if score == top]
+            if other not in winners:
+                return False
+            return True if len(winners) == 1 else None
+
+        result: Dict[str, List[Dict[str, Any]]] = {"merge": [], "review": [], "conflicts": []}
+        for score, reason, i, j in sorted(scored, key=lambda s: (-s[0], s[2], s[3])):
+            item = {
+                "left_person_id": left[i].person_id,
+                "right_person_id": right[j].person_id,
+                "score": score,
+                "reason": reason,
+            }
+            left_best = unique_best(best_left[i], j)
+            right_best = unique_best(best_right[j], i)
+            if left_best is None or right_best is None:
+                result["conflicts"].append(item)
+            elif left_best and right_best and score >= cls.AUTO_MERGE_SCORE:
+                result["merge"].append(item)
+            elif left_best or right_best:
+                result["review"].append(item)
+        return result
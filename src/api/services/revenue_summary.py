@@ -0,0 +1,54 @@
+import logging
+from datetime import date
+from typing import Any, Dict, List
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class RevenueSummaryService:
+    """
+    日次売上サマリー（daily_revenue_summary）の検証・再構築
+
+    通常時はトリガー（026_daily_revenue_summary_delta.sql）が差分で維持する。
+    ここではトリガー導入前のデータ修復や、ずれの検出に使う。
+    """
+
+    @staticmethod
+    async def verify(
+        db: AsyncSession,
+        tenant_id: UUID,
+        date_from: date,
+        date_to: date
+    ) -> List[Dict[str, Any]]:
+        """サマリーと daily_operations からの再計算が一致しない 企業×日 を返す"""
+        result = await db.execute(
+            text("""
+                SELECT * FROM fn_verify_daily_revenue_summary(
+                    CAST(:tenant_id AS uuid), CAST(:date_from AS date), CAST(:date_to AS date)
+                )
+            """),
+            {"tenant_id": tenant_id, "date_from": date_from, "date_to": date_to}
+        )
+        return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    async def rebuild(
+        db: AsyncSession,
+        tenant_id: UUID,
+        date_from: date,
+        date_to: date
+    ) -> None:
+        """指定期間のサマリーを daily_operations から作り直す（commit は呼び出し側）"""
+        await db.execute(
+            text("""
+                SELECT fn_rebuild_daily_revenue_summary(
+                    CAST(:tenant_id AS uuid), CAST(:date_from AS date), CAST(:date_to AS date)
+                )
+            """),
+            {"tenant_id": tenant_id, "date_from": date_from, "date_to": date_to}
+        )
+        logger.info(f"Rebuilt daily_revenue_summary for {tenant_id}: {date_from}..{date_to}")
@@ -7,19 +7,21 @@ Slackリスト（人材管理・ビザ申請依頼）のCSVインポートサー
 申請状況(メモ),課税・納税証明書申請の郵送日,納税課税証明書,源泉徴収票,健康診断受診日,健康診断,
 完了済み,担当者,社保資格取得日
 """
-import csv
-import io
 import json
 import re
-from datetime import datetime, date
-from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy import select, text
+from datetime import date
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+from sqlalchemy import insert, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.api.models.person import Person
+from src.api.database import get_asyncpg_connection
+from src.api.services.csv_stream import CsvSource, batched, iter_csv_rows
+from src.api.services.date_parser import DateColumnParser, parse_date
+from src.api.services.import_fingerprint import ImportFingerprint
+from src.api.services.mapping_normalizer import CompiledMapping
 from src.api.models.visa import VisaRecord, VisaCase
 from src.api.models.employment import Employment, Assignment
 from src.api.models.organization import Organization
-from src.api.services.org_normalizer import OrganizationNormalizer
+from src.api.services.org_normalizer import OrganizationResolver
 from uuid import UUID
 import logging
 
@@ -143,53 +145,16 @@ class SlackListImporter:
 
     @staticmethod
     def safe_map(value: str, mapping: dict, default: str = None) -> str:
-        """安全にマッピングを適用（全角/半角、前後空白を正規化）"""
-        if value is None:
-            return mapping.get(None, default)
-        
-        # 正規化
-        normalized = value.strip()
-        
-        # 全角数字・英字を半角に変換
-        normalized = normalized.translate(str.maketrans(
-            'ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ０１２３４５６７８９',
-            'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
-        ))
-        
-        # 完全一致
-        if normalized in mapping:
-            return mapping[normalized]
-        
-        # 部分一致検索（キーがvalueに含まれるか）
-        for key, mapped_value in mapping.items():
-            if key and normalized and key in normalized:
-                return mapped_value
-        
-        return default or mapping.get('', default)
+        """
+        安全にマッピングを適用（NFKC で全角/半角を統一し、前後空白を除去）
+        完全一致がなければ、値に含まれる最も長いキーで部分一致させます。
+        """
+        return CompiledMapping.for_mapping(mapping).lookup(value, default)
 
     @staticmethod
     def _parse_date(date_str: str) -> Optional[date]:
-        """日付文字列をパース（複数フォーマット対応）"""
-        if not date_str or not date_str.strip() or date_str == '""':
-            return None
-        
-        date_str = date_str.strip().strip('"')
-        
-        formats = [
-            '%Y/%m/%d',
-            '%Y-%m-%d',
-            '%Y年%m月%d日',
-            '%m/%d/%Y',
-            '%d/%m/%Y',
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        
-        return None
+        """日付文字列をパース（西暦・和暦・月/日/年 に対応。列単位の判定は DateColumnParser）"""
+        return parse_date(date_str)
 
     @staticmethod
     def _parse_status_tags(status_str: str) -> Tuple[str, List[str]]:
@@ -264,7 +229,165 @@ class SlackListImporter:
         return name
 
     @classmethod
-    async def import_staff_list(cls, db: AsyncSession, csv_content: str, tenant_id: UUID) -> Dict[str, Any]:
+    def _parse_staff_row(
+        cls,
+        row: Dict[str, str],
+        row_num: int,
+        date_parsers: Optional[Dict[str, DateColumnParser]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        人材管理リストの1行を people テーブル用のレコードに変換します。
+        名前が空の行は None を返します（スキップ対象）。
+        date_parsers があれば、日付列はその列で判定した形式で読みます。
+        """
+        # 名前 (必須)
+        full_name = row.get("名前", "").strip().strip('"')
+        if not full_name:
+            return None
+
+        # マッピング適用
+        nationality = cls.safe_map(row.get("国籍"), cls.NATIONALITY_MAP, "other")
+        current_status, status_tags = cls._parse_status_tags(row.get("現在の状況"))
+        current_visa_type = cls.safe_map(row.get("現在の在留資格"), cls.VISA_TYPE_MAP, "other")
+        application_visa_type = cls.safe_map(row.get("申請の在留資格"), cls.VISA_TYPE_MAP, None)
+        visa_category = cls.safe_map(row.get("ビザ種類"), cls.VISA_CATEGORY_MAP, "dispatch")
+
+        # 企業名のパースと正規化
+        company_names = cls._parse_company_names(row.get("受入れ企業", ""))
+        primary_company = company_names[0] if company_names else ""
+        primary_company_normalized = cls._normalize_company_name(primary_company)
+
+        # 日付パース
+        def parse_date_column(column: str) -> Optional[date]:
+            parser = date_parsers.get(column) if date_parsers else None
+            return parser.parse(row.get(column)) if parser else cls._parse_date(row.get(column))
+
+        visa_expiry = parse_date_column("期限日")
+        health_check_date = parse_date_column("健康診断受診日")
+        insurance_date = parse_date_column("社保資格取得日")
+        tax_mail_date = parse_date_column("課税・納税証明書申請の郵送日")
+
+        # ファイルIDパース
+        residence_card_ids = cls._parse_file_ids(row.get("在留カード", ""))
+        photo_ids = cls._parse_file_ids(row.get("顔写真", ""))
+        mynumber_ids = cls._parse_file_ids(row.get("マイナンバー", ""))
+        license_ids = cls._parse_file_ids(row.get("運転免許", ""))
+        health_check_ids = cls._parse_file_ids(row.get("健康診断", ""))
+        tax_cert_ids = cls._parse_file_ids(row.get("納税課税証明書", ""))
+        withholding_ids = cls._parse_file_ids(row.get("源泉徴収票", ""))
+        application_pdf_ids = cls._parse_file_ids(row.get("申請完了PDF", ""))
+
+        # names JSONB
+        names_json = {
+            "full_name": full_name,
+            "gender": row.get("性別", "").strip().strip('"'),
+        }
+
+        # demographics JSONB
+        demographics_json = {
+            "nationality": nationality,
+        }
+
+        # contact_info JSONB  
+        email = row.get("メールアドレス", "").strip().strip('"')
+        contact_info_json = {}
+        if email:
+            contact_info_json["email"] = email
+        
+        address = row.get("最新年度の住所", "").strip().strip('"')
+        if address:
+            contact_info_json["address"] = address
+
+        # documents (Slackファイル参照)
+        documents_json = {
+            "residence_card": residence_card_ids,
+            "photo": photo_ids,
+            "mynumber": mynumber_ids,
+            "driving_license": license_ids,
+            "health_check": health_check_ids,
+            "tax_certificate": tax_cert_ids,
+            "withholding_slip": withholding_ids,
+            "application_pdf": application_pdf_ids,
+        }
+
+        # application_status (申請関連情報)
+        application_status_json = {
+            "status": row.get("申請状況", "").strip().strip('"'),
+            "memo": row.get("申請状況(メモ)", "").strip().strip('"'),
+            "is_completed": row.get("完了済み", "").lower() == "true",
+            "is_retired_notification": row.get("随時届け（退職）", "").lower() == "true",
+            "status_tags": status_tags,
+            "visa_category": visa_category,
+            "application_visa_type": application_visa_type,
+            "tax_mail_date": tax_mail_date.isoformat() if tax_mail_date else None,
+            "health_check_date": health_check_date.isoformat() if health_check_date else None,
+            "insurance_start_date": insurance_date.isoformat() if insurance_date else None,
+            "assigned_staff": row.get("担当者", "").strip().strip('"'),
+            "companies": company_names,
+        }
+
+        return {
+            "row_num": row_num,
+            "full_name": full_name,
+            "company_name": primary_company_normalized,
+            "names": names_json,
+            "demographics": demographics_json,
+            "contact_info": contact_info_json,
+            "documents": documents_json,  # TODO: documents テーブルへの保存
+            "current_status": current_status,
+            "status_notes": application_status_json,
+            "nationality": nationality,
+            "current_visa_type": current_visa_type,
+            "visa_expiry_date": visa_expiry,
+            "slack_hr_list_id": f"slack_{row_num}",  # 暫定ID
+        }
+
+    # 行フィンガープリント（import_row_hashes）の取り込み元と、ハッシュに含める正規化済みの項目
+    STAFF_FINGERPRINT_SOURCE = "slack_staff"
+    STAFF_FINGERPRINT_FIELDS = (
+        "names", "company_name", "demographics", "contact_info", "current_status",
+        "status_notes", "nationality", "current_visa_type", "visa_expiry_date",
+    )
+    FINGERPRINT_BATCH_SIZE = 500
+
+    # 形式を列単位で判定する日付列
+    STAFF_DATE_COLUMNS = ("期限日", "健康診断受診日", "社保資格取得日", "課税・納税証明書申請の郵送日")
+    VISA_DATE_COLUMNS = ("期限日",)
+
+    # ビザ案件の取り込み単位（1バッチ = 読み込み1クエリ + INSERT 1回）
+    VISA_BATCH_SIZE = 2000
+
+    # 名前 → 人材と既存案件キー（idx_people_active_full_name / idx_visa_case_person_key を使う）
+    VISA_LOOKUP_SQL = """
+        SELECT
+            p.names->>'full_name' AS full_name,
+            p.person_id,
+            vc.case_type::text AS case_type,
+            vc.deadline
+        FROM people p
+        LEFT JOIN visa_cases vc
+          ON vc.person_id = p.person_id
+         AND vc.tenant_id = p.tenant_id
+        WHERE p.tenant_id = :tenant_id
+          AND p.names->>'full_name' = ANY(CAST(:names AS text[]))
+          AND p.deleted_at IS NULL
+    """
+
+    # UPSERT で何も変わらない行（JSONB のマージ結果も含めて既存値と同じ）は更新しない。
+    # SlackImportDiff.diff_staff_list の項目比較と同じ条件。
+    STAFF_UPSERT_CHANGED_SQL = """
+        (COALESCE(people.demographics, '{}'::jsonb) || EXCLUDED.demographics) IS DISTINCT FROM people.demographics
+        OR (COALESCE(people.contact_info, '{}'::jsonb) || EXCLUDED.contact_info) IS DISTINCT FROM people.contact_info
+        OR people.current_status IS DISTINCT FROM EXCLUDED.current_status
+        OR people.current_status_notes IS DISTINCT FROM EXCLUDED.current_status_notes
+        OR people.nationality IS DISTINCT FROM EXCLUDED.nationality
+        OR people.current_visa_type IS DISTINCT FROM EXCLUDED.current_visa_type
+        OR people.visa_expiry_date IS DISTINCT FROM EXCLUDED.visa_expiry_date
+        OR (EXCLUDED.org_id IS NOT NULL AND people.org_id IS DISTINCT FROM EXCLUDED.org_id)
+    """
+
+    @classmethod
+    async def import_staff_list(cls, db: AsyncSession, csv_content: CsvSource, tenant_id: UUID) -> Dict[str, Any]:
         """
         人材管理リスト鹿児島.csv をインポートします
         
@@ -274,243 +397,613 @@ class SlackListImporter:
         申請状況(メモ),課税・納税証明書申請の郵送日,納税課税証明書,源泉徴収票,健康診断受診日,健康診断,
         完了済み,担当者,社保資格取得日
         """
-        reader = csv.DictReader(io.StringIO(csv_content))
+        # 企業名はテナント単位のキャッシュで解決
+        resolver = await OrganizationResolver.load(db, tenant_id)
+        result = await cls.import_staff_rows(db, enumerate(iter_csv_rows(csv_content), start=2), tenant_id, resolver)
+
+        await db.commit()
+        logger.info(f"Organization resolver stats: {resolver.get_stats()}")
+        return result
+
+    @classmethod
+    async def import_staff_rows(
+        cls,
+        db: AsyncSession,
+        rows: Iterable[Tuple[int, Dict[str, str]]],
+        tenant_id: UUID,
+        resolver: OrganizationResolver,
+        date_parsers: Optional[Dict[str, DateColumnParser]] = None
+    ) -> Dict[str, Any]:
+        """
+        (行番号, 行) の列を1行ずつ UPSERT します。コミットは呼び出し元で行います。
+        前回取り込み時とハッシュが一致する行は書き込まずにスキップします。
+        日付列の形式は date_parsers が無ければ列の先頭から1回だけ判定します
+        （ファイルの一部だけを渡す呼び出し元は、ファイル先頭で判定したものを渡してください）。
+        """
         success_count = 0
         update_count = 0
         skip_count = 0
+        unchanged_count = 0
         errors = []
 
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                # 名前 (必須)
+        if date_parsers is None:
+            date_parsers, rows = DateColumnParser.for_numbered_rows(cls.STAFF_DATE_COLUMNS, rows)
+        warnings = DateColumnParser.warnings(date_parsers)
+
+        for chunk in batched(rows, cls.FINGERPRINT_BATCH_SIZE):
+            records = []
+            for row_num, row in chunk:
                 full_name = row.get("名前", "").strip().strip('"')
-                if not full_name:
+                try:
+                    record = cls._parse_staff_row(row, row_num, date_parsers)
+                except Exception as e:
+                    logger.error(f"Error importing row {row_num} ({full_name}): {e}")
+                    errors.append(f"Row {row_num} ({full_name}): {str(e)}")
+                    skip_count += 1
+                    continue
+                if record is None:
+                    skip_count += 1
+                    continue
+                record["row_hash"] = ImportFingerprint.compute(record, cls.STAFF_FINGERPRINT_FIELDS)
+                records.append(record)
+
+            # 保存済みハッシュはチャンクごとに1クエリで取得する
+            stored_hashes = await ImportFingerprint.load(
+                db, tenant_id, cls.STAFF_FINGERPRINT_SOURCE, list({r["full_name"] for r in records})
+            )
+            imported_hashes: Dict[str, str] = {}
+
+            for record in records:
+                row_num = record["row_num"]
+                full_name = record["full_name"]
+                if stored_hashes.get(full_name) == record["row_hash"]:
+                    unchanged_count += 1
                     skip_count += 1
                     continue
 
-                # マッピング適用
-                nationality = cls.safe_map(row.get("国籍"), cls.NATIONALITY_MAP, "other")
-                current_status, status_tags = cls._parse_status_tags(row.get("現在の状況"))
-                current_visa_type = cls.safe_map(row.get("現在の在留資格"), cls.VISA_TYPE_MAP, "other")
-                application_visa_type = cls.safe_map(row.get("申請の在留資格"), cls.VISA_TYPE_MAP, None)
-                visa_category = cls.safe_map(row.get("ビザ種類"), cls.VISA_CATEGORY_MAP, "dispatch")
-                
-                # 企業名のパースと正規化
-                company_names = cls._parse_company_names(row.get("受入れ企業", ""))
-                primary_company = company_names[0] if company_names else ""
-                primary_company_normalized = cls._normalize_company_name(primary_company)
-                
-                # 組織ID取得（存在しなければ自動作成）
-                org_id = await OrganizationNormalizer.get_org_id_by_name(db, primary_company_normalized, tenant_id) if primary_company_normalized else None
-
-                # 日付パース
-                visa_expiry = cls._parse_date(row.get("期限日"))
-                health_check_date = cls._parse_date(row.get("健康診断受診日"))
-                insurance_date = cls._parse_date(row.get("社保資格取得日"))
-                tax_mail_date = cls._parse_date(row.get("課税・納税証明書申請の郵送日"))
-
-                # ファイルIDパース
-                residence_card_ids = cls._parse_file_ids(row.get("在留カード", ""))
-                photo_ids = cls._parse_file_ids(row.get("顔写真", ""))
-                mynumber_ids = cls._parse_file_ids(row.get("マイナンバー", ""))
-                license_ids = cls._parse_file_ids(row.get("運転免許", ""))
-                health_check_ids = cls._parse_file_ids(row.get("健康診断", ""))
-                tax_cert_ids = cls._parse_file_ids(row.get("納税課税証明書", ""))
-                withholding_ids = cls._parse_file_ids(row.get("源泉徴収票", ""))
-                application_pdf_ids = cls._parse_file_ids(row.get("申請完了PDF", ""))
-
-                # names JSONB
-                names_json = {
-                    "full_name": full_name,
-                    "gender": row.get("性別", "").strip().strip('"'),
-                }
-
-                # demographics JSONB
-                demographics_json = {
-                    "nationality": nationality,
-                }
-
-                # contact_info JSONB  
-                email = row.get("メールアドレス", "").strip().strip('"')
-                contact_info_json = {}
-                if email:
-                    contact_info_json["email"] = email
-                
-                address = row.get("最新年度の住所", "").strip().strip('"')
-                if address:
-                    contact_info_json["address"] = address
-
-                # documents (Slackファイル参照)
-                documents_json = {
-                    "residence_card": residence_card_ids,
-                    "photo": photo_ids,
-                    "mynumber": mynumber_ids,
-                    "driving_license": license_ids,
-                    "health_check": health_check_ids,
-                    "tax_certificate": tax_cert_ids,
-                    "withholding_slip": withholding_ids,
-                    "application_pdf": application_pdf_ids,
-                }
-
-                # application_status (申請関連情報)
-                application_status_json = {
-                    "status": row.get("申請状況", "").strip().strip('"'),
-                    "memo": row.get("申請状況(メモ)", "").strip().strip('"'),
-                    "is_completed": row.get("完了済み", "").lower() == "true",
-                    "is_retired_notification": row.get("随時届け（退職）", "").lower() == "true",
-                    "status_tags": status_tags,
-                    "visa_category": visa_category,
-                    "application_visa_type": application_visa_type,
-                    "tax_mail_date": tax_mail_date.isoformat() if tax_mail_date else None,
-                    "health_check_date": health_check_date.isoformat() if health_check_date else None,
-                    "insurance_start_date": insurance_date.isoformat() if insurance_date else None,
-                    "assigned_staff": row.get("担当者", "").strip().strip('"'),
-                    "companies": company_names,
-                }
-
-                # UPSERT: 名前でマッチング
-                sql = text("""
-                    INSERT INTO people (
-                        tenant_id, names, demographics, contact_info,
-                        current_status, current_status_notes, nationality, 
-                        current_visa_type, visa_expiry_date,
-                        slack_hr_list_id, updated_at
-                    ) VALUES (
-                        :tenant_id, :names, :demographics, :contact_info,
-                        :current_status, :status_notes, :nationality,
-                        :current_visa_type, :visa_expiry_date,
-                        :slack_hr_list_id, NOW()
-                    )
-                    ON CONFLICT (tenant_id, (names->>'full_name'))
-                    DO UPDATE SET
-                        demographics = people.demographics || EXCLUDED.demographics,
-                        contact_info = people.contact_info || EXCLUDED.contact_info,
-                        current_status = EXCLUDED.current_status,
-                        current_status_notes = EXCLUDED.current_status_notes,
-                        nationality = EXCLUDED.nationality,
-                        current_visa_type = EXCLUDED.current_visa_type,
-                        visa_expiry_date = EXCLUDED.visa_expiry_date,
-                        updated_at = NOW()
-                    RETURNING (xmax = 0) as inserted
-                """)
+                try:
+                    # 組織ID取得（存在しなければ自動作成）
+                    company_name = record["company_name"]
+                    org_id = await resolver.get_org_id(db, company_name) if company_name else None
+
+                    # UPSERT: 名前でマッチング
+                    sql = text(f"""
+                        INSERT INTO people (
+                            tenant_id, names, demographics, contact_info,
+                            current_status, current_status_notes, nationality, 
+                            current_visa_type, visa_expiry_date, org_id,
+                            slack_hr_list_id, updated_at
+                        ) VALUES (
+                            :tenant_id, :names, :demographics, :contact_info,
+                            :current_status, :status_notes, :nationality,
+                            :current_visa_type, :visa_expiry_date, :org_id,
+                            :slack_hr_list_id, NOW()
+                        )
+                        ON CONFLICT (tenant_id, (names->>'full_name'))
+                        DO UPDATE SET
+                            demographics = people.demographics || EXCLUDED.demographics,
+                            contact_info = people.contact_info || EXCLUDED.contact_info,
+                            current_status = EXCLUDED.current_status,
+                            current_status_notes = EXCLUDED.current_status_notes,
+                            nationality = EXCLUDED.nationality,
+                            current_visa_type = EXCLUDED.current_visa_type,
+                            visa_expiry_date = EXCLUDED.visa_expiry_date,
+                            org_id = COALESCE(EXCLUDED.org_id, people.org_id),
+                            updated_at = NOW()
+                        WHERE {cls.STAFF_UPSERT_CHANGED_SQL}
+                        RETURNING (xmax = 0) as inserted
+                    """)
                 
-                result = await db.execute(sql, {
-                    "tenant_id": tenant_id,
-                    "names": json.dumps(names_json, ensure_ascii=False),
-                    "demographics": json.dumps(demographics_json, ensure_ascii=False),
-                    "contact_info": json.dumps(contact_info_json, ensure_ascii=False),
-                    "current_status": current_status,
-                    "status_notes": json.dumps(application_status_json, ensure_ascii=False),
-                    "nationality": nationality,
-                    "current_visa_type": current_visa_type,
-                    "visa_expiry_date": visa_expiry,
-                    "slack_hr_list_id": f"slack_{row_num}",  # 暫定ID
-                })
+                    result = await db.execute(sql, {
+                        "tenant_id": tenant_id,
+                        "names": json.dumps(record["names"], ensure_ascii=False),
+                        "demographics": json.dumps(record["demographics"], ensure_ascii=False),
+                        "contact_info": json.dumps(record["contact_info"], ensure_ascii=False),
+                        "current_status": record["current_status"],
+                        "status_notes": json.dumps(record["status_notes"], ensure_ascii=False),
+                        "nationality": record["nationality"],
+                        "current_visa_type": record["current_visa_type"],
+                        "visa_expiry_date": record["visa_expiry_date"],
+                        "org_id": org_id,
+                        "slack_hr_list_id": record["slack_hr_list_id"],
+                    })
+
+                    row_result = result.fetchone()
+                    if row_result is None:
+                        # 変更なし（UPDATE の WHERE で除外）
+                        unchanged_count += 1
+                        skip_count += 1
+                    elif row_result.inserted:
+                        success_count += 1
+                    else:
+                        update_count += 1
+
+                    imported_hashes[full_name] = stored_hashes[full_name] = record["row_hash"]
+
+                    # ドキュメント情報を別テーブルに保存（オプション）
+                    # TODO: documents テーブルへの保存
+
+                except Exception as e:
+                    logger.error(f"Error importing row {row_num} ({full_name}): {e}")
+                    errors.append(f"Row {row_num} ({full_name}): {str(e)}")
+                    skip_count += 1
+
+            await ImportFingerprint.store(db, tenant_id, cls.STAFF_FINGERPRINT_SOURCE, imported_hashes)
+
+        return cls._import_result(success_count, update_count, skip_count, errors, unchanged_count, warnings)
+
+    # ===== 一括インポート（COPY + セットベース MERGE） =====
+
+    # ステージングテーブルのカラム（COPY の列順）
+    STAFF_STAGING_COLUMNS = (
+        "row_num", "names", "demographics", "contact_info",
+        "current_status", "status_notes", "nationality",
+        "current_visa_type", "visa_expiry_date", "org_id", "slack_hr_list_id",
+    )
+
+    @staticmethod
+    def _merge_duplicate_staff_record(existing: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """
+        同一ファイル内で同じ名前が複数回出現した場合に、行単位の UPSERT を順に実行した結果と
+        同じになるようにレコードを統合します。
+        - names / slack_hr_list_id: 最初の行（INSERT 時の値）を維持
+        - demographics / contact_info: JSONB の || と同様に後勝ちでマージ
+        - その他のカラム: 後の行で上書き
+        """
+        existing["demographics"] = {**existing["demographics"], **record["demographics"]}
+        existing["contact_info"] = {**existing["contact_info"], **record["contact_info"]}
+        for key in ("row_num", "company_name", "current_status", "status_notes",
+                    "nationality", "current_visa_type", "visa_expiry_date"):
+            existing[key] = record[key]
+
+    @classmethod
+    def _staff_staging_record(cls, record: Dict[str, Any]) -> Tuple:
+        """COPY 用のタプルに変換（JSONB は文字列として渡す）"""
+        return (
+            record["row_num"],
+            json.dumps(record["names"], ensure_ascii=False),
+            json.dumps(record["demographics"], ensure_ascii=False),
+            json.dumps(record["contact_info"], ensure_ascii=False),
+            record["current_status"],
+            json.dumps(record["status_notes"], ensure_ascii=False),
+            record["nationality"],
+            record["current_visa_type"],
+            record["visa_expiry_date"],
+            record.get("org_id"),
+            record["slack_hr_list_id"],
+        )
+
+    @classmethod
+    async def _merge_staff_batch(cls, db: AsyncSession, records: List[Dict[str, Any]], tenant_id: UUID) -> Dict[str, bool]:
+        """
+        レコード群をステージングテーブルへ COPY し、1回の INSERT ... SELECT ... ON CONFLICT で people にマージします。
+        戻り値: full_name -> 新規作成されたかどうか（変更のない既存行は UPDATE されず含まれない）
+        """
+        await db.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS staff_import_staging (
+                row_num INTEGER NOT NULL,
+                names JSONB NOT NULL,
+                demographics JSONB,
+                contact_info JSONB,
+                current_status TEXT,
+                status_notes TEXT,
+                nationality TEXT,
+                current_visa_type TEXT,
+                visa_expiry_date DATE,
+                org_id UUID,
+                slack_hr_list_id TEXT
+            ) ON COMMIT DROP
+        """))
+        await db.execute(text("TRUNCATE staff_import_staging"))
+
+        conn = await get_asyncpg_connection(db)
+        await conn.copy_records_to_table(
+            "staff_import_staging",
+            records=[cls._staff_staging_record(r) for r in records],
+            columns=list(cls.STAFF_STAGING_COLUMNS),
+        )
+
+        result = await db.execute(text(f"""
+            INSERT INTO people (
+                tenant_id, names, demographics, contact_info,
+                current_status, current_status_notes, nationality,
+                current_visa_type, visa_expiry_date, org_id,
+                slack_hr_list_id, updated_at
+            )
+            SELECT
+                CAST(:tenant_id AS uuid), s.names, s.demographics, s.contact_info,
+                s.current_status::person_status, s.status_notes, s.nationality,
+                s.current_visa_type::visa_type, s.visa_expiry_date, s.org_id,
+                s.slack_hr_list_id, NOW()
+            FROM staff_import_staging s
+            ORDER BY s.row_num
+            ON CONFLICT (tenant_id, (names->>'full_name'))
+            DO UPDATE SET
+                demographics = people.demographics || EXCLUDED.demographics,
+                contact_info = people.contact_info || EXCLUDED.contact_info,
+                current_status = EXCLUDED.current_status,
+                current_status_notes = EXCLUDED.current_status_notes,
+                nationality = EXCLUDED.nationality,
+                current_visa_type = EXCLUDED.current_visa_type,
+                visa_expiry_date = EXCLUDED.visa_expiry_date,
+                org_id = COALESCE(EXCLUDED.org_id, people.org_id),
+                updated_at = NOW()
+            WHERE {cls.STAFF_UPSERT_CHANGED_SQL}
+            RETURNING names->>'full_name' AS full_name, (xmax = 0) AS inserted
+        """), {"tenant_id": tenant_id})
+
+        return {row.full_name: row.inserted for row in result}
+
+    @classmethod
+    async def import_staff_list_bulk(
+        cls,
+        db: AsyncSession,
+        csv_content: CsvSource,
+        tenant_id: UUID,
+        batch_size: int = 5000
+    ) -> Dict[str, Any]:
+        """
+        人材管理リスト鹿児島.csv を一括モードでインポートします。
 
-                row_result = result.fetchone()
-                if row_result and row_result.inserted:
-                    success_count += 1
-                else:
-                    update_count += 1
+        ファイルは batch_size 行ずつ読み進め、バッチごとに import_staff_rows_bulk で取り込みます（メモリはバッチ分のみ）。
+        バッチをまたぐ同名行は後のバッチの UPSERT で更新されるため、結果は行単位インポートと同じです。
+        戻り値の形式（件数・行単位のエラー）は import_staff_list と同じです。
+        """
+        resolver = await OrganizationResolver.load(db, tenant_id)
+        result = cls._import_result(0, 0, 0, [])
+
+        # 日付列の形式はファイル先頭で1回だけ判定し、全バッチで同じものを使う
+        date_parsers, rows = DateColumnParser.for_numbered_rows(
+            cls.STAFF_DATE_COLUMNS, enumerate(iter_csv_rows(csv_content), start=2)
+        )
+        for batch in batched(rows, batch_size):
+            cls.accumulate_result(
+                result, await cls.import_staff_rows_bulk(db, batch, tenant_id, resolver, date_parsers)
+            )
+
+        await db.commit()
+        logger.info(f"Organization resolver stats: {resolver.get_stats()}")
+        return result
 
-                # ドキュメント情報を別テーブルに保存（オプション）
-                # TODO: documents テーブルへの保存
+    @classmethod
+    async def import_staff_rows_bulk(
+        cls,
+        db: AsyncSession,
+        rows: List[Tuple[int, Dict[str, str]]],
+        tenant_id: UUID,
+        resolver: OrganizationResolver,
+        date_parsers: Optional[Dict[str, DateColumnParser]] = None
+    ) -> Dict[str, Any]:
+        """
+        1バッチ分の (行番号, 行) を一括で取り込みます。コミットは呼び出し元で行います。
+        複数バッチに分けて渡す場合は、ファイル先頭で判定した date_parsers を渡してください
+        （無ければこのバッチから判定します）。
+
+        1. パース（バッチ内の同名の重複行はメモリ上で統合）
+        2. 前回取り込み時と内容ハッシュが一致する人を除外
+        3. 受入れ企業はユニークな企業名ごとに1回だけ正規化
+        4. ステージングテーブルへ COPY し、セットベースの UPSERT でマージ
+        """
+        success_count = 0
+        update_count = 0
+        skip_count = 0
+        unchanged_count = 0
+        errors = []
 
+        # 1. パース
+        if date_parsers is None:
+            date_parsers = DateColumnParser.for_rows(cls.STAFF_DATE_COLUMNS, [row for _, row in rows])
+        warnings = DateColumnParser.warnings(date_parsers)
+        records: Dict[str, Dict[str, Any]] = {}
+        occurrences: Dict[str, int] = {}
+        for row_num, row in rows:
+            full_name = row.get("名前", "").strip().strip('"')
+            try:
+                record = cls._parse_staff_row(row, row_num, date_parsers)
             except Exception as e:
                 logger.error(f"Error importing row {row_num} ({full_name}): {e}")
                 errors.append(f"Row {row_num} ({full_name}): {str(e)}")
                 skip_count += 1
+                continue
 
-        await db.commit()
-        
+            if record is None:
+                skip_count += 1
+                continue
+
+            if full_name in records:
+                cls._merge_duplicate_staff_record(records[full_name], record)
+            else:
+                records[full_name] = record
+            occurrences[full_name] = occurrences.get(full_name, 0) + 1
+
+        # 2. 前回取り込み時とハッシュが一致する人は書き込まない
+        hashes = {
+            full_name: ImportFingerprint.compute(record, cls.STAFF_FINGERPRINT_FIELDS)
+            for full_name, record in records.items()
+        }
+        stored_hashes = await ImportFingerprint.load(db, tenant_id, cls.STAFF_FINGERPRINT_SOURCE, list(hashes))
+        for full_name in [n for n, h in hashes.items() if stored_hashes.get(n) == h]:
+            del records[full_name]
+            skip_count += occurrences[full_name]
+            unchanged_count += occurrences[full_name]
+
+        # 3. 企業名の正規化（ユニーク名ごと）
+        failed_companies: Dict[str, str] = {}
+        org_ids: Dict[str, Optional[UUID]] = {}
+        for company_name in sorted({r["company_name"] for r in records.values() if r["company_name"]}):
+            try:
+                org_ids[company_name] = await resolver.get_org_id(db, company_name)
+            except Exception as e:
+                logger.error(f"Error resolving organization '{company_name}': {e}")
+                failed_companies[company_name] = str(e)
+
+        if failed_companies:
+            for full_name in [n for n, r in records.items() if r["company_name"] in failed_companies]:
+                record = records.pop(full_name)
+                errors.append(f"Row {record['row_num']} ({full_name}): {failed_companies[record['company_name']]}")
+                skip_count += occurrences.pop(full_name)
+
+        if not records:
+            return cls._import_result(success_count, update_count, skip_count, errors, unchanged_count, warnings)
+
+        for record in records.values():
+            record["org_id"] = org_ids.get(record["company_name"])
+
+        # 4. COPY + MERGE
+        batch = sorted(records.values(), key=lambda r: r["row_num"])
+        try:
+            # バッチ単位の SAVEPOINT（失敗したバッチのみ巻き戻す）
+            async with db.begin_nested():
+                merged = await cls._merge_staff_batch(db, batch, tenant_id)
+                await ImportFingerprint.store(
+                    db, tenant_id, cls.STAFF_FINGERPRINT_SOURCE, {n: hashes[n] for n in records}
+                )
+        except Exception as e:
+            logger.error(f"Error merging staff batch (rows {batch[0]['row_num']}-{batch[-1]['row_num']}): {e}")
+            for record in batch:
+                errors.append(f"Row {record['row_num']} ({record['full_name']}): {str(e)}")
+                skip_count += occurrences[record["full_name"]]
+            return cls._import_result(success_count, update_count, skip_count, errors, unchanged_count, warnings)
+
+        for record in batch:
+            full_name = record["full_name"]
+            # 同名の重複行は、行単位インポートと同様に2行目以降を「更新」として数える
+            extra = occurrences[full_name] - 1
+            if full_name not in merged:
+                # 変更なし（UPDATE の WHERE で除外）
+                skip_count += 1 + extra
+                unchanged_count += 1 + extra
+            elif merged[full_name]:
+                success_count += 1
+                update_count += extra
+            else:
+                update_count += 1 + extra
+
+        return cls._import_result(success_count, update_count, skip_count, errors, unchanged_count, warnings)
+
+    @staticmethod
+    def _import_result(
+        success_count: int,
+        update_count: int,
+        skip_count: int,
+        errors: List[str],
+        unchanged_count: int = 0,
+        warnings: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """件数の辞書（unchanged_count は変更なしでスキップした行数で、skip_count の内数）"""
         return {
             "success_count": success_count,
             "update_count": update_count,
             "skip_count": skip_count,
+            "unchanged_count": unchanged_count,
             "errors": errors,
+            "warnings": warnings or [],
             "total_processed": success_count + update_count + skip_count
         }
 
+    @staticmethod
+    def accumulate_result(total: Dict[str, Any], part: Dict[str, Any]) -> None:
+        """チャンク・バッチ単位の結果を合算します（キーの有無はインポート種別による）"""
+        for key, value in part.items():
+            if key == "errors":
+                total.setdefault("errors", []).extend(value)
+            elif key == "warnings":
+                seen = total.setdefault("warnings", [])
+                seen.extend(w for w in value if w not in seen)
+            else:
+                total[key] = total.get(key, 0) + value
+
     @classmethod
-    async def import_visa_list(cls, db: AsyncSession, csv_content: str, tenant_id: UUID) -> Dict[str, Any]:
+    async def import_visa_list(cls, db: AsyncSession, csv_content: CsvSource, tenant_id: UUID) -> Dict[str, Any]:
         """
         ビザ申請依頼リスト.csv をインポートします
         """
-        reader = csv.DictReader(io.StringIO(csv_content))
+        # 企業名はテナント単位のキャッシュで解決
+        resolver = await OrganizationResolver.load(db, tenant_id)
+        result = await cls.import_visa_rows(db, enumerate(iter_csv_rows(csv_content), start=2), tenant_id, resolver)
+
+        await db.commit()
+        logger.info(f"Organization resolver stats: {resolver.get_stats()}")
+        return result
+
+    @classmethod
+    def _parse_visa_row(
+        cls,
+        row: Dict[str, str],
+        row_num: int,
+        name: str,
+        date_parsers: Dict[str, DateColumnParser]
+    ) -> Dict[str, Any]:
+        """ビザ申請依頼リストの1行を案件作成用の値に変換します"""
+        # マッピング適用
+        case_type = cls.safe_map(row.get("申請種類"), cls.CASE_TYPE_MAP, "notification")
+        deadline = date_parsers["期限日"].parse(row.get("期限日"))
+
+        # 作成状況をタグ配列に変換
+        raw_status = row.get("作成状況", "").strip()
+        status_tags = [s.strip() for s in raw_status.split(",") if s.strip()]
+
+        # 優先度
+        try:
+            priority_val = row.get("優先度", "2")
+            priority = int(priority_val if priority_val else "2")
+            priority = max(1, min(5, priority))
+        except (ValueError, TypeError):
+            priority = 2
+
+        return {
+            "row_num": row_num,
+            "name": name,
+            "org_name": row.get("受入れ企業") or row.get("会社名"),
+            "case_type": case_type,
+            "deadline": deadline,
+            "status_tags": status_tags,
+            "priority": priority,
+            "is_completed": row.get("完了済み", "").lower() == "true",
+        }
+
+    @staticmethod
+    async def _load_visa_lookup(
+        db: AsyncSession,
+        tenant_id: UUID,
+        names: List[str]
+    ) -> Tuple[Dict[str, UUID], Set[Tuple[UUID, str, Optional[date]]]]:
+        """
+        名前 → person_id と、その人たちの既存案件キー (person_id, case_type, deadline) を1クエリで返します。
+        論理削除された人材（名寄せで統合済みなど）には案件を付けません。
+        """
+        result = await db.execute(
+            text(SlackListImporter.VISA_LOOKUP_SQL),
+            {"tenant_id": tenant_id, "names": names}
+        )
+        person_ids: Dict[str, UUID] = {}
+        case_keys: Set[Tuple[UUID, str, Optional[date]]] = set()
+        for row in result:
+            person_ids[row.full_name] = row.person_id
+            if row.case_type is not None:
+                case_keys.add((row.person_id, row.case_type, row.deadline))
+        return person_ids, case_keys
+
+    @classmethod
+    async def import_visa_rows(
+        cls,
+        db: AsyncSession,
+        rows: Iterable[Tuple[int, Dict[str, str]]],
+        tenant_id: UUID,
+        resolver: OrganizationResolver,
+        date_parsers: Optional[Dict[str, DateColumnParser]] = None
+    ) -> Dict[str, Any]:
+        """
+        (行番号, 行) の列からビザ案件を作成します。コミットは呼び出し元で行います。
+        日付列の形式は date_parsers が無ければ列の先頭で判定します。
+
+        VISA_BATCH_SIZE 行ごとに
+        1. パース
+        2. 人材（名前 → person_id）と既存案件のキー (person_id, case_type, deadline) を1クエリで読み込み
+        3. 受入れ企業はユニークな企業名ごとに1回だけ正規化（テナント単位のキャッシュ）
+        4. 新規案件を1回の複数行 INSERT で作成
+        同じファイル内で重複する案件は最初の行だけを作成します。
+        """
         success_count = 0
         skip_count = 0
         errors = []
 
-        for row_num, row in enumerate(reader, start=2):
-            try:
+        if date_parsers is None:
+            date_parsers, rows = DateColumnParser.for_numbered_rows(cls.VISA_DATE_COLUMNS, rows)
+        # 作成済み・既存の案件キー（バッチをまたいだ重複も除く）
+        seen_cases: Set[Tuple[UUID, str, Optional[date]]] = set()
+
+        for batch in batched(rows, cls.VISA_BATCH_SIZE):
+            # 1. パース
+            items = []
+            for row_num, row in batch:
                 name = row.get("名前", "").strip()
                 if not name:
                     continue
+                try:
+                    items.append(cls._parse_visa_row(row, row_num, name, date_parsers))
+                except Exception as e:
+                    logger.error(f"Error in row {row_num}: {e}")
+                    errors.append(f"Row {row_num} ({name}): {str(e)}")
+                    skip_count += 1
 
-                # 1. 人材の検索
-                stmt = select(Person).where(
-                    Person.names.op('->>')('full_name') == name,
-                    Person.tenant_id == tenant_id
-                )
-                result = await db.execute(stmt)
-                person = result.scalar_one_or_none()
-                
-                if not person:
-                    errors.append(f"Row {row_num}: Person not found: {name}")
+            if not items:
+                continue
+
+            # 2. 人材と既存案件
+            person_ids, existing_cases = await cls._load_visa_lookup(
+                db, tenant_id, sorted({item["name"] for item in items})
+            )
+            seen_cases |= existing_cases
+
+            found = []
+            for item in items:
+                person_id = person_ids.get(item["name"])
+                if not person_id:
+                    errors.append(f"Row {item['row_num']}: Person not found: {item['name']}")
                     skip_count += 1
                     continue
+                item["person_id"] = person_id
+                found.append(item)
 
-                # 2. 企業名の正規化
-                org_name = row.get("受入れ企業") or row.get("会社名")
-                org_id = await OrganizationNormalizer.get_org_id_by_name(db, org_name, tenant_id) if org_name else None
-
-                # 3. マッピング適用
-                case_type = cls.safe_map(row.get("申請種類"), cls.CASE_TYPE_MAP, "notification")
-                deadline = cls._parse_date(row.get("期限日"))
-                
-                # 作成状況をタグ配列に変換
-                raw_status = row.get("作成状況", "").strip()
-                status_tags = [s.strip() for s in raw_status.split(",") if s.strip()]
-                
-                # 優先度
+            # 3. 企業名の正規化（ユニーク名ごと）
+            org_ids: Dict[str, Optional[UUID]] = {}
+            failed_companies: Dict[str, str] = {}
+            for org_name in sorted({item["org_name"] for item in found if item["org_name"]}):
                 try:
-                    priority_val = row.get("優先度", "2")
-                    priority = int(priority_val if priority_val else "2")
-                    priority = max(1, min(5, priority))
-                except (ValueError, TypeError):
-                    priority = 2
-
-                # 4. ビザ案件の重複チェック
-                stmt = select(VisaCase).where(
-                    VisaCase.person_id == person.person_id,
-                    VisaCase.case_type == case_type,
-                    VisaCase.deadline == deadline,
-                    VisaCase.tenant_id == tenant_id
-                )
-                result = await db.execute(stmt)
-                existing_case = result.scalar_one_or_none()
-                
-                if not existing_case:
-                    new_case = VisaCase(
-                        tenant_id=tenant_id,
-                        person_id=person.person_id,
-                        client_org_id=org_id,
-                        client_name_raw=org_name,
-                        case_type=case_type,
-                        is_completed=row.get("完了済み", "").lower() == "true",
-                        priority=priority,
-                        deadline=deadline,
-                        status_tags=status_tags
-                    )
-                    db.add(new_case)
-                    success_count += 1
-                else:
+                    org_ids[org_name] = await resolver.get_org_id(db, org_name)
+                except Exception as e:
+                    logger.error(f"Error resolving organization '{org_name}': {e}")
+                    failed_companies[org_name] = str(e)
+
+            # 4. 重複を除いて複数行 INSERT
+            new_cases = []
+            new_rows = []
+            for item in found:
+                if item["org_name"] in failed_companies:
+                    errors.append(f"Row {item['row_num']} ({item['name']}): {failed_companies[item['org_name']]}")
                     skip_count += 1
+                    continue
+                key = (item["person_id"], item["case_type"], item["deadline"])
+                if key in seen_cases:
+                    skip_count += 1
+                    continue
+                seen_cases.add(key)
+                new_rows.append(item)
+                new_cases.append({
+                    "tenant_id": tenant_id,
+                    "person_id": item["person_id"],
+                    "client_org_id": org_ids.get(item["org_name"]) if item["org_name"] else None,
+                    "client_name_raw": item["org_name"],
+                    "case_type": item["case_type"],
+                    "is_completed": item["is_completed"],
+                    "priority": item["priority"],
+                    "deadline": item["deadline"],
+                    "status_tags": item["status_tags"],
+                })
 
+            if not new_cases:
+                continue
+
+            try:
+                # バッチ単位の SAVEPOINT（失敗したバッチのみ巻き戻す）
+                async with db.begin_nested():
+                    await db.execute(insert(VisaCase).values(new_cases))
             except Exception as e:
-                logger.error(f"Error in row {row_num}: {e}")
-                errors.append(f"Row {row_num} ({name}): {str(e)}")
-                skip_count += 1
+                logger.error(
+                    f"Error inserting visa cases (rows {new_rows[0]['row_num']}-{new_rows[-1]['row_num']}): {e}"
+                )
+                for item in new_rows:
+                    errors.append(f"Row {item['row_num']} ({item['name']}): {str(e)}")
+                    seen_cases.discard((item["person_id"], item["case_type"], item["deadline"]))
+                skip_count += len(new_rows)
+                continue
 
-        await db.commit()
-        return {"success_count": success_count, "skip_count": skip_count, "errors": errors}
+            success_count += len(new_cases)
+
+        return {
+            "success_count": success_count,
+            "skip_count": skip_count,
+            "errors": errors,
+            "warnings": DateColumnParser.warnings(date_parsers),
+        }
@@ -4,16 +4,17 @@ SmartHRからのCSVインポートサービス
 SmartHR_crews_*.csv のフォーマット:
 社員番号,姓,名,部署1 部署,役職1 役職,雇用形態,入社年月日,生年月日
 """
-import csv
-import io
 import json
 import logging
-from datetime import datetime, date
-from typing import Dict, Any, Optional, List
+from datetime import date
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from uuid import UUID
-from sqlalchemy import select, text
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.api.models.person import Person
+from src.api.database import get_asyncpg_connection
+from src.api.services.csv_stream import CsvSource, iter_csv_rows
+from src.api.services.date_parser import DateColumnParser, parse_date
+from src.api.services.person_matcher import PersonKeys, PersonMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -48,27 +49,13 @@ class SmartHRImporter:
         None: 'dispatch',
     }
 
+    # 形式を列単位で判定する日付列
+    DATE_COLUMNS = ("生年月日", "入社年月日")
+
     @staticmethod
     def _parse_date(date_str: str) -> Optional[date]:
-        """日付文字列をパース（複数フォーマット対応）"""
-        if not date_str or not date_str.strip() or date_str == '""':
-            return None
-        
-        date_str = date_str.strip().strip('"')
-        
-        formats = [
-            '%Y/%m/%d',
-            '%Y-%m-%d',
-            '%Y年%m月%d日',
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        
-        return None
+        """日付文字列をパース（西暦・和暦、複数フォーマット対応）"""
+        return parse_date(date_str)
 
     @staticmethod
     def _normalize_name(last_name: str, first_name: str) -> str:
@@ -85,87 +72,137 @@ class SmartHRImporter:
         return last or first
 
     @classmethod
-    async def import_csv(cls, db: AsyncSession, csv_content: str, tenant_id: UUID) -> Dict[str, Any]:
+    def _parse_row(
+        cls,
+        row: Dict[str, str],
+        date_parsers: Dict[str, DateColumnParser]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        1行をパースします。氏名が空の行は None を返します。
+        """
+        # 基本情報取得
+        crew_id = (row.get("社員番号") or "").strip()
+        last_name = (row.get("姓") or "").strip()
+        first_name = (row.get("名") or "").strip()
+        full_name = cls._normalize_name(last_name, first_name)
+
+        # 空行スキップ
+        if not full_name:
+            return None
+
+        # マッピング適用
+        department = row.get("部署1 部署", "")
+        position = row.get("役職1 役職", "")
+        employment_type_raw = row.get("雇用形態", "")
+
+        # 日付パース
+        birth_date = date_parsers["生年月日"].parse(row.get("生年月日"))
+        hire_date = date_parsers["入社年月日"].parse(row.get("入社年月日"))
+
+        # demographics JSONB
+        demographics_json = {}
+        if birth_date:
+            demographics_json["birth_date"] = birth_date.isoformat()
+
+        return {
+            "crew_id": crew_id or None,
+            "full_name": full_name,
+            "names": {
+                "full_name": full_name,
+                "last_name": last_name,
+                "first_name": first_name,
+            },
+            "demographics": demographics_json,
+            # 追加情報 (SmartHR固有)
+            "smarthr_meta": {
+                "department": department,
+                "position": position,
+                "employment_type": employment_type_raw,
+                "employment_type_code": cls.EMPLOYMENT_TYPE_MAP.get(employment_type_raw, "other"),
+                "business_division": cls.DEPARTMENT_MAP.get(department, "dispatch"),
+                "hire_date": hire_date.isoformat() if hire_date else None,
+            },
+        }
+
+    @classmethod
+    async def import_csv(cls, db: AsyncSession, csv_content: CsvSource, tenant_id: UUID) -> Dict[str, Any]:
         """
         SmartHR 従業員CSV をインポートします
         
         今回のCSVヘッダー:
         社員番号,姓,名,部署1 部署,役職1 役職,雇用形態,入社年月日,生年月日
         """
-        # BOM付UTF-8対策
-        if csv_content.startswith('\ufeff'):
-            csv_content = csv_content[1:]
-            
-        reader = csv.DictReader(io.StringIO(csv_content))
+        # BOM付UTF-8・CP932 は iter_csv_rows 側で判定する
+        result = await cls.import_rows(db, enumerate(iter_csv_rows(csv_content), start=2), tenant_id)
+        await db.commit()
+        return result
+
+    @classmethod
+    async def import_rows(
+        cls,
+        db: AsyncSession,
+        rows: Iterable[Tuple[int, Dict[str, str]]],
+        tenant_id: UUID,
+        date_parsers: Optional[Dict[str, DateColumnParser]] = None
+    ) -> Dict[str, Any]:
+        """
+        (行番号, 行) の列を1行ずつ UPSERT します。コミットは呼び出し元で行います。
+        日付列の形式は date_parsers が無ければ列の先頭で判定します（ファイルの一部を渡す場合は
+        ファイル先頭で判定したものを渡してください）。
+        """
         success_count = 0
         update_count = 0
         skip_count = 0
         errors = []
 
-        for row_num, row in enumerate(reader, start=2):
+        if date_parsers is None:
+            date_parsers, rows = DateColumnParser.for_numbered_rows(cls.DATE_COLUMNS, rows)
+
+        for row_num, row in rows:
+            full_name = ""
             try:
-                # 基本情報取得
-                crew_id = row.get("社員番号", "").strip()
-                last_name = row.get("姓", "").strip()
-                first_name = row.get("名", "").strip()
-                full_name = cls._normalize_name(last_name, first_name)
-                
-                # 空行スキップ
-                if not full_name:
+                record = cls._parse_row(row, date_parsers)
+                if record is None:
                     skip_count += 1
                     continue
-
-                # マッピング適用
-                department = row.get("部署1 部署", "")
-                position = row.get("役職1 役職", "")
-                employment_type_raw = row.get("雇用形態", "")
-                employment_type = cls.EMPLOYMENT_TYPE_MAP.get(employment_type_raw, "other")
-                business_division = cls.DEPARTMENT_MAP.get(department, "dispatch")
-                
-                # 日付パース
-                birth_date = cls._parse_date(row.get("生年月日"))
-                hire_date = cls._parse_date(row.get("入社年月日"))
-                
-                # names JSONB
-                names_json = {
-                    "full_name": full_name,
-                    "last_name": last_name,
-                    "first_name": first_name,
-                }
-                
-                # demographics JSONB
-                demographics_json = {}
-                if birth_date:
-                    demographics_json["birth_date"] = birth_date.isoformat()
-                
-                # contact_info JSONB (SmartHRにメール等があれば)
+                full_name = record["full_name"]
+                crew_id = record["crew_id"]
+                names_json = record["names"]
+                demographics_json = record["demographics"]
                 contact_info_json = {}
-                
-                # 追加情報 (SmartHR固有)
-                smarthr_meta = {
-                    "department": department,
-                    "position": position,
-                    "employment_type": employment_type_raw,
-                    "hire_date": hire_date.isoformat() if hire_date else None,
-                    "imported_at": datetime.now().isoformat(),
-                }
 
                 # UPSERT: 社員番号でマッチング優先、なければ名前でマッチング
+                # （名寄せで社員番号が別名の人材に移っている場合があるため、社員番号の一致を先に更新する）
                 sql = text("""
-                    INSERT INTO people (
-                        tenant_id, names, demographics, contact_info,
-                        current_status, smarthr_crew_id, smarthr_sync_at, updated_at
-                    ) VALUES (
-                        :tenant_id, :names, :demographics, :contact_info,
-                        'monitoring', :smarthr_crew_id, NOW(), NOW()
+                    WITH by_crew AS (
+                        UPDATE people SET
+                            demographics = demographics || CAST(:demographics AS jsonb),
+                            smarthr_sync_at = NOW(),
+                            updated_at = NOW()
+                        WHERE tenant_id = :tenant_id
+                          AND smarthr_crew_id = :smarthr_crew_id
+                        RETURNING FALSE AS inserted
+                    ),
+                    by_name AS (
+                        INSERT INTO people (
+                            tenant_id, names, demographics, contact_info,
+                            current_status, smarthr_crew_id, smarthr_sync_at, updated_at
+                        )
+                        SELECT
+                            CAST(:tenant_id AS uuid), CAST(:names AS jsonb), CAST(:demographics AS jsonb),
+                            CAST(:contact_info AS jsonb), 'monitoring'::person_status, :smarthr_crew_id, NOW(), NOW()
+                        WHERE NOT EXISTS (SELECT 1 FROM by_crew)
+                        ON CONFLICT (tenant_id, (names->>'full_name'))
+                        DO UPDATE SET
+                            smarthr_crew_id = COALESCE(EXCLUDED.smarthr_crew_id, people.smarthr_crew_id),
+                            demographics = people.demographics || EXCLUDED.demographics,
+                            smarthr_sync_at = NOW(),
+                            updated_at = NOW()
+                        RETURNING (xmax = 0) AS inserted
                     )
-                    ON CONFLICT (tenant_id, (names->>'full_name'))
-                    DO UPDATE SET
-                        smarthr_crew_id = COALESCE(EXCLUDED.smarthr_crew_id, people.smarthr_crew_id),
-                        demographics = people.demographics || EXCLUDED.demographics,
-                        smarthr_sync_at = NOW(),
-                        updated_at = NOW()
-                    RETURNING (xmax = 0) as inserted
+                    SELECT inserted FROM by_crew
+                    UNION ALL
+                    SELECT inserted FROM by_name
                 """)
                 
                 result = await db.execute(sql, {
@@ -187,55 +224,379 @@ class SmartHRImporter:
                 errors.append(f"Row {row_num} ({full_name}): {str(e)}")
                 skip_count += 1
 
-        await db.commit()
-        
         return {
             "success_count": success_count,
             "update_count": update_count,
             "skip_count": skip_count,
             "errors": errors,
+            "warnings": DateColumnParser.warnings(date_parsers),
             "total_processed": success_count + update_count + skip_count
         }
 
+    # 一括同期のステージングテーブルへ COPY するカラム（_sync_staging_record と同順）
+    SYNC_STAGING_COLUMNS = ("row_num", "crew_id", "full_name", "names", "demographics")
+
     @classmethod
-    async def merge_with_slack_data(cls, db: AsyncSession, tenant_id: UUID) -> Dict[str, Any]:
+    async def sync_csv_bulk(cls, db: AsyncSession, csv_content: CsvSource, tenant_id: UUID) -> Dict[str, Any]:
         """
-        SmartHRデータとSlackリストデータをマージ
-        名前の部分一致でマッチングを試みる
+        SmartHR CSV を一括同期モードで取り込みます（夜間同期用）。
+
+        - 既存の人材は 社員番号（(tenant_id, smarthr_crew_id) の一意インデックス）で照合し、
+          社員番号が未連携の人材だけを氏名で照合します
+        - ファイル全体を1回の COPY でステージングし、1つの MERGE 文（CTE）で people に反映します
+        - 社員番号を持つ人材のうち今回のエクスポートに現れなかった人を departures として返します
+          （people は変更しません）
         """
-        # SmartHR側のデータ取得
-        stmt = select(Person).where(
-            Person.tenant_id == tenant_id,
-            Person.smarthr_crew_id.isnot(None)
+        date_parsers, rows = DateColumnParser.for_numbered_rows(
+            cls.DATE_COLUMNS, enumerate(iter_csv_rows(csv_content), start=2)
         )
-        result = await db.execute(stmt)
-        smarthr_people = result.scalars().all()
-        
-        merge_count = 0
-        conflict_count = 0
-        
-        for person in smarthr_people:
-            smarthr_name = person.names.get("full_name", "")
-            
-            # Slack側で同名を探す（SmartHR未連携のもの）
-            slack_stmt = select(Person).where(
-                Person.tenant_id == tenant_id,
-                Person.names.op('->>')('full_name') == smarthr_name,
-                Person.smarthr_crew_id.is_(None),
-                Person.person_id != person.person_id
+
+        skip_count = 0
+        update_count = 0
+        errors = []
+        # 同じ人（社員番号、なければ氏名）の行は後の行を採用し、先の行は「更新」として数える
+        records: Dict[str, Dict[str, Any]] = {}
+        crew_id_by_name: Dict[str, Optional[str]] = {}
+        for row_num, row in rows:
+            try:
+                record = cls._parse_row(row, date_parsers)
+            except Exception as e:
+                logger.error(f"Error parsing SmartHR row {row_num}: {e}")
+                errors.append(f"Row {row_num}: {str(e)}")
+                skip_count += 1
+                continue
+            if record is None:
+                skip_count += 1
+                continue
+
+            full_name = record["full_name"]
+            # people は (tenant_id, full_name) で一意なので、同名で社員番号が違う行は取り込めない
+            if full_name in crew_id_by_name and crew_id_by_name[full_name] != record["crew_id"]:
+                errors.append(
+                    f"Row {row_num} ({full_name}): same name as another row with a different 社員番号"
+                )
+                skip_count += 1
+                continue
+            crew_id_by_name[full_name] = record["crew_id"]
+
+            record["row_num"] = row_num
+            key = record["crew_id"] or f"name:{full_name}"
+            if key in records:
+                update_count += 1
+            records[key] = record
+
+        result = {
+            "success_count": 0,
+            "update_count": update_count,
+            "matched_by_crew_id": 0,
+            "matched_by_name": 0,
+            "skip_count": skip_count,
+            "errors": errors,
+            "warnings": DateColumnParser.warnings(date_parsers),
+            "departures": [],
+        }
+
+        staged = sorted(records.values(), key=lambda r: r["row_num"])
+        if staged:
+            merged = await cls._merge_sync_staging(db, staged, tenant_id)
+            for record in staged:
+                outcome = merged.get(record["row_num"])
+                if outcome is None:
+                    # 氏名が社員番号の違う既存の人材と重複している
+                    errors.append(
+                        f"Row {record['row_num']} ({record['full_name']}): "
+                        "name is already used by a person with a different 社員番号"
+                    )
+                    result["skip_count"] += 1
+                elif outcome == "inserted":
+                    result["success_count"] += 1
+                else:
+                    result["update_count"] += 1
+                    result[f"matched_by_{outcome}"] += 1
+
+            # 社員番号が1件もないファイル（別のCSVなど）では全員が退職扱いになるため判定しない
+            if any(r["crew_id"] for r in staged):
+                result["departures"] = await cls._find_departures(db, tenant_id)
+
+        await db.commit()
+
+        result["departure_count"] = len(result["departures"])
+        result["total_processed"] = result["success_count"] + result["update_count"] + result["skip_count"]
+        return result
+
+    @staticmethod
+    def _sync_staging_record(record: Dict[str, Any]) -> Tuple:
+        """COPY 用のタプルに変換（JSONB は文字列として渡す）"""
+        return (
+            record["row_num"],
+            record["crew_id"],
+            record["full_name"],
+            json.dumps(record["names"], ensure_ascii=False),
+            json.dumps(record["demographics"], ensure_ascii=False),
+        )
+
+    @classmethod
+    async def _merge_sync_staging(
+        cls,
+        db: AsyncSession,
+        records: List[Dict[str, Any]],
+        tenant_id: UUID
+    ) -> Dict[int, str]:
+        """
+        レコード群をステージングテーブルへ COPY し、1文で people にマージします。
+        戻り値: row_num -> 'crew_id' | 'name'（照合して更新）| 'inserted'（新規作成）
+        取り込めなかった行（氏名の一意制約に当たる行）は含まれません。
+        """
+        await db.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS smarthr_sync_staging (
+                row_num INTEGER NOT NULL,
+                crew_id TEXT,
+                full_name TEXT NOT NULL,
+                names JSONB NOT NULL,
+                demographics JSONB
+            ) ON COMMIT DROP
+        """))
+        await db.execute(text("TRUNCATE smarthr_sync_staging"))
+
+        conn = await get_asyncpg_connection(db)
+        await conn.copy_records_to_table(
+            "smarthr_sync_staging",
+            records=[cls._sync_staging_record(r) for r in records],
+            columns=list(cls.SYNC_STAGING_COLUMNS),
+        )
+
+        result = await db.execute(text("""
+            WITH matched AS (
+                SELECT
+                    s.*,
+                    COALESCE(by_id.person_id, by_name.person_id) AS person_id,
+                    CASE
+                        WHEN by_id.person_id IS NOT NULL THEN 'crew_id'
+                        WHEN by_name.person_id IS NOT NULL THEN 'name'
+                    END AS matched_by
+                FROM smarthr_sync_staging s
+                LEFT JOIN people by_id
+                  ON by_id.tenant_id = CAST(:tenant_id AS uuid)
+                 AND by_id.smarthr_crew_id = s.crew_id
+                LEFT JOIN people by_name
+                  ON by_id.person_id IS NULL
+                 AND by_name.tenant_id = CAST(:tenant_id AS uuid)
+                 AND by_name.names->>'full_name' = s.full_name
+                 AND (by_name.smarthr_crew_id IS NULL OR s.crew_id IS NULL)
+            ),
+            -- 1人に複数行が当たる場合は社員番号での照合・後の行を優先する
+            targets AS (
+                SELECT DISTINCT ON (person_id) *
+                FROM matched
+                WHERE person_id IS NOT NULL
+                ORDER BY person_id, (matched_by = 'crew_id') DESC, row_num DESC
+            ),
+            updated AS (
+                UPDATE people p SET
+                    smarthr_crew_id = COALESCE(t.crew_id, p.smarthr_crew_id),
+                    demographics = p.demographics || t.demographics,
+                    smarthr_sync_at = NOW(),
+                    updated_at = NOW()
+                FROM targets t
+                WHERE p.person_id = t.person_id
+                RETURNING t.row_num, t.matched_by
+            ),
+            inserted AS (
+                INSERT INTO people (
+                    tenant_id, names, demographics, contact_info,
+                    current_status, smarthr_crew_id, smarthr_sync_at, updated_at
+                )
+                SELECT
+                    CAST(:tenant_id AS uuid), m.names, m.demographics, '{}'::jsonb,
+                    'monitoring'::person_status, m.crew_id, NOW(), NOW()
+                FROM matched m
+                WHERE m.person_id IS NULL
+                ORDER BY m.row_num
+                ON CONFLICT DO NOTHING
+                RETURNING names->>'full_name' AS full_name
             )
-            slack_result = await db.execute(slack_stmt)
-            slack_person = slack_result.scalar_one_or_none()
-            
-            if slack_person:
-                # マージ処理（Slack側の追加情報をSmartHR側にコピー）
-                logger.info(f"Merging {smarthr_name}: SmartHR {person.person_id} <- Slack {slack_person.person_id}")
-                
-                # 在留資格などの情報をマージ
-                # TODO: 実際のマージロジックはビジネス要件に応じて実装
-                merge_count += 1
-        
+            SELECT row_num, matched_by AS outcome FROM updated
+            UNION ALL
+            SELECT m.row_num, 'inserted' AS outcome
+            FROM inserted i
+            JOIN matched m ON m.person_id IS NULL AND m.full_name = i.full_name
+        """), {"tenant_id": tenant_id})
+
+        return {row.row_num: row.outcome for row in result}
+
+    @staticmethod
+    async def _find_departures(db: AsyncSession, tenant_id: UUID) -> List[Dict[str, Any]]:
+        """社員番号を持つ在籍中の人材のうち、ステージングに現れなかった人（1クエリ）"""
+        result = await db.execute(text("""
+            SELECT
+                p.person_id,
+                p.smarthr_crew_id,
+                p.names->>'full_name' AS full_name,
+                p.smarthr_sync_at
+            FROM people p
+            WHERE p.tenant_id = :tenant_id
+              AND p.smarthr_crew_id IS NOT NULL
+              AND p.deleted_at IS NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM smarthr_sync_staging s WHERE s.crew_id = p.smarthr_crew_id
+              )
+            ORDER BY p.smarthr_crew_id
+        """), {"tenant_id": tenant_id})
+        return [
+            {
+                "person_id": row.person_id,
+                "smarthr_crew_id": row.smarthr_crew_id,
+                "full_name": row.full_name,
+                "last_synced_at": row.smarthr_sync_at,
+            }
+            for row in result
+        ]
+
+    # 人材の統合時に person_id を付け替えるテーブル（集計・索引系は ON DELETE CASCADE で再計算される）
+    MERGE_REFERENCE_TABLES = (
+        "employments",
+        "visa_records",
+        "visa_cases",
+        "daily_operations",
+        "dispatch_slots",
+        "immigration_notices",
+        "documents",
+        "generated_documents",
+    )
+
+    @classmethod
+    async def merge_with_slack_data(
+        cls,
+        db: AsyncSession,
+        tenant_id: UUID,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        SmartHRデータとSlackリストデータをマージ
+
+        テナントの人材を1クエリで読み込み、PersonMatcher で SmartHR 連携済みの人と
+        SmartHR 未連携の人の同一人物候補を探します（正規化氏名・読み・ローマ字・生年月日）。
+        相互に唯一の最良候補で AUTO_MERGE_SCORE 以上のペアだけを一括で統合し、
+        それ以外は review / conflicts として返します。
+
+        統合では Slack 側の人材を残し（在留資格・案件などの業務データを持つため）、
+        SmartHR 側の社員番号・氏名の内訳・生年月日を移したうえで、SmartHR 側を論理削除します。
+        """
+        result = await db.execute(text("""
+            SELECT
+                person_id,
+                names->>'full_name' AS full_name,
+                COALESCE(
+                    names->>'full_name_kana',
+                    NULLIF(concat_ws(' ', names->>'legal_last_kana', names->>'legal_first_kana'), '')
+                ) AS kana,
+                COALESCE(date_of_birth, CAST(NULLIF(demographics->>'birth_date', '') AS date)) AS birth_date,
+                smarthr_crew_id
+            FROM people
+            WHERE tenant_id = :tenant_id
+              AND deleted_at IS NULL
+        """), {"tenant_id": tenant_id})
+
+        smarthr_people: List[PersonKeys] = []
+        slack_people: List[PersonKeys] = []
+        crew_ids: Dict[UUID, str] = {}
+        for row in result:
+            keys = PersonKeys(row.person_id, row.full_name or "", row.kana, row.birth_date)
+            if row.smarthr_crew_id:
+                smarthr_people.append(keys)
+                crew_ids[row.person_id] = row.smarthr_crew_id
+            else:
+                slack_people.append(keys)
+
+        matches = PersonMatcher.match(smarthr_people, slack_people)
+        merges = [
+            {
+                "survivor_person_id": m["right_person_id"],
+                "merged_person_id": m["left_person_id"],
+                "smarthr_crew_id": crew_ids[m["left_person_id"]],
+                "score": m["score"],
+                "reason": m["reason"],
+            }
+            for m in matches["merge"]
+        ]
+
+        if merges and not dry_run:
+            await cls._apply_person_merges(db, merges)
+            await db.commit()
+            for m in merges:
+                logger.info(
+                    f"Merged SmartHR {m['merged_person_id']} -> Slack {m['survivor_person_id']} "
+                    f"({m['reason']}, score={m['score']})"
+                )
+
         return {
-            "merge_count": merge_count,
-            "conflict_count": conflict_count
+            "dry_run": dry_run,
+            "merge_count": len(merges),
+            "conflict_count": len(matches["conflicts"]),
+            "review_count": len(matches["review"]),
+            "merges": merges,
+            "review": matches["review"],
+            "conflicts": matches["conflicts"],
         }
+
+    @classmethod
+    async def _apply_person_merges(cls, db: AsyncSession, merges: List[Dict[str, Any]]):
+        """
+        統合ペアをまとめて反映します（ペア数によらずクエリ数は一定）。コミットは呼び出し元で行います。
+        """
+        params = {
+            "survivor_ids": [m["survivor_person_id"] for m in merges],
+            "merged_ids": [m["merged_person_id"] for m in merges],
+            "crew_ids": [m["smarthr_crew_id"] for m in merges],
+        }
+        pairs_sql = """
+            unnest(CAST(:survivor_ids AS uuid[]), CAST(:merged_ids AS uuid[]))
+                AS m(survivor_id, merged_id)
+        """
+
+        # 1. 参照の付け替え
+        for table in cls.MERGE_REFERENCE_TABLES:
+            await db.execute(text(f"""
+                UPDATE {table} t
+                SET person_id = m.survivor_id
+                FROM {pairs_sql}
+                WHERE t.person_id = m.merged_id
+            """), params)
+
+        # deal_proposals は (deal_id, person_id) が一意なので、両方に提案がある案件は残す
+        await db.execute(text(f"""
+            UPDATE deal_proposals t
+            SET person_id = m.survivor_id
+            FROM {pairs_sql}
+            WHERE t.person_id = m.merged_id
+              AND NOT EXISTS (
+                  SELECT 1 FROM deal_proposals x
+                  WHERE x.deal_id = t.deal_id AND x.person_id = m.survivor_id
+              )
+        """), params)
+
+        # 2. SmartHR 側を論理削除し、社員番号を空ける（(tenant_id, smarthr_crew_id) は一意）
+        await db.execute(text(f"""
+            UPDATE people p
+            SET smarthr_crew_id = NULL,
+                deleted_at = NOW(),
+                updated_at = NOW()
+            FROM {pairs_sql}
+            WHERE p.person_id = m.merged_id
+        """), params)
+
+        # 3. 残す側に社員番号と SmartHR 側の情報を移す（既存の値を優先）
+        await db.execute(text("""
+            UPDATE people s
+            SET smarthr_crew_id = m.crew_id,
+                smarthr_sync_at = d.smarthr_sync_at,
+                names = (d.names - 'full_name') || s.names,
+                demographics = d.demographics || s.demographics,
+                date_of_birth = COALESCE(s.date_of_birth, d.date_of_birth),
+                updated_at = NOW()
+            FROM unnest(
+                    CAST(:survivor_ids AS uuid[]), CAST(:merged_ids AS uuid[]), CAST(:crew_ids AS text[])
+                 ) AS m(survivor_id, merged_id, crew_id)
+            JOIN people d ON d.person_id = m.merged_id
+            WHERE s.person_id = m.survivor_id
+        """), params)
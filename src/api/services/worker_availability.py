@@ -0,0 +1,98 @@
+import logging
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.schemas.dispatch import AvailableWorker
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerAvailabilityService:
+    """
+    配置可能な人材の検索
+
+    対象日ごとに「雇用期間内・在留期限内・実スロットなし」を NOT EXISTS で判定する。
+    起点は対象期間に有効な雇用（sql/028 のインデックス）なので、
+    退職済みを含む人材の総数には比例しない。
+    """
+
+    ACTIVE_EMPLOYMENT_STATUSES = ("active", "pending")
+
+    @staticmethod
+    async def find_available(
+        db: AsyncSession,
+        week_start: date,
+        weekdays: Optional[List[int]] = None,
+        min_days: int = 1,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[AvailableWorker]:
+        """
+        week_start の週のうち weekdays（0=月〜6=日、省略時は全日）で
+        min_days 日以上空いている人材を、空き開始日が早い順に返す。
+        """
+        offsets = sorted(set(weekdays)) if weekdays else list(range(7))
+
+        result = await db.execute(
+            text("""
+                WITH days AS (
+                    SELECT CAST(:week_start AS date) + d AS day
+                    FROM unnest(CAST(:offsets AS int[])) AS d
+                ),
+                free AS (
+                    SELECT DISTINCT e.person_id, days.day
+                    FROM days
+                    JOIN employments e
+                      ON e.start_date <= days.day
+                     AND COALESCE(e.end_date, 'infinity'::date) >= days.day
+                     AND e.deleted_at IS NULL
+                     AND e.status::text = ANY(CAST(:statuses AS text[]))
+                    JOIN people p
+                      ON p.person_id = e.person_id
+                     AND p.deleted_at IS NULL
+                    WHERE (p.visa_expiry_date IS NULL OR p.visa_expiry_date >= days.day)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM dispatch_slots s
+                          WHERE s.person_id = e.person_id
+                            AND s.slot_date = days.day
+                            AND s.is_simulation = FALSE
+                      )
+                )
+                SELECT
+                    p.person_id,
+                    p.names->>'full_name' AS name,
+                    COALESCE(p.nationality, p.demographics->>'nationality') AS nationality,
+                    p.skills,
+                    array_agg(f.day ORDER BY f.day) AS available_days,
+                    MIN(f.day) AS available_from
+                FROM free f
+                JOIN people p ON p.person_id = f.person_id
+                GROUP BY p.person_id
+                HAVING COUNT(*) >= :min_days
+                ORDER BY available_from, COUNT(*) DESC, name, p.person_id
+                LIMIT :limit OFFSET :offset
+            """),
+            {
+                "week_start": week_start,
+                "offsets": offsets,
+                "statuses": list(WorkerAvailabilityService.ACTIVE_EMPLOYMENT_STATUSES),
+                "min_days": min_days,
+                "limit": limit,
+                "offset": offset,
+            }
+        )
+
+        return [
+            AvailableWorker(
+                personId=row.person_id,
+                name=row.name or "Unknown",
+                nationality=row.nationality,
+                availableFrom=row.available_from,
+                availableDays=row.available_days,
+                skills=row.skills or []
+            )
+            for row in result
+        ]
@@ -43,6 +43,8 @@ export interface Candidate {
 
 export interface CandidateSearchResponse {
     total: number;
+    totalIsEstimate?: boolean;
+    nextCursor?: string | null;
     results: Candidate[];
     filters: {
         availabilities: FilterOption[];
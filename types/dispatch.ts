@@ -40,6 +40,7 @@ export interface AvailableWorker {
     name: string;
     nationality: string;
     availableFrom: string;
+    availableDays: string[];
     skills: string[];
 }
 